@@ -0,0 +1,96 @@
+"""
+Room adjacency on tiled synthetic floors: wall/door segment extraction and
+the spatial-hash pair search, against comparing every segment with every
+other one, up to thousands of rooms.
+
+Rooms are `--size` m squares packed edge to edge, their sides split into
+several walls, so neighbours share partly overlapping walls and doors open
+onto neighbouring rooms.
+
+Run from the `spatial-bigraph/` folder:
+    python benchmarks/bench_adjacency.py
+    python benchmarks/bench_adjacency.py --rooms 100 10000 --walls 12
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatialbigraph.adjacency import floor_segments, touching_pairs
+from spatialbigraph.rooms import WALL_TOL
+from spatialbigraph.scene import Scene
+from spatialbigraph.synthetic import generate_building
+
+
+def all_pairs(segments, tol, min_overlap, chunk=1024):
+    """
+    The same pairs from every (i, j) combination, chunked to bound memory.
+    """
+    s = segments
+    pi, pj = [], []
+    for lo in range(0, len(s), chunk):
+        a = s[lo:lo + chunk, None]
+        overlap = np.minimum(a["hi"], s["hi"]) - np.maximum(a["lo"], s["lo"])
+        hit = ((a["axis"] == s["axis"]) & (a["room"] != s["room"]) &
+               (np.abs(a["line"] - s["line"]) <= tol) & (overlap >= min_overlap))
+        i, j = np.nonzero(hit)
+        keep = i + lo < j
+        pi.append(i[keep] + lo)
+        pj.append(j[keep])
+    return np.concatenate(pi), np.concatenate(pj)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--walls", type=int, default=8, help="walls per room (default: 8)")
+    parser.add_argument("--size", type=float, default=5.0, help="room side in metres (default: 5)")
+    parser.add_argument("--min-overlap", type=float, default=0.1)
+    parser.add_argument("--brute-max", type=int, default=1000,
+                        help="most rooms also compared all-pairs (default: 1000)")
+    parser.add_argument("--repeat", type=int, default=3, help="pair searches per size, best kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'rooms':>6} {'segments':>9} {'extract ms':>11} {'hash ms':>8} {'us/room':>8} "
+          f"{'pairs':>7} {'all-pairs ms':>13} {'speedup':>8}")
+    for n_rooms in args.rooms:
+        data = generate_building(n_rooms, seed=args.seed, spacing=args.size,
+                                 size=(args.size, args.size), n_walls=args.walls, n_objects=0)
+        rooms = Scene.from_dict(data).rooms
+
+        t0 = time.perf_counter()
+        segments, _ = floor_segments(rooms)
+        t_extract = time.perf_counter() - t0
+
+        t_hash = np.inf
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            i, j, _ = touching_pairs(segments, WALL_TOL, args.min_overlap)
+            t_hash = min(t_hash, time.perf_counter() - t0)
+
+        # Every interior edge of the grid is one shared side
+        cols = int(np.ceil(np.sqrt(n_rooms)))
+        r = np.arange(n_rooms)
+        sides = ((r % cols < cols - 1) & (r + 1 < n_rooms)).sum() + (r + cols < n_rooms).sum()
+        rooms_of = np.unique(np.column_stack([segments["room"][i], segments["room"][j]]), axis=0)
+        assert len(rooms_of) == sides, f"{len(rooms_of)} adjacent room pairs, expected {sides}"
+
+        brute = speedup = "-"
+        if n_rooms <= args.brute_max:
+            t0 = time.perf_counter()
+            bi, bj = all_pairs(segments, WALL_TOL, args.min_overlap)
+            t_brute = time.perf_counter() - t0
+            assert np.array_equal(np.unique(i * len(segments) + j), np.unique(bi * len(segments) + bj)), \
+                "spatial hash and all-pairs disagree"
+            brute, speedup = f"{t_brute * 1e3:.1f}", f"{t_brute / t_hash:.0f}x"
+        print(f"{n_rooms:>6} {len(segments):>9} {t_extract * 1e3:>11.1f} {t_hash * 1e3:>8.1f} "
+              f"{t_hash / n_rooms * 1e6:>8.1f} {len(i):>7} {brute:>13} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Centroid attachment on generated rooms with thousands of objects: the
+KD-tree's batched query against the per-device loop
+`bigraphs_with_centroid.py` used to run, and against a vectorized scan.
+
+The loop column is that script's former attachment as it was (every
+element's centroid recomputed for every device); it is skipped above
+`--loop-max` device×element pairs. The tree's answers are checked against
+`attach.nearest_centroids` over the same centroids, for k=1 and `--k`.
+
+Run from the `spatial-bigraph/` folder:
+    python benchmarks/bench_centroids.py
+    python benchmarks/bench_centroids.py --objects 1000 10000 50000 --devices 5000 --k 3
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatialbigraph.attach import nearest_centroids
+from spatialbigraph.centroids import CentroidTree, element_centroids
+from spatialbigraph.scene import Room
+from spatialbigraph.synthetic import generate_room
+
+
+def loop_attach(room):
+    """
+    The former per-device loop, kept verbatim in behaviour: `group_name` is
+    whatever the element loop above it left behind (the room's last group).
+    """
+    group_name = str(room.elements["group"][-1]) if len(room.elements) else ""
+    parents = []
+    for dev in room.devices:
+        dev_pos = dev["position"]
+        closest_obj = None
+        closest_dist = float("inf")
+        for obj in room.elements:
+            loc = obj["location"]
+            if group_name in ("walls", "doors", "windows"):
+                w, h, l = obj["dimensions"]
+                obj_centroid = loc + 0.5 * np.array([w, h, l])
+            else:
+                obj_centroid = loc
+            dist = np.linalg.norm(dev_pos - obj_centroid)
+            if dist < closest_dist:
+                closest_dist = dist
+                closest_obj = obj
+        parents.append(str(closest_obj["id"]) if closest_obj is not None else None)
+    return parents
+
+
+def best_of(repeat, fn):
+    best, out = np.inf, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--objects", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    parser.add_argument("--devices", type=int, default=1000, help="devices per room (default: 1000)")
+    parser.add_argument("--size", type=float, default=30.0, help="room side in metres (default: 30)")
+    parser.add_argument("--k", type=int, default=3, help="also check k-nearest (default: 3)")
+    parser.add_argument("--leaf-size", type=int, default=16)
+    parser.add_argument("--loop-max", type=float, default=2e6,
+                        help="most device×element pairs timed with the loop (default: 2e6)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage, best kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'objects':>8} {'devices':>8} {'centroids ms':>13} {'build ms':>9} {'query ms':>9} "
+          f"{'scan ms':>8} {'loop ms':>9} {'vs loop':>8}")
+    for n_objects in args.objects:
+        rng = np.random.default_rng([args.seed, n_objects])
+        data = generate_room(rng, size=(args.size, args.size), n_walls=12, n_doors=3, n_windows=4,
+                             n_objects=n_objects, n_categories=12, n_devices=args.devices)
+        room = Room.from_dict("bench", data)
+        positions = room.devices["position"]
+
+        t_centroids, centroids = best_of(args.repeat, lambda: element_centroids(room))
+        t_build, tree = best_of(args.repeat, lambda: CentroidTree(centroids, args.leaf_size))
+        t_query, (rows, dist) = best_of(args.repeat, lambda: tree.query(positions))
+        t_scan, (scan_rows, scan_dist) = best_of(args.repeat, lambda: nearest_centroids(positions, centroids))
+        assert np.array_equal(rows, scan_rows) and np.allclose(dist, scan_dist), \
+            "KD-tree and scan disagree"
+
+        k_rows, k_dist = tree.query(positions, k=args.k)
+        d = np.linalg.norm(positions[:, None, :] - centroids[k_rows], axis=2)
+        assert np.allclose(d, k_dist), "k-nearest distances are wrong"
+        assert (np.diff(k_dist, axis=1) >= 0).all(), "k-nearest not sorted"
+        assert np.array_equal(k_rows[:, 0], rows), "k-nearest disagrees with nearest"
+        kth = np.partition(np.linalg.norm(positions[:, None, :] - centroids[None], axis=2),
+                           args.k - 1, axis=1)[:, args.k - 1]
+        assert np.allclose(k_dist[:, -1], kth), "k-th distance is wrong"
+
+        loop = speedup = "-"
+        if len(positions) * len(room.elements) <= args.loop_max:
+            t_loop, _ = best_of(1, lambda: loop_attach(room))
+            t_tree = t_centroids + t_build + t_query
+            loop, speedup = f"{t_loop * 1e3:.0f}", f"{t_loop / t_tree:.0f}x"
+        print(f"{len(room.elements):>8} {len(positions):>8} {t_centroids * 1e3:>13.2f} {t_build * 1e3:>9.2f} "
+              f"{t_query * 1e3:>9.2f} {t_scan * 1e3:>8.2f} {loop:>9} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
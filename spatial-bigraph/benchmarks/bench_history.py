@@ -0,0 +1,119 @@
+"""
+Version history of a synthetic building rescanned again and again: commit,
+checkout and diff cost and memory per version, against full copies.
+
+Every version rescans the whole building with `--changed` rooms edited
+(some devices moved, one added, one removed). A commit is timed against
+rebuilding the full forest, a diff against comparing two full node tables,
+and the memory each version adds against a standalone copy of it. Every
+diff is checked against the full-table comparison and the last version's
+checkout against `build_forest` on the same rooms.
+
+Run from the `spatial-bigraph/` folder:
+    python benchmarks/bench_history.py
+    python benchmarks/bench_history.py --rooms 2000 --versions 20 --changed 5
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatialbigraph.forest import build_forest
+from spatialbigraph.geometry import to_xyz
+from spatialbigraph.history import BigraphHistory
+from spatialbigraph.scene import Room
+from spatialbigraph.synthetic import generate_rooms
+
+
+def rescan(rooms, rng, n_changed, step):
+    """
+    Edit `n_changed` random rooms in place like a rescan would: move a few
+    devices, register one and drop one.
+    """
+    for r in rng.choice(len(rooms), min(n_changed, len(rooms)), replace=False).tolist():
+        room = rooms[r]
+        devs = room.devices
+        moved = devs[rng.choice(len(devs), min(3, len(devs)), replace=False)]
+        room.update_devices([{"id": dev["id"], "position": to_xyz(dev["position"] + rng.normal(0, 1.5, 3))}
+                             for dev in moved])
+        room.remove_devices([devs["id"][0]])
+        room.add_devices([{"id": f"new-{step}-{r}", "name": "sensor", "room": room.name,
+                           "position": to_xyz(devs["position"][-1] + rng.normal(0, 0.5, 3))}])
+
+
+def full_diff(a, b):
+    """
+    The diff by comparing two whole node tables.
+    """
+    changed = {k: (v, b[k]) for k, v in a.items() if k in b and b[k] != v}
+    return set(b).difference(a), set(a).difference(b), changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=500, help="rooms in the building (default: 500)")
+    parser.add_argument("--versions", type=int, default=10, help="rescans after the first (default: 10)")
+    parser.add_argument("--changed", type=int, default=3, help="rooms edited per rescan (default: 3)")
+    parser.add_argument("--devices", type=int, default=30, help="devices per room (default: 30)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    rooms = [Room.from_dict(name, data) for name, data in
+             generate_rooms(args.rooms, seed=args.seed, n_objects=12, n_devices=args.devices)]
+    history = BigraphHistory()
+
+    print(f"{'version':>7} {'nodes':>7} {'changed':>8} {'commit ms':>10} {'rebuild ms':>11} "
+          f"{'diff ms':>8} {'full diff ms':>13} {'reparented':>11} {'new KiB':>8} {'full KiB':>9}")
+    previous = None
+    for step in range(args.versions + 1):
+        if step:
+            rescan(rooms, rng, args.changed, step)
+        t0 = time.perf_counter()
+        version = history.commit(rooms, label=f"scan {step}")
+        t_commit = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        forest = build_forest(rooms)
+        t_rebuild = time.perf_counter() - t0
+
+        t_diff = t_full = 0.0
+        reparented = 0
+        if previous is not None:
+            t0 = time.perf_counter()
+            diff = history.diff(previous, version)
+            t_diff = time.perf_counter() - t0
+            a, b = dict(previous.items()), dict(version.items())
+            t0 = time.perf_counter()
+            added, removed, changed = full_diff(a, b)
+            t_full = time.perf_counter() - t0
+            assert (set(diff.added), set(diff.removed), diff.changed) == (added, removed, changed), \
+                "diff disagrees with the full comparison"
+            reparented = len(diff.reparented)
+        previous = version
+
+        report = history.memory_report()[-1]
+        print(f"{version.number:>7} {len(version):>7} {len(version.changed_rooms):>8} {t_commit * 1e3:>10.1f} "
+              f"{t_rebuild * 1e3:>11.1f} {t_diff * 1e3:>8.3f} {t_full * 1e3:>13.2f} {reparented:>11} "
+              f"{report['new_bytes'] / 1024:>8.1f} {report['full_bytes'] / 1024:>9.1f}")
+
+    checkout = history.checkout(-1).to_forest()
+    assert checkout.ids == forest.ids, "checkout and rebuild hold different nodes"
+    assert np.array_equal(checkout.parent[:len(checkout)], forest.parent[:len(forest)]), \
+        "checkout and rebuild disagree on parents"
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        history.checkout("scan 0")
+    t_checkout = (time.perf_counter() - t0) / 1000
+    report = history.memory_report()
+    copies = sum(row["full_bytes"] for row in report)
+    print(f"\ncheckout: {t_checkout * 1e6:.2f} us; history {report[-1]['total_bytes'] / 2**20:.2f} MiB "
+          f"vs {copies / 2**20:.2f} MiB as full copies")
+
+
+if __name__ == "__main__":
+    main()
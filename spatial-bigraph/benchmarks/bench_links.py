@@ -0,0 +1,90 @@
+"""
+Link-graph construction time against device count: attribute links and
+range links (spatial hash + union-find), with an all-pairs check at the
+sizes where that is still affordable.
+
+Devices are spread over a floor whose area grows with their number, so the
+number of neighbours per device stays about constant.
+
+Run from the `spatial-bigraph/` folder:
+    python benchmarks/bench_links.py
+    python benchmarks/bench_links.py --sizes 1000 100000 --radius 2
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatialbigraph.links import LinkGraph, UnionFind, range_pairs
+from spatialbigraph.scene import DEVICE_DTYPE
+from spatialbigraph.synthetic import DEVICE_NAMES
+
+
+def random_devices(n, rng, density=0.5):
+    """
+    `n` devices at `density` devices per m² of floor, 0.3-2.5 m high.
+    """
+    side = np.sqrt(n / density)
+    devices = np.zeros(n, dtype=DEVICE_DTYPE)
+    devices["id"] = [f"dev_{i}" for i in range(n)]
+    devices["type"] = np.array(DEVICE_NAMES)[rng.integers(len(DEVICE_NAMES), size=n)]
+    devices["position"] = np.column_stack([rng.uniform(0, side, n), rng.uniform(0.3, 2.5, n),
+                                           rng.uniform(0, side, n)])
+    return devices
+
+
+def brute_groups(positions, radius, chunk=2048):
+    """
+    Range groups from every pair of devices, chunked to bound memory.
+    """
+    uf = UnionFind(len(positions))
+    for lo in range(0, len(positions), chunk):
+        d2 = ((positions[lo:lo + chunk, None] - positions[None]) ** 2).sum(axis=2)
+        i, j = np.nonzero(d2 <= radius * radius)
+        uf.union(i + lo, j)
+    return uf.groups()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 300_000])
+    parser.add_argument("--radius", type=float, default=1.5, help="radio range in metres (default: 1.5)")
+    parser.add_argument("--brute-max", type=int, default=10_000,
+                        help="largest size also run all-pairs (default: 10000)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'devices':>8} {'pairs':>9} {'type ms':>8} {'range ms':>9} {'links':>7} "
+          f"{'all-pairs ms':>13} {'speedup':>8}")
+    for n in args.sizes:
+        devices = random_devices(n, rng)
+        links = LinkGraph(devices)
+
+        t0 = time.perf_counter()
+        links.link_attribute("type")
+        t_type = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        links.link_range(args.radius)
+        t_range = time.perf_counter() - t0
+        n_pairs = len(range_pairs(devices["position"], args.radius)[0])
+
+        brute = speedup = "-"
+        if n <= args.brute_max:
+            t0 = time.perf_counter()
+            expected = brute_groups(devices["position"], args.radius)
+            t_brute = time.perf_counter() - t0
+            got = UnionFind(n).union(*range_pairs(devices["position"], args.radius)).groups()
+            assert np.array_equal(got, expected), "spatial hash and all-pairs groups disagree"
+            brute, speedup = f"{t_brute * 1e3:.1f}", f"{t_brute / t_range:.0f}x"
+        print(f"{n:>8} {n_pairs:>9} {t_type * 1e3:>8.1f} {t_range * 1e3:>9.1f} {len(links):>7} "
+              f"{brute:>13} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
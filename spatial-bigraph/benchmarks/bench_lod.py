@@ -0,0 +1,121 @@
+"""
+Level-of-detail tree views: aggregates built once, then a view and its
+drawing at a fixed node budget, against drawing the whole tree.
+
+For each building size the aggregates (`LevelOfDetail.from_forest`) are
+built once and checked against label counts gathered by walking up from
+every node. A budgeted view, a view focused on one room and drawing the
+budgeted view are then timed; their cost should stay flat while the
+building grows. The full tree (`hierarchy_layout` + `draw_tree`) is timed
+up to `--full-max` nodes. Every view is checked to stay within the budget
+and to account for every node, shown or summarized.
+
+Run from the `spatial-bigraph/` folder:
+    python benchmarks/bench_lod.py
+    python benchmarks/bench_lod.py --rooms 100 1000 10000 --budget 500
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from spatialbigraph.forest import build_forest
+from spatialbigraph.layout import hierarchy_layout
+from spatialbigraph.lod import OTHER_ROOTS, LevelOfDetail
+from spatialbigraph.render import draw_lod, draw_tree
+from spatialbigraph.scene import Room
+from spatialbigraph.synthetic import generate_rooms
+
+
+def best_of(repeat, fn):
+    best, out = np.inf, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def save(fig, draw):
+    fig.clear()
+    draw(fig.add_subplot())
+    fig.savefig(os.devnull, format="png")
+
+
+def walked_counts(lod):
+    """
+    {row: Counter of labels below it}, by walking up from every node.
+    """
+    counts = {}
+    for row in range(len(lod)):
+        name = lod.label_names[lod.label[row]]
+        p = lod.parent[row]
+        while p >= 0:
+            counts.setdefault(p, Counter())[name] += 1
+            p = lod.parent[p]
+    return counts
+
+
+def check_view(lod, view, budget):
+    assert len(view.ids) <= budget, f"view shows {len(view.ids)} nodes, budget {budget}"
+    summarized = int(view.hidden.sum())
+    shown = len(view.ids) - (OTHER_ROOTS in view.ids)
+    assert shown + summarized == len(lod), "view loses nodes"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, nargs="+", default=[10, 100, 1000, 5000],
+                        help="building sizes in rooms (default: 10 100 1000 5000)")
+    parser.add_argument("--budget", type=int, default=300, help="nodes per view (default: 300)")
+    parser.add_argument("--devices", type=int, default=20, help="devices per room (default: 20)")
+    parser.add_argument("--full-max", type=int, default=20000,
+                        help="most nodes drawn as a full tree (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage, best kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    fig = Figure(figsize=(12, 8), dpi=72)
+    FigureCanvasAgg(fig)
+    print(f"{'rooms':>6} {'nodes':>8} {'aggregate ms':>13} {'view ms':>8} {'focus ms':>9} "
+          f"{'draw ms':>8} {'shown':>6} {'full ms':>8}")
+    for n_rooms in args.rooms:
+        rooms = [Room.from_dict(name, data) for name, data in
+                 generate_rooms(n_rooms, seed=args.seed, n_objects=12, n_devices=args.devices)]
+        forest = build_forest(rooms)
+
+        t_agg, lod = best_of(args.repeat, lambda: LevelOfDetail.from_forest(forest))
+        walked = walked_counts(lod)
+        for row in range(len(lod)):
+            assert lod.label_counts(lod.ids[row]) == dict(walked.get(row, {})), \
+                f"aggregates of {lod.ids[row]} disagree with the walk"
+
+        t_view, view = best_of(args.repeat, lambda: lod.view(budget=args.budget))
+        check_view(lod, view, args.budget)
+        focus = rooms[len(rooms) // 2].name
+        t_focus, focused = best_of(args.repeat, lambda: lod.view(budget=args.budget, focus=focus))
+        check_view(lod, focused, args.budget)
+        t_draw, _ = best_of(args.repeat, lambda: save(fig, lambda ax: draw_lod(ax, view)))
+
+        full = "-"
+        if len(lod) <= args.full_max:
+            G = forest.to_networkx()
+            t_full, _ = best_of(args.repeat, lambda: save(
+                fig, lambda ax: draw_tree(ax, G, hierarchy_layout(G))))
+            full = f"{t_full * 1e3:.0f}"
+        print(f"{n_rooms:>6} {len(lod):>8} {t_agg * 1e3:>13.1f} {t_view * 1e3:>8.2f} {t_focus * 1e3:>9.2f} "
+              f"{t_draw * 1e3:>8.0f} {len(view.ids):>6} {full:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Exact device-to-mesh attachment: `MeshIndex` queries against brute force on
+synthetic room meshes of 10k to 400k triangles, plus the scanned meshes
+under `Data/`.
+
+The synthetic room is a 10 m × 3 m × 10 m box whose walls, floor and
+ceiling are finely tessellated grids with a little scan noise, and devices
+are spread through its volume (the hard case: far from every surface).
+Brute force runs on a sample of the devices and is checked face-for-face.
+
+Run from the `spatial-bigraph/` folder:
+    python benchmarks/bench_mesh.py
+    python benchmarks/bench_mesh.py --triangles 100000 --devices 20000
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from spatialbigraph.mesh import (MeshIndex, MeshPart, TriangleMesh, brute_force_nearest,
+                                 fit_to_room, load_usdz)
+from spatialbigraph.scene import Scene
+
+ROOM = np.array([10.0, 3.0, 10.0])
+
+def grid(n, origin, u, v):
+    """
+    An n×n grid of quads (2n² triangles) spanning origin + [0,1]u + [0,1]v.
+    """
+    i, j = np.meshgrid(np.arange(n + 1), np.arange(n + 1), indexing="ij")
+    vertices = origin + (i.reshape(-1, 1) / n) * u + (j.reshape(-1, 1) / n) * v
+    k = (np.arange(n)[:, None] * (n + 1) + np.arange(n)[None]).ravel()
+    faces = np.concatenate([np.column_stack([k, k + n + 1, k + 1]),
+                            np.column_stack([k + 1, k + n + 1, k + n + 2])])
+    return vertices, faces
+
+def synthetic_room(n_triangles, rng, noise=0.01):
+    """
+    Six tessellated sides of the ROOM box, about `n_triangles` in total,
+    each side its own part ("Wall 0".. "Floor", "Ceiling").
+    """
+    n = max(int(np.sqrt(n_triangles / 12)), 1)
+    x, y, z = np.eye(3) * ROOM
+    sides = [("Floor", 0, x, z), ("Ceiling", y, x, z),
+             ("Wall 0", 0, x, y), ("Wall 1", z, x, y), ("Wall 2", 0, z, y), ("Wall 3", x, z, y)]
+    pieces = []
+    for name, origin, u, v in sides:
+        vertices, faces = grid(n, np.zeros(3) + origin, u, v)
+        vertices = vertices + rng.normal(0, noise, vertices.shape)
+        pieces.append((vertices, faces, MeshPart(name, name.split()[0], name), vertices.mean(axis=0)))
+    return TriangleMesh.concatenate(pieces)
+
+
+def bench_synthetic(sizes, n_devices, n_brute, seed):
+    rng = np.random.default_rng(seed)
+    print(f"{'triangles':>10} {'devices':>8} {'build ms':>9} {'query ms':>9} {'us/device':>10} "
+          f"{'brute us/dev':>13} {'speedup':>8}")
+    for size in sizes:
+        mesh = synthetic_room(size, rng)
+        devices = rng.uniform(0, ROOM, (n_devices, 3))
+
+        t0 = time.perf_counter()
+        index = MeshIndex(mesh)
+        build = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        face, dist, _ = index.query(devices)
+        query = time.perf_counter() - t0
+
+        sample = devices[:n_brute]
+        t0 = time.perf_counter()
+        ref_face, ref_dist = brute_force_nearest(sample, mesh.triangles)
+        brute = (time.perf_counter() - t0) / len(sample)
+
+        assert np.array_equal(face[:n_brute], ref_face), "BVH and brute force disagree"
+        assert np.allclose(dist[:n_brute], ref_dist)
+        per_device = query / n_devices
+        print(f"{len(mesh):>10} {n_devices:>8} {build * 1e3:>9.1f} {query * 1e3:>9.1f} "
+              f"{per_device * 1e6:>10.1f} {brute * 1e6:>13.1f} {brute / per_device:>7.0f}x")
+
+
+def bench_scans(pattern):
+    """
+    Load and align every scanned room that has a matching JSON.
+    """
+    print(f"\n{'scan':<44} {'triangles':>9} {'linked':>7} {'load ms':>8} {'rms m':>7}")
+    for path in sorted(glob.glob(pattern)):
+        jsons = glob.glob(os.path.join(os.path.dirname(path), "*.json"))
+        if not jsons:
+            continue
+        room = Scene.load(jsons[0]).rooms[0]
+        t0 = time.perf_counter()
+        mesh = load_usdz(path)
+        load = time.perf_counter() - t0
+        linked = sum(part.id in room.index for part in mesh.parts)
+        try:
+            _, _, rms = fit_to_room(mesh, room)
+            rms = f"{rms:.3f}"
+        except ValueError:
+            rms = "n/a"
+        print(f"{os.path.relpath(path):<44} {len(mesh):>9} {linked:>3}/{len(mesh.parts):<3} "
+              f"{load * 1e3:>8.1f} {rms:>7}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--triangles", type=int, nargs="+", default=[10_000, 100_000, 400_000])
+    parser.add_argument("--devices", type=int, default=5000)
+    parser.add_argument("--brute", type=int, default=20, help="devices checked by brute force (default: 20)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scans", default="Data/*/*.usdz", help="glob of scanned meshes")
+    args = parser.parse_args(argv)
+
+    bench_synthetic(args.triangles, args.devices, args.brute, args.seed)
+    bench_scans(args.scans)
+
+
+if __name__ == "__main__":
+    main()
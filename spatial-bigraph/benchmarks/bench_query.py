@@ -0,0 +1,98 @@
+"""
+Place-graph queries through `BigraphIndex` against the equivalent NetworkX
+traversals, on a synthetic building.
+
+Queries: all devices in a room, the room and wall/object a device hangs
+off, all devices under any object of one category, and batched ancestor
+tests. Every answer is checked against `nx.descendants` / `nx.ancestors`.
+
+Run from the `spatial-bigraph/` folder:
+    python benchmarks/bench_query.py
+    python benchmarks/bench_query.py --rooms 5000 --queries 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import networkx as nx
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatialbigraph.bigraph import build_bigraph
+from spatialbigraph.query import BigraphIndex
+from spatialbigraph.scene import Scene
+from spatialbigraph.synthetic import write_building
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def split(ptr, found):
+    return np.split(found, ptr[1:-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=1000)
+    parser.add_argument("--devices", type=int, default=10, help="IoT devices per room")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "building.json")
+        write_building(path, args.rooms, seed=args.seed, n_devices=args.devices)
+        G = build_bigraph(Scene.load(path).rooms)
+
+    build, index = timed(lambda: BigraphIndex.from_networkx(G))
+    print(f"{G.number_of_nodes()} nodes, index built in {build * 1e3:.1f}ms\n")
+
+    rng = np.random.default_rng(args.seed)
+    depth = index.depth
+    rooms = [index.ids[index.order[t]] for t in rng.choice(index.depth_postings[0], args.queries)]
+    devices = [index.ids[index.order[t]] for t in rng.choice(index.depth_postings[2], args.queries)]
+    labels = nx.get_node_attributes(G, "label")
+    category = labels[index.ids[index.order[index.depth_postings[1][-1]]]]
+
+    rows = []
+
+    def row(name, nx_fn, index_fn, same):
+        t_nx, expected = timed(nx_fn)
+        t_ix, got = timed(index_fn)
+        assert same(expected, got), f"{name}: index and NetworkX disagree"
+        rows.append((name, t_nx, t_ix))
+
+    row("devices in room",
+        lambda: [{n for n in nx.descendants(G, r) if depth[index.index[n]] == 2} for r in rooms],
+        lambda: split(*index.descendants_rows(index.rows(rooms), depth=2)),
+        lambda a, b: all(x == set(index._ids(y)) and len(y) == len(x) for x, y in zip(a, b)))
+    row("room + parent of device",
+        lambda: [(next(G.predecessors(d)), next(n for n in nx.ancestors(G, d) if G.in_degree(n) == 0))
+                 for d in devices],
+        lambda: list(zip(index._ids(index.ancestor_rows(index.rows(devices), 1)),
+                         index._ids(index.ancestor_rows(index.rows(devices), 0)))),
+        lambda a, b: a == b)
+    row(f"devices under any {category}",
+        lambda: set().union(*[nx.descendants(G, n) for n, lab in labels.items() if lab == category]),
+        lambda: index.under_label(category, depth=2),
+        lambda a, b: a == set(b) and len(a) == len(b))
+    pairs_a = rooms + devices
+    pairs_b = devices + rooms
+    row(f"is_ancestor x{len(pairs_a)}",
+        lambda: np.array([a in nx.ancestors(G, b) for a, b in zip(pairs_a, pairs_b)]),
+        lambda: index.is_ancestor(pairs_a, pairs_b),
+        lambda a, b: np.array_equal(a, b))
+
+    print(f"{'query':<32} {'networkx ms':>12} {'index ms':>9} {'speedup':>8}")
+    for name, t_nx, t_ix in rows:
+        print(f"{name:<32} {t_nx * 1e3:>12.1f} {t_ix * 1e3:>9.2f} {t_nx / t_ix:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Point-to-rectangle distances for rotated rooms: the batched kernel of
+`attach.rect_distances` against a per-pair loop over
+`geometry.point_to_rect_dist`, and against the infinite planes.
+
+Each generated room is turned by a random angle about the vertical, its
+walls, doors and windows carrying the rotation as a RoomPlan `transform`
+(objects and devices are moved along). The kernel must match the loop
+(timed up to `--loop-max` pairs) and give the same distances as in the
+unturned room; the last column counts the devices whose parent changes
+when walls stop extending past their ends.
+
+Run from the `spatial-bigraph/` folder:
+    python benchmarks/bench_rects.py
+    python benchmarks/bench_rects.py --walls 100 1000 10000 --devices 5000
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatialbigraph.attach import PackedSurfaces, nearest_parents, plane_distances, rect_distances
+from spatialbigraph.geometry import build_surfaces, plane_frame, point_to_rect_dist, rectangle_frames, to_xyz
+from spatialbigraph.synthetic import generate_room
+
+
+def turned(data, angle):
+    """
+    Copy of a generated room turned by `angle` about the y axis through the
+    origin: walls/doors/windows get a column-major `transform`, object
+    locations and device positions are rotated.
+    """
+    c, s = np.cos(angle), np.sin(angle)
+    rotation = np.array([[c, 0.0, s], [0.0, 1.0, 0.0], [-s, 0.0, c]])
+    out = copy.deepcopy(data)
+    for group in ("walls", "doors", "windows"):
+        for item in out[group]:
+            center, normal = plane_frame(item)
+            dims = item["dimensions"]
+            axes, _ = rectangle_frames(normal, [dims["width"], dims["height"], dims["length"]])
+            matrix = np.eye(4)
+            matrix[:3, :3] = rotation @ np.column_stack([axes[0, 0], axes[0, 1], normal])
+            matrix[:3, 3] = rotation @ center
+            item["transform"] = matrix.T.ravel().tolist()
+            # RoomPlan's dimensions are in the surface's own frame: width along x
+            item["dimensions"] = {"width": max(abs(dims["width"]), abs(dims["length"])),
+                                  "height": dims["height"], "length": 0.0}
+    for items in out["objects"].values():
+        for item in items:
+            item["location"] = to_xyz(rotation @ np.array([item["location"][k] for k in "xyz"]))
+    for dev in out["iot_devices"]:
+        dev["position"] = to_xyz(rotation @ np.array([dev["position"][k] for k in "xyz"]))
+    return out
+
+
+def positions(data):
+    return np.array([[dev["position"][k] for k in "xyz"] for dev in data["iot_devices"]])
+
+
+def surfaces_of(data, finite):
+    objects = data["walls"] + data["doors"] + data["windows"]
+    objects += [item for items in data["objects"].values() for item in items]
+    ids = [[item["id"] for item in data[group]] for group in ("walls", "doors", "windows")]
+    return build_surfaces(objects, *ids, finite=finite)
+
+
+def loop_distances(points, packed):
+    return np.array([[point_to_rect_dist(p, c, a, h)
+                      for c, a, h in zip(packed.rect_centers, packed.rect_axes, packed.rect_half)]
+                     for p in points])
+
+
+def best_of(repeat, fn):
+    best, out = np.inf, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--walls", type=int, nargs="+", default=[12, 100, 1000, 5000],
+                        help="walls per room; doors and windows add a quarter each")
+    parser.add_argument("--devices", type=int, default=2000, help="devices per room (default: 2000)")
+    parser.add_argument("--loop-max", type=float, default=2e5,
+                        help="most device×rectangle pairs timed with the loop (default: 2e5)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage, best kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'rects':>6} {'devices':>8} {'surfaces ms':>12} {'rect ms':>8} {'plane ms':>9} "
+          f"{'loop ms':>8} {'vs loop':>8} {'reparented':>11}")
+    for n_walls in args.walls:
+        rng = np.random.default_rng([args.seed, n_walls])
+        base = generate_room(rng, size=(np.sqrt(n_walls) * 3.0,) * 2, n_walls=n_walls,
+                             n_doors=max(n_walls // 4, 1), n_windows=max(n_walls // 4, 1),
+                             n_objects=n_walls, n_devices=args.devices)
+        data = turned(base, rng.uniform(0.1, np.pi / 2 - 0.1))
+        points = positions(data)
+
+        t_surfaces, surfaces = best_of(args.repeat, lambda: surfaces_of(data, finite=True))
+        packed = PackedSurfaces(surfaces)
+        planes = PackedSurfaces(surfaces_of(data, finite=False))
+        t_rect, dist = best_of(args.repeat, lambda: rect_distances(
+            points, packed.rect_centers, packed.rect_axes, packed.rect_half))
+        t_plane, _ = best_of(args.repeat, lambda: plane_distances(
+            points, planes.plane_normals, planes.plane_offsets))
+
+        # Unturned, the same rectangles are axis-aligned: same distances
+        back = PackedSurfaces(surfaces_of(base, finite=True))
+        assert np.allclose(dist, rect_distances(positions(base), back.rect_centers, back.rect_axes,
+                                                back.rect_half)), "distances change with the room's frame"
+
+        loop = speedup = "-"
+        if dist.size <= args.loop_max:
+            t_loop, ref = best_of(1, lambda: loop_distances(points, packed))
+            assert np.allclose(dist, ref), "kernel and loop disagree"
+            loop, speedup = f"{t_loop * 1e3:.0f}", f"{t_loop / t_rect:.0f}x"
+        else:
+            sample = rng.choice(len(points), 50, replace=False)
+            assert np.allclose(dist[sample], loop_distances(points[sample], packed)), \
+                "kernel and loop disagree"
+
+        rect_parents, _ = nearest_parents(points, packed)
+        plane_parents, _ = nearest_parents(points, planes)
+        moved = sum(a["id"] != b["id"] for a, b in zip(rect_parents, plane_parents))
+        print(f"{len(packed.rect_cols):>6} {len(points):>8} {t_surfaces * 1e3:>12.1f} {t_rect * 1e3:>8.2f} "
+              f"{t_plane * 1e3:>9.2f} {loop:>8} {speedup:>8} {moved / len(points):>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Room outlines and bulk point-in-room assignment on synthetic buildings:
+outline extraction from the wall lists, locator build, and the grid-indexed
+assignment of random floor points against testing every point against every
+room with matplotlib's `Path.contains_points`.
+
+Synthetic rooms are rectangles with their sides split into several walls,
+so every chained outline is also checked to enclose its rectangle's area.
+
+Run from the `spatial-bigraph/` folder:
+    python benchmarks/bench_rooms.py
+    python benchmarks/bench_rooms.py --rooms 100 10000 --points 100000 --walls 12
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from matplotlib.path import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatialbigraph.rooms import WALL_TOL, RoomLocator, polygon_area, room_polygon
+from spatialbigraph.scene import Scene
+from spatialbigraph.synthetic import generate_building
+
+
+def per_room(polygons, points):
+    """
+    Room row per point from one `contains_points` call per room.
+    """
+    out = np.full(len(points), -1, dtype=np.intp)
+    for r, ring in enumerate(polygons):
+        out[Path(ring).contains_points(points)] = r
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--points", type=int, default=50_000, help="points to assign (default: 50000)")
+    parser.add_argument("--walls", type=int, default=8, help="walls per room (default: 8)")
+    parser.add_argument("--brute-max", type=int, default=1000,
+                        help="most rooms also run room by room (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'rooms':>6} {'points':>7} {'outline ms':>11} {'build ms':>9} {'assign ms':>10} "
+          f"{'inside':>7} {'per-room ms':>12} {'speedup':>8}")
+    for n_rooms in args.rooms:
+        rooms = Scene.from_dict(generate_building(n_rooms, seed=args.seed, n_walls=args.walls)).rooms
+
+        t0 = time.perf_counter()
+        polygons = [room_polygon(room) for room in rooms]
+        t_outline = time.perf_counter() - t0
+        for room, ring in zip(rooms, polygons):
+            # Walls shorter than the tolerance may turn either way
+            size = np.ptp(room.walls["location"][:, [0, 2]], axis=0)
+            assert abs(polygon_area(ring) - size.prod()) <= WALL_TOL * size.sum(), \
+                f"{room.name}: outline misses walls"
+
+        t0 = time.perf_counter()
+        locator = RoomLocator(polygons, tol=0.0)
+        t_build = time.perf_counter() - t0
+
+        lo, hi = locator.bounds[:, :2].min(axis=0), locator.bounds[:, 2:].max(axis=0)
+        points = rng.uniform(lo, hi, (args.points, 2))
+        t0 = time.perf_counter()
+        rows = locator.assign(points)
+        t_assign = time.perf_counter() - t0
+
+        brute = speedup = "-"
+        if n_rooms <= args.brute_max:
+            t0 = time.perf_counter()
+            expected = per_room(polygons, points)
+            t_brute = time.perf_counter() - t0
+            assert np.array_equal(rows, expected), "locator and contains_points disagree"
+            brute, speedup = f"{t_brute * 1e3:.1f}", f"{t_brute / t_assign:.0f}x"
+        print(f"{n_rooms:>6} {args.points:>7} {t_outline * 1e3:>11.1f} {t_build * 1e3:>9.1f} "
+              f"{t_assign * 1e3:>10.1f} {(rows >= 0).mean():>7.0%} {brute:>12} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Scaling benchmark: every pipeline stage on synthetic buildings 10× to 1000×
+the size of `Jsons/floor.json` (2 rooms).
+
+Stages: parse (`Scene.load`), surfaces (`Room.surfaces`), attach
+(`nearest_parents`), bigraph (`build_bigraph`), layout (`hierarchy_layout`),
+render_tree (`draw_tree` + savefig) and render_floorplan (`draw_floorplan`
++ savefig, per room over a sample). Each is the best of `--repeat` runs.
+
+Results go to a JSON file; stages more than `--tolerance` slower than the
+stored baseline are flagged and the exit status is 1.
+
+Run from the `spatial-bigraph/` folder:
+    python benchmarks/bench_scaling.py                       # 10x 100x 1000x
+    python benchmarks/bench_scaling.py --scales 1 10 --repeat 1
+    python benchmarks/bench_scaling.py --update-baseline     # after an intended change
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from spatialbigraph.attach import nearest_parents
+from spatialbigraph.bigraph import build_bigraph
+from spatialbigraph.layout import hierarchy_layout
+from spatialbigraph.render import draw_floorplan, draw_tree, floorplan
+from spatialbigraph.scene import Scene
+from spatialbigraph.synthetic import write_building
+
+# Rooms in Jsons/floor.json, the "1×" building
+BASE_ROOMS = 2
+
+DEFAULT_RESULTS = os.path.join(HERE, "results", "bench_scaling.json")
+DEFAULT_BASELINE = os.path.join(HERE, "baselines", "bench_scaling.json")
+
+# ─── Stages ──────────────────────────────────────────────────────────────────
+
+def best_of(repeat, fn):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def save(fig, draw):
+    fig.clear()
+    draw(fig.add_subplot())
+    fig.savefig(os.devnull, format="png")
+
+def run_scale(path, repeat, render_rooms):
+    """
+    Seconds per stage for the building in `path`, plus its sizes.
+    """
+    stages = {}
+    stages["parse"], _ = best_of(repeat, lambda: Scene.load(path))
+
+    # Fresh scenes so the cached surfaces are really rebuilt every run
+    scenes = [Scene.load(path) for _ in range(repeat)]
+    it = iter(scenes)
+    stages["surfaces"], _ = best_of(repeat, lambda: [room.surfaces() for room in next(it)])
+    rooms = scenes[0].rooms
+
+    stages["attach"], _ = best_of(repeat, lambda: [
+        nearest_parents(room.devices["position"], room.surfaces()) for room in rooms])
+    stages["bigraph"], G = best_of(repeat, lambda: build_bigraph(rooms))
+    stages["layout"], pos = best_of(repeat, lambda: hierarchy_layout(G))
+
+    fig = Figure(figsize=(8, 8), dpi=72)
+    FigureCanvasAgg(fig)
+    stages["render_tree"], _ = best_of(repeat, lambda: save(fig, lambda ax: draw_tree(ax, G, pos)))
+    sample = rooms[:render_rooms]
+    t, _ = best_of(repeat, lambda: [save(fig, lambda ax: draw_floorplan(ax, floorplan(room)))
+                                    for room in sample])
+    stages["render_floorplan"] = t / max(len(sample), 1)
+
+    sizes = {
+        "rooms": len(rooms),
+        "elements": int(sum(len(room.elements) for room in rooms)),
+        "devices": int(sum(len(room.devices) for room in rooms)),
+        "nodes": G.number_of_nodes(),
+        "edges": G.number_of_edges(),
+        "bytes": os.path.getsize(path),
+    }
+    return stages, sizes
+
+
+# ─── Baseline ────────────────────────────────────────────────────────────────
+
+def compare(results, baseline, tolerance, min_delta):
+    """
+    (scale, stage, now, before) for every stage slower than the baseline by
+    more than `tolerance` (relative) and `min_delta` seconds.
+    """
+    flagged = []
+    for scale, entry in results["scales"].items():
+        base = baseline.get("scales", {}).get(scale, {}).get("stages", {})
+        for stage, now in entry["stages"].items():
+            before = base.get(stage)
+            if before is not None and now > before * (1 + tolerance) and now - before > min_delta:
+                flagged.append((scale, stage, now, before))
+    return flagged
+
+
+# ─── Command Line ────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000],
+                        help="building sizes as multiples of Jsons/floor.json (default: 10 100 1000)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage, best kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--render-rooms", type=int, default=5,
+                        help="rooms rendered for the per-room floorplan time (default: 5)")
+    parser.add_argument("-o", "--out", default=DEFAULT_RESULTS, help="results JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="relative slowdown flagged as a regression (default: 0.5)")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="ignore slowdowns smaller than this many seconds (default: 0.005)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = {
+        "benchmark": "bench_scaling",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "scales": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            path = os.path.join(tmp, f"building_{scale}x.json")
+            write_building(path, BASE_ROOMS * scale, seed=args.seed)
+            stages, sizes = run_scale(path, args.repeat, args.render_rooms)
+            results["scales"][f"{scale}x"] = {"sizes": sizes, "stages": stages}
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    flagged = compare(results, baseline, args.tolerance, args.min_delta)
+    slow = {(scale, stage) for scale, stage, *_ in flagged}
+
+    stage_names = list(next(iter(results["scales"].values()))["stages"])
+    print(f"{'scale':>6} {'rooms':>6} {'nodes':>7} " + " ".join(f"{s:>16}" for s in stage_names))
+    for scale, entry in results["scales"].items():
+        cells = []
+        for stage in stage_names:
+            ms = f"{entry['stages'][stage] * 1e3:.1f}ms"
+            cells.append(f"{ms + (' !' if (scale, stage) in slow else ''):>16}")
+        print(f"{scale:>6} {entry['sizes']['rooms']:>6} {entry['sizes']['nodes']:>7} " + " ".join(cells))
+    print(f"results → {args.out}")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline updated → {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"no baseline at {args.baseline}; run with --update-baseline to store one")
+        return 0
+    for scale, stage, now, before in flagged:
+        print(f"REGRESSION {scale} {stage}: {now * 1e3:.1f}ms vs {before * 1e3:.1f}ms baseline "
+              f"({now / before:.2f}x)")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""
+Load test for the bigraph service: concurrent keep-alive clients mixing
+queries, bigraph and floorplan fetches and device moves on a synthetic
+building, against running a script per call.
+
+Starts `python -m spatialbigraph.service` on a free port (or uses `--url`),
+uploads a `--rooms` building, checks its bigraph against a local
+`batch.build_chunk` build, then sends `--requests` requests from `--clients`
+connections and reports client-side throughput and latency per route next
+to the service's own `/metrics`. The baseline column is one fresh Python
+process importing the library, parsing the same export and building its
+bigraph, which is what shelling out to a script costs per call.
+
+Run from the `spatial-bigraph/` folder:
+    python benchmarks/bench_service.py
+    python benchmarks/bench_service.py --rooms 200 --clients 32 --requests 5000 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from spatialbigraph.batch import build_chunk
+from spatialbigraph.scene import Scene
+from spatialbigraph.synthetic import generate_building
+
+# Share of each request kind in the mix
+MIX = {"query": 0.5, "bigraph": 0.1, "floorplan": 0.15, "devices": 0.25}
+
+SCRIPT = ("import json, sys; from spatialbigraph.batch import build_chunk; "
+          "from spatialbigraph.scene import Scene; build_chunk(Scene.load(sys.argv[1]).rooms)")
+
+
+async def request(reader, writer, method, path, body=None):
+    """
+    One HTTP/1.1 request on a kept-alive connection → (status, body bytes).
+    """
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        if key.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+def make_requests(rng, scene, rooms, n):
+    """
+    `n` (kind, method, path, body) requests drawn from `MIX`.
+    """
+    kinds = rng.choice(list(MIX), size=n, p=list(MIX.values()))
+    out = []
+    for kind in kinds.tolist():
+        room = rooms[rng.integers(len(rooms))]
+        base = f"/scenes/{scene}"
+        if kind == "query":
+            out.append((kind, "GET", f"{base}/query?node={quote(room.name)}&depth=2", None))
+        elif kind == "bigraph":
+            out.append((kind, "GET", f"{base}/bigraph", None))
+        elif kind == "floorplan":
+            out.append((kind, "GET", f"{base}/rooms/{quote(room.name)}/floorplan.png", None))
+        else:
+            row = rng.integers(len(room.devices))
+            pos = room.devices["position"][row] + rng.uniform(-0.5, 0.5, 3)
+            out.append((kind, "POST", f"{base}/devices",
+                        {"devices": [{"id": room.devices["id"][row], "position": pos.tolist()}]}))
+    return out
+
+async def run_clients(host, port, work, clients):
+    """
+    Send `work` over `clients` connections; returns (kind, status, seconds)
+    per request and the wall time.
+    """
+    results = []
+
+    async def client(batch):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for kind, method, path, body in batch:
+                t0 = time.perf_counter()
+                status, _ = await request(reader, writer, method, path, body)
+                results.append((kind, status, time.perf_counter() - t0))
+        finally:
+            writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(work[i::clients]) for i in range(clients)))
+    return results, time.perf_counter() - t0
+
+async def check_bigraph(host, port, scene, rooms):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        status, body = await request(reader, writer, "GET", f"/scenes/{scene}/bigraph")
+    finally:
+        writer.close()
+    assert status == 200, f"GET bigraph: {status} {body[:200]!r}"
+    served = json.loads(body)
+    nodes, edges, _ = build_chunk(rooms)
+    assert sorted(n["id"] for n in served["nodes"]) == sorted(n for n, _ in nodes), "node sets differ"
+    assert sorted(map(tuple, served["edges"])) == sorted(edges), "edge sets differ"
+
+def start_service(workers):
+    proc = subprocess.Popen([sys.executable, "-m", "spatialbigraph.service", "--port", "0",
+                             "-j", str(workers)], cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if not line.startswith("serving"):
+        proc.kill()
+        raise RuntimeError(f"service did not start: {line!r}")
+    return proc, line.split()[-1]
+
+def baseline(data, runs):
+    """
+    Mean seconds for a fresh interpreter to import, parse and build.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(data, f)
+    try:
+        times = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, "-c", SCRIPT, f.name], cwd=ROOT, check=True)
+            times.append(time.perf_counter() - t0)
+        return float(np.mean(times))
+    finally:
+        os.unlink(f.name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=None, help="use a running service instead of starting one")
+    parser.add_argument("--rooms", type=int, default=50, help="rooms in the uploaded building (default: 50)")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent connections (default: 16)")
+    parser.add_argument("--requests", type=int, default=2000, help="requests in total (default: 2000)")
+    parser.add_argument("--workers", type=int, default=2, help="service worker processes (default: 2)")
+    parser.add_argument("--baseline-runs", type=int, default=3,
+                        help="script-per-call runs timed for the baseline (default: 3, 0 = skip)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    proc = None
+    url = args.url
+    if url is None:
+        proc, url = start_service(args.workers)
+    host, port = urlsplit(url).hostname, urlsplit(url).port
+    try:
+        data = generate_building(args.rooms, seed=args.seed)
+        rooms = Scene.from_dict(data).rooms
+        scene = "bench"
+
+        async def session():
+            reader, writer = await asyncio.open_connection(host, port)
+            try:
+                t0 = time.perf_counter()
+                status, body = await request(reader, writer, "POST", f"/scenes/{scene}", data)
+                assert status == 201, f"upload: {status} {body[:200]!r}"
+                upload = time.perf_counter() - t0
+            finally:
+                writer.close()
+            await check_bigraph(host, port, scene, rooms)
+            work = make_requests(np.random.default_rng(args.seed), scene, rooms, args.requests)
+            results, elapsed = await run_clients(host, port, work, args.clients)
+            reader, writer = await asyncio.open_connection(host, port)
+            try:
+                _, body = await request(reader, writer, "GET", "/metrics")
+            finally:
+                writer.close()
+            return upload, results, elapsed, json.loads(body)
+
+        upload, results, elapsed, metrics = asyncio.run(session())
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    n_devices = sum(len(room.devices) for room in rooms)
+    print(f"{args.rooms} rooms, {n_devices} devices uploaded and built in {upload * 1e3:.0f} ms; "
+          f"{len(results)} requests from {args.clients} clients in {elapsed:.2f}s "
+          f"— {len(results) / elapsed:.0f} req/s")
+    print(f"{'route':>10} {'count':>6} {'errors':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+          f"{'server p50':>11} {'server p99':>11}")
+    server_route = {"query": "query", "bigraph": "bigraph", "floorplan": "floorplan", "devices": "put_devices"}
+    errors = 0
+    for kind in MIX:
+        rows = [(status, s) for k, status, s in results if k == kind]
+        if not rows:
+            continue
+        ms = np.array([s for _, s in rows]) * 1e3
+        n_err = sum(status >= 400 for status, _ in rows)
+        errors += n_err
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+        server = metrics["routes"].get(server_route[kind], {})
+        print(f"{kind:>10} {len(rows):>6} {n_err:>7} {p50:>8.2f} {p90:>8.2f} {p99:>8.2f} "
+              f"{server.get('p50_ms', float('nan')):>11.2f} {server.get('p99_ms', float('nan')):>11.2f}")
+    cache = metrics["cache"]
+    print(f"cache: {cache['entries']} entries, {cache['bytes'] / 1e6:.1f} MB, hit rate {cache['hit_rate']:.0%}")
+    assert errors == 0, f"{errors} requests failed"
+
+    if args.baseline_runs:
+        t_script = baseline(data, args.baseline_runs)
+        print(f"script per call (import + parse + build): {t_script * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
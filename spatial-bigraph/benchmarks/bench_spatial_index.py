@@ -0,0 +1,80 @@
+"""
+Nearest-surface query latency against surface count, with and without the
+BVH from `spatialbigraph.spatial_index`.
+
+Run from the `spatial-bigraph/` folder:
+    python benchmarks/bench_spatial_index.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatialbigraph.attach import aabb_distances, rect_distances
+from spatialbigraph.spatial_index import SurfaceIndex
+
+
+def random_surfaces(n, rng):
+    """
+    `n` surfaces shaped like `build_surfaces` output, spread over a floor
+    whose area grows with `n` (roughly constant surface density).
+    """
+    side = 4.0 * np.sqrt(n)
+    surfaces = []
+    for i in range(n):
+        x, z = rng.uniform(0, side, 2)
+        if i % 3 == 0:
+            w = rng.uniform(0.5, 4.0)
+            wall = {"id": f"wall_{i}",
+                    "location": {"x": x, "y": 0.0, "z": z},
+                    "dimensions": {"width": w, "height": 2.5, "length": 0}}
+            surfaces.append(("plane", wall, np.array([x + w / 2, 1.25, z]), np.array([0, 0, 1])))
+        else:
+            c = np.array([x, rng.uniform(0.2, 1.5), z])
+            half = rng.uniform(0.1, 0.8, 3)
+            surfaces.append(("box", {"id": f"obj_{i}"}, c - half, c + half))
+    return surfaces, side
+
+
+def extent_distances(index, p):
+    """
+    Distance from one point to every surface of `index`, as it measures
+    them: walls as rectangles, objects as boxes.
+    """
+    d = aabb_distances(p[None], index.box_min, index.box_max)[0]
+    rect = index.rect_row >= 0
+    d[rect] = rect_distances(p[None], index.rect_centers, index.rect_axes, index.rect_half)[0][index.rect_row[rect]]
+    return d
+
+
+def main(sizes=(100, 1_000, 10_000, 50_000), n_queries=200, seed=0):
+    rng = np.random.default_rng(seed)
+    print(f"{'surfaces':>9} {'build ms':>9} {'brute us/q':>11} {'bvh us/q':>9} {'speedup':>8}")
+    for n in sizes:
+        surfaces, side = random_surfaces(n, rng)
+        pts = np.column_stack([rng.uniform(0, side, n_queries),
+                               rng.uniform(0, 2.5, n_queries),
+                               rng.uniform(0, side, n_queries)])
+
+        t0 = time.perf_counter()
+        index = SurfaceIndex(surfaces)
+        build = time.perf_counter() - t0
+
+        # Without the index: one point at a time against every extent
+        t0 = time.perf_counter()
+        brute = [extent_distances(index, p).argmin() for p in pts]
+        t_brute = (time.perf_counter() - t0) / n_queries
+
+        t0 = time.perf_counter()
+        idx, _ = index.query(pts, k=1)
+        t_bvh = (time.perf_counter() - t0) / n_queries
+
+        assert np.array_equal(idx[:, 0], brute), "BVH and brute force disagree"
+        print(f"{n:>9} {build * 1e3:>9.1f} {t_brute * 1e6:>11.1f} {t_bvh * 1e6:>9.1f} {t_brute / t_bvh:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Startup time of the non-plotting `python -m spatialbigraph` commands in
+fresh interpreters, against the imports every bigraph script pays first.
+
+Each command runs `--runs` times (best and median kept) plus once under
+`-X importtime`. The run fails when one of them imports NetworkX or
+matplotlib, or when a headless `build` starts slower than merely importing
+what `bigraphs_with_planes.py` imports (`networkx`, `matplotlib.pyplot`,
+`networkx.drawing.nx_pydot`), so it doubles as a check that needs no CI.
+
+Run from the `spatial-bigraph/` folder:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py Jsons/floor.json --runs 10
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatialbigraph.cli import startup_commands, startup_time
+
+SCRIPT_IMPORTS = "import networkx, matplotlib.pyplot, networkx.drawing.nx_pydot"
+
+
+def script_imports(runs):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", SCRIPT_IMPORTS], check=True)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", nargs="?", default="Jsons/floor.json",
+                        help="RoomPlan JSON the commands run on (default: Jsons/floor.json)")
+    parser.add_argument("--runs", type=int, default=5, help="runs per command (default: 5)")
+    args = parser.parse_args(argv)
+
+    t_scripts = script_imports(args.runs)
+    print(f"{'command':<48} {'best ms':>8} {'median ms':>10}  heavy imports")
+    print(f"{'(script imports only)':<48} {t_scripts * 1e3:>8.0f} {'':>10}  networkx, matplotlib")
+    failures = []
+    for command in startup_commands(args.input):
+        report = startup_time(command, runs=args.runs)
+        print(f"{' '.join(command):<48} {report['best'] * 1e3:>8.0f} {report['median'] * 1e3:>10.0f}  "
+              f"{', '.join(report['heavy']) or '-'}")
+        if report["heavy"]:
+            failures.append(f"{command[0]} imports {', '.join(report['heavy'])}")
+        if command[0] == "build" and report["best"] >= t_scripts:
+            failures.append(f"build starts in {report['best'] * 1e3:.0f} ms, "
+                            f"no faster than the script imports ({t_scripts * 1e3:.0f} ms)")
+    assert not failures, "; ".join(failures)
+
+
+if __name__ == "__main__":
+    main()
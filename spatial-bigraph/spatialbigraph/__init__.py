@@ -0,0 +1,51 @@
+"""
+Reusable building blocks for the spatial bigraph scripts.
+
+The top-level scripts (`bigraphs_with_planes.py`, `bigraphs_with_centroid.py`,
+...) stay runnable as before; the heavy lifting they share lives here so it can
+be imported without executing a whole script. `python -m spatialbigraph` is the
+command line over the same pieces (see `cli.py`).
+
+Names are imported from their submodule on first access, so `import
+spatialbigraph` (and every command that needs neither) stays free of NetworkX
+and matplotlib.
+"""
+import importlib
+
+# Public name → submodule defining it
+_EXPORTS = {
+    "PackedSurfaces": "attach", "distance_matrix": "attach", "nearest_parents": "attach", "rect_distances": "attach",
+    "add_room": "bigraph", "attach_devices": "bigraph", "build_bigraph": "bigraph", "build_room": "bigraph",
+    "build_surfaces": "geometry", "rectangle_frames": "geometry", "surface_rectangle": "geometry",
+    "to_vec": "geometry", "to_xyz": "geometry",
+    "Room": "scene", "Scene": "scene",
+    "SurfaceIndex": "spatial_index", "surface_bounds": "spatial_index",
+    "stream_rooms": "loader", "stream_scene": "loader", "top_level_members": "loader",
+    "EdgeDiff": "incremental", "LiveBigraph": "incremental",
+    "BigraphCache": "cache", "cached_bigraph": "cache",
+    "PlaceForest": "forest", "build_forest": "forest",
+    "TreeLayout": "layout", "hierarchy_layout": "layout",
+    "BigraphIndex": "query",
+    "ReactionEngine": "reaction", "Rule": "reaction",
+    "LinkGraph": "links", "build_link_graph": "links", "scene_devices": "links",
+    "MeshIndex": "mesh", "TriangleMesh": "mesh", "fit_to_room": "mesh", "load_usdz": "mesh",
+    "RoomLocator": "rooms", "locate_devices": "rooms", "room_polygon": "rooms",
+    "Adjacency": "adjacency", "add_room_links": "adjacency", "room_adjacency": "adjacency",
+    "CentroidTree": "centroids", "centroid_parents": "centroids", "element_centroids": "centroids",
+    "BigraphHistory": "history", "BigraphVersion": "history", "VersionDiff": "history",
+    "LevelOfDetail": "lod", "LodView": "lod",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
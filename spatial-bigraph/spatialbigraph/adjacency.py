@@ -0,0 +1,186 @@
+"""
+Which rooms of a floor share a wall or open into each other through a door.
+
+Every wall and door of every room becomes an axis-aligned plan segment
+(`rooms.wall_segments` / `rooms.opening_segments`). Two segments of
+different rooms touch when they run along the same axis on lines at most
+`tol` apart and overlap by at least `min_overlap` along it. Segments are
+hashed into grid cells (axis, line cell, span cell), so only segments in
+the same or the next line cell are ever compared; there is no all-pairs
+pass over the floor's walls.
+
+    rooms = Scene.load("Jsons/floor.json").rooms
+    adjacency = room_adjacency(rooms)   # [Adjacency("Bathroom", "Meeting Room", "wall", 2.2, ...)]
+    add_room_links(G, adjacency)        # G.graph["links"]["wall:Bathroom|Meeting Room"]
+
+Rooms must share one coordinate frame, as in a multi-room export of one
+scan; rooms scanned separately all sit near the origin and would touch
+everywhere.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from .profiling import count, stage
+from .rooms import WALL_TOL, opening_segments, wall_segments
+
+# Touching wall/door pair between two rooms. `kind` is "door" when either
+# side is a door, else "wall"; `overlap` is the shared length in metres
+Adjacency = namedtuple("Adjacency", "room_a room_b kind overlap element_a element_b")
+
+# One row per wall/door segment of the floor
+SEGMENT_DTYPE = np.dtype([
+    ("room",    np.intp),    # room, numbered by first appearance of its name
+    ("id",      "U64"),      # element id
+    ("door",    bool),
+    ("axis",    np.int8),    # 0: runs along x, 1: along z
+    ("line",    float),      # the fixed coordinate (z for axis 0, x for axis 1)
+    ("lo",      float),      # extent along the axis
+    ("hi",      float),
+])
+
+# ─── Segments ────────────────────────────────────────────────────────────────
+
+def floor_segments(rooms, tol=WALL_TOL):
+    """
+    SEGMENT_DTYPE array of every wall and door of `rooms`, and the room
+    names its `room` field numbers.
+
+    Rooms are keyed by name: a room that comes again (a file listing it
+    twice, or several files of one floor) is the same room, and only
+    elements it did not have yet are added.
+    """
+    parts, names, seen = [], {}, set()
+    with stage("segments"):
+        for room in rooms:
+            row = names.setdefault(room.name, len(names))
+            ids = room.walls["id"].tolist() + room.doors["id"].tolist()
+            new = np.array([(row, i) not in seen for i in ids], dtype=bool)
+            if not new.any():
+                continue
+            seen.update((row, i) for i in ids)
+            walls = wall_segments(room, tol)
+            doors = opening_segments(room, "doors", walls, tol)
+            seg = np.concatenate([walls, doors])[new]
+            out = np.zeros(len(seg), dtype=SEGMENT_DTYPE)
+            out["room"] = row
+            out["id"] = np.array(ids)[new]
+            out["door"] = (np.arange(len(ids)) >= len(walls))[new]
+            d = np.abs(seg[:, 1] - seg[:, 0])
+            axis = (d[:, 1] > d[:, 0]).astype(np.int8)
+            out["axis"] = axis
+            rows = np.arange(len(seg))
+            out["line"] = seg[rows, 0, 1 - axis]
+            out["lo"] = seg[rows, :, axis].min(axis=1)
+            out["hi"] = seg[rows, :, axis].max(axis=1)
+            parts.append(out)
+    segments = np.concatenate(parts) if parts else np.zeros(0, dtype=SEGMENT_DTYPE)
+    return segments, list(names)
+
+
+# ─── Touching Pairs ──────────────────────────────────────────────────────────
+
+def touching_pairs(segments, tol=WALL_TOL, min_overlap=0.1, cell=None):
+    """
+    Every pair (i < j) of segments of different rooms on the same axis, on
+    lines at most `tol` apart, overlapping by at least `min_overlap`.
+    Returns (i, j, overlap) arrays.
+
+    A segment is entered once per `cell`-long span cell it covers (default:
+    the median segment length), keyed by axis, line cell and span cell;
+    pairs come from equal keys and from keys one line cell apart.
+    """
+    n = len(segments)
+    empty = np.zeros(0, dtype=np.intp)
+    if n < 2:
+        return empty, empty, np.zeros(0)
+    lo, hi, line = segments["lo"], segments["hi"], segments["line"]
+    if cell is None:
+        cell = float(np.median(hi - lo))
+    cell = max(cell, 2 * tol, 1e-3)
+
+    ci = np.floor(line / cell).astype(np.int64)
+    a0 = np.floor(lo / cell).astype(np.int64)
+    a1 = np.floor(hi / cell).astype(np.int64)
+    ci -= ci.min() - 1
+    a1 -= a0.min()
+    a0 -= a0.min()
+    n_line, n_span = int(ci.max()) + 2, int(a1.max()) + 1
+
+    # One entry per (segment, span cell)
+    spans = a1 - a0 + 1
+    seg = np.repeat(np.arange(n), spans)
+    span = np.repeat(a0 - np.cumsum(spans) + spans, spans) + np.arange(spans.sum())
+    key = (segments["axis"][seg].astype(np.int64) * n_line + ci[seg]) * n_span + span
+    order = np.argsort(key, kind="stable")
+    cell_keys, starts, sizes = np.unique(key[order], return_index=True, return_counts=True)
+
+    pi, pj = [], []
+    for delta in (0, n_span):
+        k = np.minimum(np.searchsorted(cell_keys, cell_keys + delta), len(cell_keys) - 1)
+        has = cell_keys[k] == cell_keys + delta
+        a, b = np.flatnonzero(has), k[has]
+        na, nb = sizes[a], sizes[b]
+        total = na * nb
+        pair = np.repeat(np.arange(len(a)), total)
+        m = np.arange(total.sum()) - np.repeat(np.cumsum(total) - total, total)
+        i = seg[order[starts[a][pair] + m // nb[pair]]]
+        j = seg[order[starts[b][pair] + m % nb[pair]]]
+        keep = segments["room"][i] != segments["room"][j]
+        if not delta:
+            keep &= i < j
+        pi.append(i[keep])
+        pj.append(j[keep])
+    i, j = np.concatenate(pi), np.concatenate(pj)
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    # Segments sharing several span cells meet once per cell
+    code = np.unique(i * n + j)
+    i, j = code // n, code % n
+    count("segment_pairs", len(i))
+
+    overlap = np.minimum(hi[i], hi[j]) - np.maximum(lo[i], lo[j])
+    near = (np.abs(line[i] - line[j]) <= tol) & (overlap >= min_overlap)
+    return i[near], j[near], overlap[near]
+
+
+# ─── Room Adjacency ──────────────────────────────────────────────────────────
+
+def room_adjacency(rooms, tol=WALL_TOL, min_overlap=0.1, cell=None):
+    """
+    `Adjacency` records for every touching wall/door pair between rooms
+    of different names, room names in `rooms` order within each record.
+    """
+    segments, names = floor_segments(rooms, tol)
+    with stage("adjacency"):
+        i, j, overlap = touching_pairs(segments, tol, min_overlap, cell)
+    # Room order within each pair follows the `rooms` list
+    swap = segments["room"][i] > segments["room"][j]
+    i, j = np.where(swap, j, i), np.where(swap, i, j)
+    door = segments["door"][i] | segments["door"][j]
+    return [Adjacency(names[ra], names[rb], "door" if d else "wall", ov, ea, eb)
+            for ra, rb, d, ov, ea, eb in zip(segments["room"][i].tolist(), segments["room"][j].tolist(),
+                                              door.tolist(), overlap.tolist(),
+                                              segments["id"][i].tolist(), segments["id"][j].tolist())]
+
+def room_links(adjacency):
+    """
+    {"<kind>:<room a>|<room b>": frozenset of the two rooms and the walls or
+    doors they touch through}, one link per room pair and kind.
+    """
+    links = {}
+    for adj in adjacency:
+        name = f"{adj.kind}:{adj.room_a}|{adj.room_b}"
+        links[name] = links.get(name, frozenset()) | {adj.room_a, adj.room_b, adj.element_a, adj.element_b}
+    return links
+
+def add_room_links(G, adjacency):
+    """
+    Record the room-to-room links of `adjacency` on a built bigraph, in
+    `G.graph["links"]` ({link name: frozenset of node ids}, as reaction
+    `Link`s are kept), so the place graph itself stays a forest. Returns
+    the links added.
+    """
+    links = room_links(adjacency)
+    G.graph.setdefault("links", {}).update(links)
+    count("room_links", len(links))
+    return links
@@ -0,0 +1,241 @@
+import numpy as np
+
+from .profiling import count
+
+# ─── Surface Packing ─────────────────────────────────────────────────────────
+
+class PackedSurfaces:
+    """
+    The tuple list from `build_surfaces` split into contiguous arrays:
+
+      plane_points, plane_normals  (N,3)  one row per ("plane", ...) entry
+      rect_centers                 (R,3)  one row per ("rect", ...) entry,
+      rect_axes, rect_half  (R,2,3), (R,2)  with its in-plane axes/extents
+      box_min, box_max             (M,3)  one row per ("box", ...) entry
+      plane_cols, rect_cols, box_cols  column of each row in the original list
+      objects                      the source object dict of every column
+
+    Columns keep the order of the input list so that ties are broken exactly
+    like the original per-device loop (first surface wins).
+    """
+
+    def __init__(self, surfaces):
+        self.objects = [obj for _, obj, *_ in surfaces]
+        self.kinds = [kind for kind, *_ in surfaces]
+
+        plane_rows = [(i, s) for i, s in enumerate(surfaces) if s[0] == "plane"]
+        rect_rows  = [(i, s) for i, s in enumerate(surfaces) if s[0] == "rect"]
+        box_rows   = [(i, s) for i, s in enumerate(surfaces) if s[0] not in ("plane", "rect")]
+
+        self.plane_cols = np.array([i for i, _ in plane_rows], dtype=np.intp)
+        self.plane_points = np.array(
+            [s[2] for _, s in plane_rows], dtype=float).reshape(-1, 3)
+        self.plane_normals = np.array(
+            [s[3] for _, s in plane_rows], dtype=float).reshape(-1, 3)
+        # n·p0 per plane, so a distance is just |points @ n - offset|
+        self.plane_offsets = np.einsum("ij,ij->i", self.plane_points, self.plane_normals)
+
+        self.rect_cols = np.array([i for i, _ in rect_rows], dtype=np.intp)
+        self.rect_centers = np.array([s[2] for _, s in rect_rows], dtype=float).reshape(-1, 3)
+        self.rect_axes = np.array([s[3] for _, s in rect_rows], dtype=float).reshape(-1, 2, 3)
+        self.rect_half = np.array([s[4] for _, s in rect_rows], dtype=float).reshape(-1, 2)
+
+        self.box_cols = np.array([i for i, _ in box_rows], dtype=np.intp)
+        self.box_min = np.array([s[2] for _, s in box_rows], dtype=float).reshape(-1, 3)
+        self.box_max = np.array([s[3] for _, s in box_rows], dtype=float).reshape(-1, 3)
+
+    @classmethod
+    def from_columns(cls, objects, plane_points, plane_normals, box_min, box_max,
+                     rect_centers=(), rect_axes=(), rect_half=()):
+        """
+        Build from arrays directly: the first N columns are the planes, the
+        next R the rectangles (none unless given), the remaining M the
+        boxes. `objects` holds whatever should come back as the parent of
+        each column (ids, dicts, ...).
+        """
+        self = cls.__new__(cls)
+        n, r, m = len(plane_points), len(rect_centers), len(box_min)
+        self.objects = list(objects)
+        self.kinds = ["plane"] * n + ["rect"] * r + ["box"] * m
+        self.plane_cols = np.arange(n, dtype=np.intp)
+        self.plane_points = np.asarray(plane_points, dtype=float).reshape(-1, 3)
+        self.plane_normals = np.asarray(plane_normals, dtype=float).reshape(-1, 3)
+        self.plane_offsets = np.einsum("ij,ij->i", self.plane_points, self.plane_normals)
+        self.rect_cols = np.arange(n, n + r, dtype=np.intp)
+        self.rect_centers = np.asarray(rect_centers, dtype=float).reshape(-1, 3)
+        self.rect_axes = np.asarray(rect_axes, dtype=float).reshape(-1, 2, 3)
+        self.rect_half = np.asarray(rect_half, dtype=float).reshape(-1, 2)
+        self.box_cols = np.arange(n + r, n + r + m, dtype=np.intp)
+        self.box_min = np.asarray(box_min, dtype=float).reshape(-1, 3)
+        self.box_max = np.asarray(box_max, dtype=float).reshape(-1, 3)
+        return self
+
+    def __len__(self):
+        return len(self.objects)
+
+    def copy(self):
+        """
+        An independent copy, so `append` on it leaves this one (e.g. a
+        `Room`'s cached surfaces) as it was.
+        """
+        other = self.__class__.__new__(self.__class__)
+        for name, value in vars(self).items():
+            setattr(other, name, value.copy())
+        return other
+
+    def append(self, kind, obj, a, b, c=None):
+        """
+        Add one surface as the last column, in `build_surfaces` terms
+        (plane point + normal, rectangle centre + axes + half extents, or
+        box min + max). Returns its column.
+        """
+        col = len(self.objects)
+        self.objects.append(obj)
+        self.kinds.append(kind)
+        a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+        if kind == "rect":
+            self.rect_cols = np.append(self.rect_cols, col)
+            self.rect_centers = np.vstack([self.rect_centers, a])
+            self.rect_axes = np.concatenate([self.rect_axes, b.reshape(1, 2, 3)])
+            self.rect_half = np.vstack([self.rect_half, np.asarray(c, dtype=float)])
+        elif kind == "plane":
+            self.plane_cols = np.append(self.plane_cols, col)
+            self.plane_points = np.vstack([self.plane_points, a])
+            self.plane_normals = np.vstack([self.plane_normals, b])
+            self.plane_offsets = np.append(self.plane_offsets, a @ b)
+        else:
+            self.box_cols = np.append(self.box_cols, col)
+            self.box_min = np.vstack([self.box_min, a])
+            self.box_max = np.vstack([self.box_max, b])
+        return col
+
+
+# ─── Batched Distance Kernels ────────────────────────────────────────────────
+
+def plane_distances(points, plane_normals, plane_offsets):
+    """
+    Unsigned distance from every point (D,3) to every infinite plane (N,3).
+    Returns a (D,N) matrix.
+    """
+    return np.abs(points @ plane_normals.T - plane_offsets)
+
+
+def aabb_distances(points, box_min, box_max):
+    """
+    Shortest distance from every point (D,3) to every axis-aligned box (M,3).
+    Returns a (D,M) matrix; points inside a box get 0.
+    """
+    p = points[:, None, :]
+    d = np.maximum(np.maximum(box_min[None] - p, 0.0), p - box_max[None])
+    return np.sqrt(np.einsum("ijk,ijk->ij", d, d))
+
+
+def rect_distances(points, centers, axes, half):
+    """
+    Exact distance from every point (D,3) to every finite rectangle (R,):
+    `centers` (R,3), orthonormal in-plane `axes` (R,2,3) and `half`
+    extents (R,2). Returns a (D,R) matrix; points on a rectangle get 0.
+
+    The offset along each rectangle's normal and along its two axes are
+    three (D,R) matrix products; the axis coordinates only count beyond
+    the half extents. Everything after the products runs in place.
+    """
+    normals = np.cross(axes[:, 0], axes[:, 1])
+    d2 = points @ normals.T
+    d2 -= np.einsum("ij,ij->i", centers, normals)
+    d2 *= d2
+    for k in range(2):
+        s = points @ axes[:, k].T
+        s -= np.einsum("ij,ij->i", centers, axes[:, k])
+        np.abs(s, out=s)
+        s -= half[:, k]
+        np.maximum(s, 0.0, out=s)
+        s *= s
+        d2 += s
+    return np.sqrt(d2, out=d2)
+
+
+def distance_matrix(points, packed):
+    """
+    Full device×surface distance matrix (D,S) for `points` against a
+    `PackedSurfaces`, with columns in the order of the original surface list.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    out = np.empty((len(points), len(packed)))
+    count("distance_evaluations", out.size)
+    if len(packed.plane_cols):
+        out[:, packed.plane_cols] = plane_distances(
+            points, packed.plane_normals, packed.plane_offsets)
+    if len(packed.rect_cols):
+        out[:, packed.rect_cols] = rect_distances(
+            points, packed.rect_centers, packed.rect_axes, packed.rect_half)
+    if len(packed.box_cols):
+        out[:, packed.box_cols] = aabb_distances(points, packed.box_min, packed.box_max)
+    return out
+
+
+def nearest_surfaces(points, packed, chunk=4096):
+    """
+    Column index and distance of the closest surface for every point.
+
+    Points are processed `chunk` rows at a time so the temporary distance
+    matrix stays bounded on building-scale device lists.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    idx = np.full(len(points), -1, dtype=np.intp)
+    dist = np.full(len(points), np.inf)
+    if len(packed) == 0:
+        return idx, dist
+
+    for start in range(0, len(points), chunk):
+        block = distance_matrix(points[start:start + chunk], packed)
+        best = block.argmin(axis=1)
+        idx[start:start + chunk] = best
+        dist[start:start + chunk] = block[np.arange(len(best)), best]
+    return idx, dist
+
+
+def nearest_parents(points, surfaces):
+    """
+    Attach every device position to its nearest surface in one call.
+
+    `surfaces` is either the list returned by `build_surfaces`, an already
+    built `PackedSurfaces`, or a `spatial_index.SurfaceIndex`, which answers
+    through its tree instead of comparing every device with every surface.
+    Returns `(parents, distances)` where `parents[i]` is the object dict the
+    i-th device should hang off (None when there are no surfaces at all).
+    """
+    from .spatial_index import SurfaceIndex
+
+    if isinstance(surfaces, SurfaceIndex):
+        idx, dist = surfaces.query(points, k=1)
+        idx, dist = idx[:, 0], dist[:, 0]
+    else:
+        surfaces = surfaces if isinstance(surfaces, PackedSurfaces) else PackedSurfaces(surfaces)
+        idx, dist = nearest_surfaces(points, surfaces)
+    parents = [surfaces.objects[i] if i >= 0 else None for i in idx]
+    return parents, dist
+
+
+def nearest_centroids(points, centroids, chunk=4096):
+    """
+    Row of the closest centroid and its Euclidean distance for every point,
+    the attachment rule of `bigraphs_with_centroid.py` (-1 / inf when there
+    are no centroids). Points go `chunk` rows at a time, as in
+    `nearest_surfaces`.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    centroids = np.asarray(centroids, dtype=float).reshape(-1, 3)
+    idx = np.full(len(points), -1, dtype=np.intp)
+    dist = np.full(len(points), np.inf)
+    if len(centroids) == 0:
+        return idx, dist
+
+    for start in range(0, len(points), chunk):
+        d = points[start:start + chunk, None, :] - centroids[None, :, :]
+        d2 = np.einsum("ijk,ijk->ij", d, d)
+        count("distance_evaluations", d2.size)
+        best = d2.argmin(axis=1)
+        idx[start:start + chunk] = best
+        dist[start:start + chunk] = np.sqrt(d2[np.arange(len(best)), best])
+    return idx, dist
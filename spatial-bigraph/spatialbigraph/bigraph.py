@@ -0,0 +1,73 @@
+import networkx as nx
+
+from .attach import nearest_parents
+from .geometry import to_xyz
+from .profiling import count, stage
+
+# Bump whenever `build_room` / the attachment rule changes what it produces;
+# cached graphs built by an older version are then ignored.
+ALGORITHM_VERSION = 2
+
+# ─── Graph Building Helpers ─────────────────────────────────────────────────
+
+#Add node with attributes
+def add_node(graph, node_id, label, **attrs):
+    graph.add_node(node_id, label=label, **attrs)
+
+def add_room(G, room):
+    """
+    Add `room` as a root node with its walls, doors, windows and objects as
+    first-level children.
+    """
+    add_node(G, room.name, label=room.name)
+    for node_id, label in zip(room.elements["id"].tolist(), room.labels()):
+        add_node(G, node_id, label, position=room.position(node_id))
+        G.add_edge(room.name, node_id)
+
+def attach_devices(G, room, index=False):
+    """
+    Add the room's IoT devices as second-level nodes, each under the nearest
+    plane (walls/doors/windows) or object box. With `index`, the search goes
+    through the room's `SurfaceIndex` instead, which needs bounded surfaces:
+    walls/doors/windows are then their finite rectangles, as with
+    `Room.surfaces(finite=True)`.
+
+    Without `index` walls/doors/windows are infinite planes, so a device is
+    measured to the plane a wall lies in and not to the wall itself: it can
+    hang off a wall at the far end of the room that shares the plane of one
+    it is next to.
+    """
+    devs = room.devices
+    with stage("attach", room=room.name):
+        parents, _ = nearest_parents(devs["position"], room.surface_index() if index else room.surfaces())
+    count("devices", len(devs), room=room.name)
+    for dev_id, name, pos, parent_id in zip(devs["id"].tolist(), devs["name"].tolist(),
+                                            devs["position"], parents):
+        add_node(G, dev_id, label=name or "IoT Device", position=to_xyz(pos))
+        G.add_edge(parent_id or "<unknown>", dev_id)
+
+def build_room(room, G=None, index=False):
+    """
+    Place graph of one room (room → element → device). Builds into `G` when
+    given, otherwise into a fresh DiGraph, and returns it. `index` as in
+    `attach_devices`.
+    """
+    G = nx.DiGraph() if G is None else G
+    with stage("build_room", room=room.name):
+        n0 = G.number_of_nodes()
+        add_room(G, room)
+        attach_devices(G, room, index)
+        count("nodes", G.number_of_nodes() - n0)
+        # One edge per element and device; G.number_of_edges() would walk
+        # the whole graph on every room
+        count("edges", len(room.elements) + len(room.devices))
+    return G
+
+def build_bigraph(rooms, G=None, index=False):
+    """
+    Build (or extend `G` with) the place graph of every room in `rooms`.
+    """
+    G = nx.DiGraph() if G is None else G
+    for room in rooms:
+        build_room(room, G, index)
+    return G
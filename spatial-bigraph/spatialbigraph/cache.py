@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import networkx as nx
+import numpy as np
+
+from .attach import PackedSurfaces
+from .bigraph import ALGORITHM_VERSION, build_room
+from .geometry import to_xyz
+from .loader import stream_scene
+from .scene import room_name_from_path
+
+# Layout of the files below; bump when it changes
+FORMAT_VERSION = 1
+
+DEFAULT_CACHE_DIR = ".bigraph_cache"
+
+NODE_DTYPE = np.dtype([
+    ("id",       "U64"),
+    ("label",    "U64"),
+    ("position", "f8", 3),   # NaN for nodes without a position (rooms)
+])
+
+# Every array lives in one `arrays.bin` buffer; the manifest records each
+# one's offset and shape. One mmap per entry instead of one .npy per array
+# keeps a warm load to a few syscalls.
+_DTYPES = {
+    "plane_points":  np.dtype("f8"),
+    "plane_normals": np.dtype("f8"),
+    "box_min":       np.dtype("f8"),
+    "box_max":       np.dtype("f8"),
+    "surface_ids":   np.dtype("U64"),
+    "nodes":         NODE_DTYPE,
+    "edges":         np.dtype("i4"),
+}
+_ALIGN = 64
+
+# ─── Keys ────────────────────────────────────────────────────────────────────
+
+def source_key(path, block_size=1 << 20):
+    """
+    Content hash of a RoomPlan JSON, salted with the cache format and the
+    attachment algorithm version so either change invalidates old entries,
+    and with the name a single-`room` export takes from its path
+    (`room_name_from_path`), so equal contents under other names do not
+    share an entry.
+    """
+    salt = f"format={FORMAT_VERSION};algorithm={ALGORITHM_VERSION};room={room_name_from_path(path)};"
+    h = hashlib.sha256(salt.encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ─── Cached Entry ────────────────────────────────────────────────────────────
+
+class CachedScene:
+    """
+    One cache entry: the built bigraph of a source file as a node table plus
+    int edge list, and every room's surface arrays. The arrays are read-only
+    views into a memory-mapped buffer, so loading only reads the manifest.
+    """
+
+    def __init__(self, entry_dir):
+        self.entry_dir = entry_dir
+        with open(os.path.join(entry_dir, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        buf = np.memmap(os.path.join(entry_dir, "arrays.bin"), dtype=np.uint8, mode="r")
+        for name, (offset, shape) in self.manifest["arrays"].items():
+            dtype = _DTYPES[name]
+            count = int(np.prod(shape))
+            setattr(self, name, np.frombuffer(buf, dtype=dtype, count=count, offset=offset).reshape(shape))
+        self.rooms = {room["name"]: room for room in self.manifest["rooms"]}
+
+    @property
+    def room_names(self):
+        return list(self.rooms)
+
+    def surfaces(self, room_name):
+        """
+        `PackedSurfaces` of one room, sliced from the cached arrays.
+        """
+        room = self.rooms[room_name]
+        p0, p1 = room["planes"]
+        b0, b1 = room["boxes"]
+        s0 = room["columns"]
+        return PackedSurfaces.from_columns(
+            self.surface_ids[s0:s0 + (p1 - p0) + (b1 - b0)].tolist(),
+            plane_points=self.plane_points[p0:p1],
+            plane_normals=self.plane_normals[p0:p1],
+            box_min=self.box_min[b0:b1],
+            box_max=self.box_max[b0:b1],
+        )
+
+    def graph(self):
+        """
+        Rebuild the NetworkX DiGraph from the node table and edge list.
+        """
+        G = nx.DiGraph()
+        ids = self.nodes["id"].tolist()
+        pos = np.asarray(self.nodes["position"])
+        has_pos = ~np.isnan(pos).any(axis=1)
+        for node_id, label, p, ok in zip(ids, self.nodes["label"].tolist(), pos, has_pos.tolist()):
+            if ok:
+                G.add_node(node_id, label=label, position=to_xyz(p))
+            else:
+                G.add_node(node_id, label=label)
+        G.add_edges_from((ids[u], ids[v]) for u, v in np.asarray(self.edges).tolist())
+        return G
+
+
+# ─── Cache ───────────────────────────────────────────────────────────────────
+
+class BigraphCache:
+    """
+    On-disk cache of built bigraphs keyed by `source_key`.
+
+    `get(path)` returns a `CachedScene`, building and storing it on a miss.
+    Entries are written to a temp dir and renamed into place, so a crashed
+    or concurrent writer never leaves a half-written entry behind.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def entry_dir(self, path):
+        return os.path.join(self.cache_dir, source_key(path))
+
+    def load(self, path):
+        """
+        The cached entry for `path`, or None when there is none for its
+        current contents.
+        """
+        entry = self.entry_dir(path)
+        if not os.path.exists(os.path.join(entry, "manifest.json")):
+            return None
+        return CachedScene(entry)
+
+    def get(self, path):
+        cached = self.load(path)
+        return cached if cached is not None else self.store(path)
+
+    def store(self, path):
+        """
+        Build the bigraph of `path` and write it to the cache.
+        """
+        G = nx.DiGraph()
+        rooms, surfaces, seen = [], [], set()
+        counts = {"planes": 0, "boxes": 0, "columns": 0}
+        for room in stream_scene(path):
+            build_room(room, G)
+            if room.name in seen:
+                continue  # listed twice in the file
+            seen.add(room.name)
+            packed = room.surfaces()
+            n_planes, n_boxes = len(packed.plane_cols), len(packed.box_cols)
+            rooms.append({
+                "name": room.name,
+                "planes": [counts["planes"], counts["planes"] + n_planes],
+                "boxes": [counts["boxes"], counts["boxes"] + n_boxes],
+                "columns": counts["columns"],
+            })
+            counts["planes"] += n_planes
+            counts["boxes"] += n_boxes
+            counts["columns"] += len(packed)
+            surfaces.append(packed)
+
+        arrays = _surface_arrays(surfaces)
+        arrays.update(_graph_arrays(G))
+        manifest = {
+            "arrays": {},
+            "source": os.path.abspath(path),
+            "format": FORMAT_VERSION,
+            "algorithm": ALGORITHM_VERSION,
+            "rooms": rooms,
+            "nodes": G.number_of_nodes(),
+            "edges": G.number_of_edges(),
+        }
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = self.entry_dir(path)
+        tmp = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-")
+        try:
+            with open(os.path.join(tmp, "arrays.bin"), "wb") as f:
+                # Leading pad so the buffer is never empty (np.memmap refuses that)
+                f.write(b"\0" * _ALIGN)
+                for name, arr in arrays.items():
+                    arr = np.ascontiguousarray(arr, dtype=_DTYPES[name])
+                    f.write(b"\0" * (-f.tell() % _ALIGN))
+                    manifest["arrays"][name] = [f.tell(), list(arr.shape)]
+                    f.write(arr.tobytes())
+            with open(os.path.join(tmp, "manifest.json"), "w") as f:
+                json.dump(manifest, f)
+            os.replace(tmp, entry)
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.exists(entry):
+                raise
+        return CachedScene(entry)
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+def _surface_arrays(surfaces):
+    def stack(attr, cols=3):
+        parts = [getattr(p, attr) for p in surfaces]
+        return np.concatenate(parts) if parts else np.zeros((0, cols))
+
+    ids = [obj for p in surfaces for obj in p.objects]
+    return {
+        "plane_points": stack("plane_points"),
+        "plane_normals": stack("plane_normals"),
+        "box_min": stack("box_min"),
+        "box_max": stack("box_max"),
+        "surface_ids": np.array(ids, dtype="U64"),
+    }
+
+def _graph_arrays(G):
+    nodes = np.zeros(G.number_of_nodes(), dtype=NODE_DTYPE)
+    nodes["position"] = np.nan
+    row = {}
+    for i, (node_id, attrs) in enumerate(G.nodes(data=True)):
+        row[node_id] = i
+        nodes[i]["id"] = node_id
+        nodes[i]["label"] = attrs.get("label", "")
+        pos = attrs.get("position")
+        if pos:
+            nodes[i]["position"] = (pos["x"], pos["y"], pos["z"])
+    edges = np.array([(row[u], row[v]) for u, v in G.edges()], dtype=np.int32).reshape(-1, 2)
+    return {"nodes": nodes, "edges": edges}
+
+
+def cached_bigraph(path, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Bigraph of `path`, from the cache when its contents were built before.
+    """
+    return BigraphCache(cache_dir).get(path).graph()
@@ -0,0 +1,189 @@
+"""
+Centroid attachment: every IoT device under the element whose centroid is
+nearest, the rule of `bigraphs_with_centroid.py`, answered with a KD-tree.
+
+    centroids = element_centroids(room)                 # (N,3), `elements` order
+    rows, dist = CentroidTree(centroids).query(room.devices["position"], k=3)
+    parents, dist = centroid_parents(room)              # nearest, as element ids
+
+Walls, doors and windows are exported as a corner plus (width, height,
+length), so their centroid is the corner + half extents (the `transform`
+centre when there is one), the script's own rule; an object's `location`
+already is its centroid. Both are the `centroid` column `Room` fills while
+loading, so nothing is recomputed per attach. `chain=True` instead puts
+walls, doors and windows at the midpoint of the plan segment `rooms.py`
+resolves for them, which follows the wall chain but searches it again on
+every call. All devices are answered by one batched query, instead of one
+scan over every element per device.
+"""
+import numpy as np
+
+from .profiling import count, stage
+from .rooms import WALL_TOL, opening_segments, wall_segments
+
+# ─── Centroids ───────────────────────────────────────────────────────────────
+
+def element_centroids(room, tol=WALL_TOL, chain=False):
+    """
+    (N,3) centroid of every element of `room`, rows in `elements` order.
+
+    Walls, doors and windows sit at their corner + half extents, objects at
+    their `location`. With `chain=True` walls, doors and windows sit at the
+    middle of their resolved plan segment (`tol` as in `rooms.wall_segments`),
+    raised by half their height.
+    """
+    out = room.elements["centroid"].copy()
+    n = room.n_planes
+    if chain and n:
+        walls = wall_segments(room, tol)
+        segments = np.concatenate([walls, opening_segments(room, "doors", walls, tol),
+                                   opening_segments(room, "windows", walls, tol)])
+        planes = room.elements[:n]
+        out[:n, 0], out[:n, 2] = segments.mean(axis=1).T
+        out[:n, 1] = planes["location"][:, 1] + 0.5 * planes["dimensions"][:, 1]
+    return out
+
+
+# ─── KD-Tree ─────────────────────────────────────────────────────────────────
+
+def _box_dist2(points, lo, hi):
+    d = np.maximum(np.maximum(lo - points, points - hi), 0.0)
+    return np.einsum("ij,ij->i", d, d)
+
+class CentroidTree:
+    """
+    KD-tree over (N,3) points for batched k-nearest queries.
+
+    A complete binary tree in heap order (children of node k are 2k+1,
+    2k+2) over `leaf_size`-point leaves: every level sorts each node's
+    points along its widest axis and halves them, so the build is one
+    lexsort per level. `node_min`/`node_max` are the tight boxes of the
+    points below each node. Queries go down level by level as (point, node)
+    pair arrays like `mesh.MeshIndex`, pruned by the k-th distance found in
+    each point's own leaf. Results are exact; ties go to the lower row, as
+    with a scan in row order.
+    """
+
+    def __init__(self, points, leaf_size=16):
+        with stage("centroid_tree"):
+            self.points = np.asarray(points, dtype=float).reshape(-1, 3)
+            self.leaf_size = leaf_size
+            n = len(self.points)
+            n_leaves = 1 << max(int(np.ceil(np.log2(max(-(-n // leaf_size), 1)))), 0)
+            self.depth = int(np.log2(n_leaves))
+            self.n_leaves = n_leaves
+
+            # Padding rows are NaN: ignored by fmin/fmax, sorted last
+            size = n_leaves * leaf_size
+            padded = np.concatenate([self.points, np.full((size - n, 3), np.nan)])
+            order = np.arange(size)
+            for level in range(self.depth):
+                seg = padded[order].reshape(1 << level, -1, 3)
+                spread = np.fmax.reduce(seg, axis=1) - np.fmin.reduce(seg, axis=1)
+                axis = np.nan_to_num(spread, nan=-1.0).argmax(axis=1)
+                node = np.repeat(np.arange(1 << level), size >> level)
+                key = padded[order, axis[node]]
+                order = order[np.lexsort((key, node))]
+            self.order = order
+            self.sorted = padded[order]
+
+            leaves = self.sorted.reshape(n_leaves, leaf_size, 3)
+            self.node_min = np.full((2 * n_leaves - 1, 3), np.inf)
+            self.node_max = np.full((2 * n_leaves - 1, 3), -np.inf)
+            first_leaf = n_leaves - 1
+            with np.errstate(invalid="ignore"):
+                self.node_min[first_leaf:] = np.nan_to_num(np.fmin.reduce(leaves, axis=1), nan=np.inf)
+                self.node_max[first_leaf:] = np.nan_to_num(np.fmax.reduce(leaves, axis=1), nan=-np.inf)
+            for level in range(self.depth - 1, -1, -1):
+                nodes = np.arange((1 << level) - 1, (1 << (level + 1)) - 1)
+                self.node_min[nodes] = np.minimum(self.node_min[2 * nodes + 1], self.node_min[2 * nodes + 2])
+                self.node_max[nodes] = np.maximum(self.node_max[2 * nodes + 1], self.node_max[2 * nodes + 2])
+
+    def __len__(self):
+        return len(self.points)
+
+    def _leaf_pairs(self, pts, leaves):
+        """
+        Expand (point, leaf) pairs to (point, sorted row) pairs, padding
+        rows left out.
+        """
+        start = leaves * self.leaf_size
+        size = np.clip(len(self) - start, 0, self.leaf_size)
+        pts = np.repeat(pts, size)
+        rows = np.repeat(start - np.cumsum(size) + size, size) + np.arange(size.sum())
+        return pts, rows
+
+    def _nearest(self, queries, pts, rows, k):
+        """
+        The k closest of the (point, sorted row) pairs per point → ranked
+        (point, original row, squared distance) arrays.
+        """
+        count("distance_evaluations", len(rows))
+        d = queries[pts] - self.sorted[rows]
+        d2 = np.einsum("ij,ij->i", d, d)
+        rows = self.order[rows]
+        pick = np.lexsort((rows, d2, pts))
+        pts, rows, d2 = pts[pick], rows[pick], d2[pick]
+        first = np.flatnonzero(np.r_[True, pts[1:] != pts[:-1]])
+        rank = np.arange(len(pts)) - np.repeat(first, np.diff(np.r_[first, len(pts)]))
+        keep = rank < k
+        return pts[keep], rank[keep], rows[keep], d2[keep]
+
+    def _query_chunk(self, queries, k):
+        n = len(queries)
+        every = np.arange(n)
+
+        # Greedy descent to one leaf per point; its k-th distance bounds the search
+        node = np.zeros(n, dtype=np.intp)
+        for _ in range(self.depth):
+            left, right = 2 * node + 1, 2 * node + 2
+            go_left = (_box_dist2(queries, self.node_min[left], self.node_max[left])
+                       <= _box_dist2(queries, self.node_min[right], self.node_max[right]))
+            node = np.where(go_left, left, right)
+        pts, rank, _, d2 = self._nearest(queries, *self._leaf_pairs(every, node - (self.n_leaves - 1)), k)
+        bound = np.full(n, np.inf)
+        full = rank == k - 1
+        bound[pts[full]] = d2[full]
+
+        pts, node = every, np.zeros(n, dtype=np.intp)
+        for _ in range(self.depth):
+            pts = np.repeat(pts, 2)
+            node = (2 * np.repeat(node, 2) + 1) + np.tile([0, 1], len(node))
+            keep = _box_dist2(queries[pts], self.node_min[node], self.node_max[node]) <= bound[pts]
+            pts, node = pts[keep], node[keep]
+        return self._nearest(queries, *self._leaf_pairs(pts, node - (self.n_leaves - 1)), k)
+
+    def query(self, points, k=1, chunk=1024):
+        """
+        The `k` nearest points for every query point, nearest first.
+
+        Returns (rows (P,k) into the tree's points, distances (P,k)), -1 / inf
+        where the tree holds fewer than `k` points; (P,) arrays when `k` is 1.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        if k < 1:
+            raise ValueError(f"k must be at least 1, not {k}")
+        rows = np.full((len(points), k), -1, dtype=np.intp)
+        d2 = np.full((len(points), k), np.inf)
+        if len(self) and len(points):
+            with stage("centroid_query"):
+                for lo in range(0, len(points), chunk):
+                    pts, rank, r, d = self._query_chunk(points[lo:lo + chunk], k)
+                    rows[lo + pts, rank] = r
+                    d2[lo + pts, rank] = d
+        dist = np.sqrt(d2)
+        return (rows[:, 0], dist[:, 0]) if k == 1 else (rows, dist)
+
+
+# ─── Attachment ──────────────────────────────────────────────────────────────
+
+def centroid_parents(room, tol=WALL_TOL, leaf_size=16, chain=False):
+    """
+    Id of the element with the nearest centroid for every device of
+    `room` (None when the room has no elements) and the distances;
+    `tol` and `chain` as in `element_centroids`.
+    """
+    tree = CentroidTree(element_centroids(room, tol, chain), leaf_size)
+    rows, dist = tree.query(room.devices["position"])
+    ids = room.elements["id"].tolist()
+    return [ids[r] if r >= 0 else None for r in rows.tolist()], dist
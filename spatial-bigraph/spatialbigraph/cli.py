@@ -0,0 +1,324 @@
+"""
+One command line over the bigraph scripts, with fast startup.
+
+    python -m spatialbigraph build Jsons/floor.json -o graph.json      # bigraphs_with_planes.py
+    python -m spatialbigraph attach Jsons/room1_kitchen_with_iot.json --mode centroid
+                                                                       # bigraphs_with_centroid.py
+    python -m spatialbigraph plot Jsons/floor.json --room Bathroom -o bathroom.png
+                                                                       # imagineroom.py
+    python -m spatialbigraph boundary Jsons/bathroomwithiot1.json -o outline.png
+                                                                       # imagineRoomBoundary.py
+    python -m spatialbigraph bench Jsons/floor.json --startup
+
+Nothing beyond the standard library is imported until a subcommand runs,
+and then only what it needs: `build`, `attach` and `bench` use the NumPy
+place forest and never load NetworkX or matplotlib; `plot`, `boundary` and
+`build --draw` load matplotlib (pyplot only when showing a window rather
+than writing `-o`).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from . import profiling
+
+# Modules the non-plotting commands must not import
+HEAVY_MODULES = ("matplotlib", "networkx")
+
+# ─── Helpers ─────────────────────────────────────────────────────────────────
+
+def _inputs(parser, specs):
+    from .loader import find_inputs
+
+    paths = find_inputs(specs)
+    if not paths:
+        parser.error("no JSON files matched the given inputs")
+    return paths
+
+def _write(out, text):
+    if out == "-":
+        sys.stdout.write(text)
+    else:
+        with open(out, "w") as f:
+            f.write(text)
+
+def _figure(draw, out=None, figsize=(8, 8), dpi=100):
+    """
+    Call `draw(ax)` on a new figure and save it to `out`, or show it in a
+    window when `out` is None.
+    """
+    if out:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(fig)
+        draw(fig.add_subplot())
+        fig.tight_layout()
+        fig.savefig(out)
+    else:
+        import matplotlib.pyplot as plt
+
+        fig, ax = plt.subplots(figsize=figsize, dpi=dpi)
+        draw(ax)
+        plt.tight_layout()
+        plt.show()
+
+def _room(parser, scene, name):
+    if name is None:
+        return scene.rooms[0]
+    if name not in scene.by_name:
+        parser.error(f"no room {name!r}; the file has {', '.join(scene.by_name)}")
+    return scene[name]
+
+
+# ─── Subcommands ─────────────────────────────────────────────────────────────
+
+def cmd_build(args, parser):
+    """
+    The `bigraphs_with_planes.py` graph: rooms, their elements, each device
+    under its nearest plane or object box, plus the room-to-room links of
+    every file.
+    """
+    from .adjacency import room_adjacency, room_links
+    from .forest import PlaceForest, add_room_to_forest
+    from .loader import stream_scene
+
+    def built(rooms):
+        # Each room goes into the forest as it streams past and is handed on
+        # to the adjacency pass, which keeps only its wall/door segments
+        for room in rooms:
+            with profiling.stage("build"):
+                add_room_to_forest(forest, room)
+            yield room
+
+    forest = PlaceForest()
+    links = {}
+    for path in _inputs(parser, args.inputs):
+        rooms = built(stream_scene(path))
+        if args.no_links:
+            for _ in rooms:
+                pass
+        else:
+            links.update(room_links(room_adjacency(rooms)))
+
+    graph = forest.to_dict()
+    graph["links"] = {name: sorted(members) for name, members in links.items()}
+    summary = (f"{len(forest.roots())} rooms, {len(graph['nodes'])} nodes, "
+               f"{len(graph['edges'])} edges, {len(links)} room links")
+    if args.out:
+        _write(args.out, json.dumps(graph))
+    print(summary, file=sys.stderr if args.out == "-" else sys.stdout)
+
+    if args.draw is not None:
+        from .lod import LevelOfDetail
+        from .render import LodRenderer
+
+        if args.focus is not None and args.focus not in forest:
+            parser.error(f"no node {args.focus!r} to focus on")
+        lod = LevelOfDetail.from_forest(forest)
+        renderers = []  # matplotlib only keeps weak references to click handlers
+
+        def draw(ax):
+            renderers.append(LodRenderer(ax, lod, budget=args.budget or None, focus=args.focus))
+            renderers[-1].draw()
+            renderers[-1].connect()
+        with profiling.stage("draw"):
+            _figure(draw, args.draw or None, figsize=(12, 8), dpi=args.dpi)
+    return graph
+
+def cmd_attach(args, parser):
+    """
+    Each device's parent under the chosen rule: `surface` (nearest plane
+    or object box, as `build`), `rect` (the same with walls/doors/windows
+    as finite rectangles) or `centroid` (nearest element centroid through
+    a KD-tree, as `bigraphs_with_centroid.py`). `--index` answers `rect`
+    through the room's `SurfaceIndex`. One tab-separated row per device.
+    """
+    from .attach import nearest_parents
+    from .centroids import centroid_parents
+    from .loader import stream_scene
+
+    if args.index and args.mode != "rect":
+        parser.error("--index needs --mode rect (infinite planes cannot be indexed)")
+    rows = []
+    for path in _inputs(parser, args.inputs):
+        for room in stream_scene(path):
+            devs = room.devices
+            with profiling.stage("attach", room=room.name):
+                if args.mode == "centroid":
+                    parents, dist = centroid_parents(room)
+                elif args.index:
+                    parents, dist = nearest_parents(devs["position"], room.surface_index())
+                else:
+                    parents, dist = nearest_parents(devs["position"],
+                                                    room.surfaces(finite=args.mode == "rect"))
+            rows.extend(zip([room.name] * len(devs), devs["id"].tolist(), devs["name"].tolist(),
+                            [p or "<unknown>" for p in parents], dist.tolist()))
+
+    text = "".join(f"{room}\t{dev}\t{name}\t{parent}\t{d:.4f}\n" for room, dev, name, parent, d in rows)
+    _write(args.out or "-", "room\tdevice\tname\tparent\tdistance\n" + text)
+    return rows
+
+def cmd_plot(args, parser):
+    """
+    The `imagineroom.py` floorplan of one room.
+    """
+    from .render import draw_floorplan, scene_floorplan
+    from .scene import Scene
+
+    scene = Scene.load(args.input)
+    room = _room(parser, scene, args.room)
+    plan = scene_floorplan(scene, room)
+
+    def draw(ax):
+        with profiling.stage("render", room=room.name):
+            draw_floorplan(ax, plan, annotate=not args.no_labels)
+        ax.set_title(f"Room '{room.name}' — boundary + flush doors/windows")
+    _figure(draw, args.out, dpi=args.dpi)
+
+def cmd_boundary(args, parser):
+    """
+    The `imagineRoomBoundary.py` outline view of one room.
+    """
+    from .render import draw_boundary
+    from .scene import Scene
+
+    room = _room(parser, Scene.load(args.input), args.room)
+    _figure(lambda ax: draw_boundary(ax, room, annotate=not args.no_labels), args.out, dpi=args.dpi)
+
+def cmd_bench(args, parser):
+    """
+    Best-of-`repeat` wall time of each headless stage per input file, and
+    with `--startup` the fresh-interpreter startup of every non-plotting
+    command.
+    """
+    from .adjacency import room_adjacency
+    from .centroids import centroid_parents
+    from .forest import build_forest
+    from .scene import Scene
+
+    paths = _inputs(parser, args.inputs)
+    stages = ("parse", "build", "centroid", "adjacency")
+    print(f"{'file':<40} {'rooms':>6} {'devices':>8} " + " ".join(f"{s + ' ms':>13}" for s in stages))
+    for path in paths:
+        best = dict.fromkeys(stages, float("inf"))
+        for _ in range(args.repeat):
+            t = [time.perf_counter()]
+            scene = Scene.load(path)
+            t.append(time.perf_counter())
+            build_forest(scene)
+            t.append(time.perf_counter())
+            for room in scene:
+                centroid_parents(room)
+            t.append(time.perf_counter())
+            room_adjacency(scene.rooms)
+            t.append(time.perf_counter())
+            for stage, t0, t1 in zip(stages, t, t[1:]):
+                best[stage] = min(best[stage], t1 - t0)
+        n_devices = sum(len(room.devices) for room in scene)
+        print(f"{os.path.relpath(path):<40} {len(scene):>6} {n_devices:>8} "
+              + " ".join(f"{best[s] * 1e3:>13.2f}" for s in stages))
+
+    if args.startup:
+        print()
+        print(f"{'command':<48} {'best ms':>8} {'median ms':>10}  heavy imports")
+        for command in startup_commands(paths[0]):
+            report = startup_time(command, runs=args.startup_runs)
+            print(f"{' '.join(command):<48} {report['best'] * 1e3:>8.0f} {report['median'] * 1e3:>10.0f}  "
+                  f"{', '.join(report['heavy']) or '-'}")
+
+
+# ─── Startup Measurement ─────────────────────────────────────────────────────
+
+def startup_commands(path):
+    """
+    The non-plotting commands whose startup is measured, on input `path`.
+    """
+    return [["--help"], ["build", path, "-o", os.devnull], ["attach", path, "-o", os.devnull],
+            ["bench", path, "--repeat", "1"]]
+
+def startup_time(command, runs=5):
+    """
+    Wall time of `python -m spatialbigraph <command>` in fresh interpreters
+    (best and median of `runs`) and which of `HEAVY_MODULES` it imported,
+    read from one extra `-X importtime` run.
+    """
+    base = [sys.executable, "-m", "spatialbigraph", *command]
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(base, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - t0)
+    trace = subprocess.run([sys.executable, "-X", "importtime", *base[1:]], check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    imported = {line.rsplit("|", 1)[-1].strip() for line in trace.splitlines() if line.startswith("import time:")}
+    times.sort()
+    return {"command": command, "best": times[0], "median": times[len(times) // 2],
+            "heavy": [m for m in HEAVY_MODULES if m in imported]}
+
+
+# ─── Command Line ────────────────────────────────────────────────────────────
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m spatialbigraph",
+                                     description=__doc__.strip().splitlines()[0])
+    profiling.add_arguments(parser)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build", help="build the place graph (nearest-surface attachment) and room links")
+    p.add_argument("inputs", nargs="+", help="RoomPlan JSON files, directories or glob patterns")
+    p.add_argument("-o", "--out", default=None,
+                   help="write nodes, edges and links as JSON to this path ('-' for stdout)")
+    p.add_argument("--no-links", action="store_true", help="skip the room adjacency links")
+    p.add_argument("--draw", nargs="?", const="", default=None, metavar="IMAGE",
+                   help="draw the tree: to IMAGE, or in a window when no path is given")
+    p.add_argument("--budget", type=int, default=400,
+                   help="most nodes drawn; larger subtrees are summarized and expand on click "
+                        "(default: 400, 0 draws every node)")
+    p.add_argument("--focus", default=None, metavar="ROOM",
+                   help="draw this room's subtree in full and summarize the others")
+    p.add_argument("--dpi", type=int, default=100)
+    p.set_defaults(run=cmd_build)
+
+    p = sub.add_parser("attach", help="list every device's parent element")
+    p.add_argument("inputs", nargs="+", help="RoomPlan JSON files, directories or glob patterns")
+    p.add_argument("--mode", choices=("surface", "rect", "centroid"), default="surface",
+                   help="nearest plane/object box, nearest finite wall/door/window rectangle or "
+                        "object box, or nearest element centroid (default: surface)")
+    p.add_argument("--index", action="store_true",
+                   help="with --mode rect, search each room's surface BVH instead of every surface")
+    p.add_argument("-o", "--out", default=None, help="write the table here (default: stdout)")
+    p.set_defaults(run=cmd_attach)
+
+    for name, run, help_text in (("plot", cmd_plot, "draw one room's floorplan"),
+                                 ("boundary", cmd_boundary, "draw one room's outline and element points")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("input", help="RoomPlan JSON file")
+        p.add_argument("--room", default=None, help="room name (default: the first room)")
+        p.add_argument("-o", "--out", default=None, help="save to this image instead of showing a window")
+        p.add_argument("--dpi", type=int, default=100)
+        p.add_argument("--no-labels", action="store_true", help="skip the per-item texts")
+        p.set_defaults(run=run)
+
+    p = sub.add_parser("bench", help="time the headless stages, and optionally command startup")
+    p.add_argument("inputs", nargs="+", help="RoomPlan JSON files, directories or glob patterns")
+    p.add_argument("--repeat", type=int, default=3, help="runs per file, best kept (default: 3)")
+    p.add_argument("--startup", action="store_true",
+                   help="also time fresh-interpreter startup of the non-plotting commands")
+    p.add_argument("--startup-runs", type=int, default=5, help="runs per command (default: 5)")
+    p.set_defaults(run=cmd_bench)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    profiling.enable_from_env(args.profile_out, args.profile)
+    return args.run(args, parser)
+
+
+if __name__ == "__main__":
+    main()
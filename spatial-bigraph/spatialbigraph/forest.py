@@ -0,0 +1,233 @@
+import numpy as np
+
+from .attach import nearest_parents
+
+# ─── Place Forest ────────────────────────────────────────────────────────────
+
+class PlaceForest:
+    """
+    The place graph (room → element → IoT device) as a forest of int arrays
+    instead of a NetworkX DiGraph.
+
+      parent        parent row, -1 for roots (rooms)
+      first_child   first child row, -1 for leaves
+      next_sibling  next child of the same parent, -1 for the last one
+      label         row into `label_names` (labels are interned)
+      position      (N,3) float, NaN where the node has none (rooms)
+
+    `ids[row]` / `index[node_id]` map between node ids and rows. Children keep
+    insertion order, so `to_networkx()` reproduces the DiGraph the bigraph
+    scripts build, edge for edge.
+    """
+
+    _INT_FIELDS = ("parent", "first_child", "last_child", "next_sibling", "label")
+
+    def __init__(self, capacity=64):
+        self.ids = []
+        self.index = {}
+        self.label_names = []
+        self._label_index = {}
+        self.n = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        # Arrays grow by doubling; rows past `n` are spare capacity
+        for name in self._INT_FIELDS:
+            new = np.full(capacity, -1, dtype=np.int32)
+            old = getattr(self, name, None)
+            if old is not None:
+                new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+        new = np.full((capacity, 3), np.nan)
+        old = getattr(self, "position", None)
+        if old is not None:
+            new[:self.n] = old[:self.n]
+        self.position = new
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self, node_id):
+        return node_id in self.index
+
+    # ─── Building ─────────────────────────────────────────────────────────
+
+    def _intern(self, label):
+        row = self._label_index.get(label)
+        if row is None:
+            row = self._label_index[label] = len(self.label_names)
+            self.label_names.append(label)
+        return row
+
+    def add(self, node_id, label=None, parent=None, position=None):
+        """
+        Add a node under `parent` (a node id, None for a root) and return its
+        row. Re-adding an existing id only updates its label/position; a node
+        keeps its first parent.
+        """
+        row = self.index.get(node_id)
+        if row is None:
+            if self.n == len(self.parent):
+                self._alloc(2 * len(self.parent))
+            row = self.n
+            self.n += 1
+            self.ids.append(node_id)
+            self.index[node_id] = row
+            if parent is not None:
+                self._link(self.index[parent], row)
+        if label is not None:
+            self.label[row] = self._intern(label)
+        if position is not None:
+            self.position[row] = position
+        return row
+
+    def _link(self, p, row):
+        self.parent[row] = p
+        if self.first_child[p] < 0:
+            self.first_child[p] = row
+        else:
+            self.next_sibling[self.last_child[p]] = row
+        self.last_child[p] = row
+
+    # ─── Queries ──────────────────────────────────────────────────────────
+
+    def parent_of(self, node_id):
+        """
+        Parent id of `node_id` (None for a root) in O(1).
+        """
+        p = self.parent[self.index[node_id]]
+        return self.ids[p] if p >= 0 else None
+
+    def label_of(self, node_id):
+        lab = self.label[self.index[node_id]]
+        return self.label_names[lab] if lab >= 0 else None
+
+    def roots(self):
+        return np.flatnonzero(self.parent[:self.n] < 0)
+
+    def children(self, row):
+        """
+        Child rows of `row`, in insertion order.
+        """
+        out = []
+        c = self.first_child[row]
+        while c >= 0:
+            out.append(c)
+            c = self.next_sibling[c]
+        return out
+
+    def subtree(self, row):
+        """
+        Rows of the subtree under `row` (itself included), depth-first in
+        insertion order. Iterative, so depth is not bounded by recursion.
+        """
+        first_child, next_sibling = self.first_child, self.next_sibling
+        out = [row]
+        c = first_child[row]
+        while c >= 0:
+            out.append(c)
+            if first_child[c] >= 0:
+                c = first_child[c]
+                continue
+            # climb until a node with a next sibling, without leaving `row`
+            while c != row and next_sibling[c] < 0:
+                c = self.parent[c]
+            if c == row:
+                break
+            c = next_sibling[c]
+        return np.array(out, dtype=np.int32)
+
+    def depth(self):
+        """
+        Depth of every node (roots are 0), in one pass over the rows; a
+        parent is always added before its children.
+        """
+        d = np.zeros(self.n, dtype=np.int32)
+        parent = self.parent[:self.n]
+        for row in range(self.n):
+            if parent[row] >= 0:
+                d[row] = d[parent[row]] + 1
+        return d
+
+    def nbytes(self):
+        """
+        Bytes held by the node arrays (ids and label strings excluded).
+        """
+        arrays = [getattr(self, name) for name in self._INT_FIELDS] + [self.position]
+        return sum(a[:self.n].nbytes for a in arrays)
+
+    # ─── Export ───────────────────────────────────────────────────────────
+
+    def _nodes(self):
+        """
+        (node id, attributes) per row: `label` and `position` in the same
+        form the bigraph scripts use.
+        """
+        pos = self.position[:self.n]
+        has_pos = ~np.isnan(pos).any(axis=1)
+        for row, node_id in enumerate(self.ids):
+            attrs = {}
+            lab = self.label[row]
+            if lab >= 0:
+                attrs["label"] = self.label_names[lab]
+            if has_pos[row]:
+                x, y, z = pos[row].tolist()
+                attrs["position"] = {"x": x, "y": y, "z": z}
+            yield node_id, attrs
+
+    def _edges(self):
+        parent = self.parent[:self.n]
+        child = np.flatnonzero(parent >= 0)
+        ids = self.ids
+        return [(ids[p], ids[c]) for p, c in zip(parent[child].tolist(), child.tolist())]
+
+    def to_networkx(self):
+        """
+        The equivalent `nx.DiGraph`, with `label` and `position` node
+        attributes in the same form the bigraph scripts use.
+        """
+        import networkx as nx
+
+        G = nx.DiGraph()
+        G.add_nodes_from(self._nodes())
+        G.add_edges_from(self._edges())
+        return G
+
+    def to_dict(self):
+        """
+        `{"nodes": [{"id", "label", "position"}, ...], "edges": [[parent,
+        child], ...]}`, the layout `batch --out` writes, without NetworkX.
+        """
+        return {"nodes": [{"id": node_id, **attrs} for node_id, attrs in self._nodes()],
+                "edges": [list(edge) for edge in self._edges()]}
+
+
+# ─── Building From Rooms ─────────────────────────────────────────────────────
+
+def add_room_to_forest(forest, room):
+    """
+    Same tree as `bigraph.build_room`: room root, its elements, and each IoT
+    device under its nearest surface.
+    """
+    forest.add(room.name, label=room.name)
+    for node_id, label, loc in zip(room.elements["id"].tolist(), room.labels(),
+                                   room.elements["location"]):
+        forest.add(node_id, label=label, parent=room.name, position=loc)
+
+    devs = room.devices
+    parents, _ = nearest_parents(devs["position"], room.surfaces())
+    for dev_id, name, pos, parent_id in zip(devs["id"].tolist(), devs["name"].tolist(),
+                                            devs["position"], parents):
+        if parent_id is None:
+            parent_id = "<unknown>"
+            forest.add(parent_id)
+        forest.add(dev_id, label=name or "IoT Device", parent=parent_id, position=pos)
+
+def build_forest(rooms, forest=None):
+    """
+    Build (or extend `forest` with) the place forest of every room.
+    """
+    forest = PlaceForest() if forest is None else forest
+    for room in rooms:
+        add_room_to_forest(forest, room)
+    return forest
@@ -0,0 +1,192 @@
+import numpy as np
+
+# ─── Geometry Helpers ────────────────────────────────────────────────────────
+
+def to_vec(point):
+    """
+    Convert a dict with keys 'x','y','z' into a NumPy array [x,y,z].
+    """
+    return np.array([point["x"], point["y"], point["z"]])
+
+def to_xyz(vec):
+    """
+    Inverse of `to_vec`: a NumPy 3-vector back into an {'x','y','z'} dict.
+    """
+    x, y, z = np.asarray(vec, dtype=float).tolist()
+    return {"x": x, "y": y, "z": z}
+
+def point_to_plane_dist(point, plane_point, plane_normal):
+    """
+    Compute the unsigned perpendicular distance from `point` to the infinite plane
+    defined by `plane_point` (any point on the plane) and `plane_normal`.
+    """
+    return abs(np.dot(plane_normal, point - plane_point))
+
+
+def point_to_aabb_dist(point, aabb_min, aabb_max):
+    """
+    Compute the shortest distance from `point` to an axis-aligned bounding box
+    defined by `aabb_min` and `aabb_max`.
+    """
+    dx = max(aabb_min[0] - point[0], 0, point[0] - aabb_max[0])
+    dy = max(aabb_min[1] - point[1], 0, point[1] - aabb_max[1])
+    dz = max(aabb_min[2] - point[2], 0, point[2] - aabb_max[2])
+    return np.linalg.norm([dx, dy, dz])
+
+def point_to_rect_dist(point, center, axes, half):
+    """
+    Compute the shortest distance from `point` to the finite rectangle
+    spanned around `center` by the two orthonormal `axes` (2,3) over the
+    `half` extents (2,).
+    """
+    d = point - center
+    s = np.clip(axes @ d, -half, half)
+    return np.linalg.norm(d - s @ axes)
+
+def plane_normal(dims):
+    """
+    Normal of a wall/door/window chosen from whichever dimension is zero
+    (length==0 → normal along z; width==0 → normal along x; else y).
+    """
+    if abs(dims.get("length", 1)) < 1e-6:
+        return np.array([0, 0, 1])
+    elif abs(dims.get("width", 1)) < 1e-6:
+        return np.array([1, 0, 0])
+    else:
+        return np.array([0, 1, 0])
+
+def surface_transform(obj):
+    """
+    (rotation (3,3), translation (3,)) of a RoomPlan `transform`, or None
+    when the object has none. RoomPlan encodes the 4×4 matrix column by
+    column (16 numbers, or 4 columns of 4); the rotation's columns are the
+    surface's local x (width), y (height) and z (normal) axes and the
+    translation is its centre.
+    """
+    t = obj.get("transform")
+    if t is None:
+        return None
+    cols = np.asarray(t, dtype=float).reshape(4, 4)
+    return cols[:3, :3].T, cols[3, :3]
+
+def plane_frame(obj):
+    """
+    Centre and unit normal of a wall/door/window: from its `transform` when
+    the export carries one, else corner + ½(extents) and `plane_normal`.
+    """
+    dims = obj.get("dimensions", {})
+    frame = surface_transform(obj)
+    if frame is not None:
+        rotation, center = frame
+        return center, rotation[:, 2] / np.linalg.norm(rotation[:, 2])
+    loc = obj.get("location") or obj.get("position")
+    center = to_vec(loc) + 0.5 * np.array([dims.get("width", 0.0), dims.get("height", 0.0),
+                                           dims.get("length", 0.0)])
+    return center, plane_normal(dims)
+
+def surface_axis(obj):
+    """
+    Unit width axis of a wall/door/window: the x column of its `transform`
+    rotation, or zeros when it has none (`rectangle_frames` then picks one).
+    """
+    frame = surface_transform(obj)
+    if frame is None:
+        return np.zeros(3)
+    axis = frame[0][:, 0]
+    return axis / np.linalg.norm(axis)
+
+def surface_rectangle(obj):
+    """
+    Centre (3,), axes (2,3) and half extents (2,) of the finite rectangle of
+    a wall/door/window: `plane_frame` for the centre and normal,
+    `surface_axis` for the orientation within the plane.
+    """
+    center, normal = plane_frame(obj)
+    dims = obj.get("dimensions", {})
+    axes, half = rectangle_frames(normal, [dims.get("width", 0.0), dims.get("height", 0.0),
+                                           dims.get("length", 0.0)], surface_axis(obj))
+    return center, axes[0], half[0]
+
+def rectangle_frames(normals, dimensions, along=None):
+    """
+    Orthonormal in-plane axes (K,2,3) and half extents (K,2) of the finite
+    rectangles of K walls/doors/windows, from their normals (K,3) and
+    (width, height, length) rows (K,3).
+
+    The first axis is the surface's own width axis when `along` (K,3) gives
+    one (the x column of its `transform`, see `surface_axis`; zero rows
+    have none), else it runs along the floor (up × normal). It spans the
+    wider of width and length, the second axis (normal × first) the height.
+    A horizontal surface without `along` spans x over its width and z over
+    its length.
+    """
+    normals = np.asarray(normals, dtype=float).reshape(-1, 3)
+    dims = np.abs(np.asarray(dimensions, dtype=float).reshape(-1, 3))
+    normals = normals / np.linalg.norm(normals, axis=1, keepdims=True)
+    own = np.zeros_like(normals) if along is None else np.asarray(along, dtype=float).reshape(-1, 3)
+    # Only the part of the given axis that lies in the plane
+    own = own - np.einsum("ij,ij->i", own, normals)[:, None] * normals
+    has_own = np.linalg.norm(own, axis=1) > 1e-6
+    along = np.cross([0.0, 1.0, 0.0], normals)
+    flat = ~has_own & (np.linalg.norm(along, axis=1) < 1e-6)
+    along[flat] = [1.0, 0.0, 0.0]
+    along[has_own] = own[has_own]
+    along /= np.linalg.norm(along, axis=1, keepdims=True)
+    axes = np.stack([along, np.cross(normals, along)], axis=1)
+    half = 0.5 * np.where(flat[:, None], dims[:, [0, 2]],
+                          np.column_stack([np.maximum(dims[:, 0], dims[:, 2]), dims[:, 1]]))
+    return axes, half
+
+def build_surfaces(objects, walls_ids, door_ids, window_ids, finite=False):
+    """
+    For each object, produce either:
+      - ("plane", obj, plane_point, normal)  for walls/doors/windows
+      - ("rect",  obj, center, axes, half)   for walls/doors/windows, `finite=True`
+      - ("box",   obj, aabb_min, aabb_max)   for everything else
+
+    *Walls/doors/windows* JSON give you a *corner* location + dimensions:
+      we compute the face-centroid = corner + ½(extents) to use as plane_point.
+      When the object carries a RoomPlan `transform`, its centre and
+      orientation come from there instead (see `plane_frame`). With
+      `finite`, each becomes the bounded rectangle of `surface_rectangle`,
+      turned within its plane by the `transform` too, rather than an
+      infinite plane, so a device is measured to the wall
+      itself and not to the wall's extension through the next room.
+
+    *Other objects* JSON `location` is already their centroid – so we
+    build an AABB centered there.
+    """
+
+    surfaces = []
+    plane_ids = set(walls_ids) | set(door_ids) | set(window_ids)
+    for obj in objects:
+        dims = obj.get("dimensions", {})
+
+        # Does this object live in walls/doors/windows?
+        is_plane = obj["id"] in plane_ids
+        loc_raw  = obj.get("location") or obj.get("position")
+
+        if is_plane:
+            # 1) Face centroid and normal: transform, or corner + half extents
+            #    with a normal based on which dimension was zero
+            center, normal = plane_frame(obj)
+
+            # 2) Infinite plane, or its finite rectangle
+            if finite:
+                surfaces.append(("rect", obj, *surface_rectangle(obj)))
+            else:
+                surfaces.append(("plane", obj, center, normal))
+
+        else:
+            # Build an AABB around the centroid (JSON loc is already centroid)
+            center = to_vec(loc_raw)
+            half = np.array([
+                dims.get("length", 0.0) / 2,
+                dims.get("height", 0.0) / 2,
+                dims.get("width",  0.0) / 2
+            ])
+            aabb_min = center - half
+            aabb_max = center + half
+            surfaces.append(("box", obj, aabb_min, aabb_max))
+
+    return surfaces
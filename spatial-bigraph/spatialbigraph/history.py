@@ -0,0 +1,442 @@
+"""
+Version history of built bigraphs, with structural sharing between versions.
+
+    history = BigraphHistory()
+    history.commit(stream_scene("monday.json"), label="monday")
+    history.commit(stream_scene("today.json"), label="today")
+    history.diff("monday", "today").reparented   # {device: (old parent, new parent)}
+    history.checkout("monday").to_forest()       # that scan's place graph
+    for row in history.memory_report(): print(row)
+
+A version is two persistent hash tries: node id → (parent id, label,
+position) and room name → (fingerprint, node ids). A commit copies only
+the trie paths leading to entries it changes and shares everything else
+with the version before it. Rooms whose arrays hash the same as in the
+head are skipped before their devices are even attached, so an unchanged
+room costs nothing. A checkout is a lookup in the version list. A diff
+walks both tries side by side and skips every subtree the two versions
+share, so it costs time proportional to the change, not to the graph.
+"""
+import hashlib
+import sys
+from collections import namedtuple
+
+from .attach import nearest_parents
+from .forest import PlaceForest
+from .profiling import count, stage
+
+# ─── Persistent Hash Trie ────────────────────────────────────────────────────
+#
+# A trie is None (empty), a dict leaf of at most _LEAF entries, or a tuple of
+# 32 slots indexed by 5 bits of the key's hash. Published nodes are never
+# written to; an update rebuilds the touched path and reuses the rest.
+
+_BITS = 5
+_LEAF = 16
+_MASK = (1 << 64) - 1
+_DELETE = object()
+
+def _hash(key):
+    return hash(key) & _MASK
+
+def _trie_get(node, key, default=None):
+    h, shift = _hash(key), 0
+    while isinstance(node, tuple):
+        node = node[(h >> shift) & 31]
+        shift += _BITS
+    return node.get(key, default) if node else default
+
+def _trie_items(node):
+    if isinstance(node, tuple):
+        for child in node:
+            yield from _trie_items(child)
+    elif node:
+        yield from node.items()
+
+def _trie_update(node, items, shift, stats):
+    """
+    `node` with the (hash, key, value) `items` written in (`_DELETE` values
+    remove the key). `stats` ([nodes, bytes]) counts the trie nodes made.
+    """
+    if isinstance(node, tuple):
+        slots = list(node)
+        groups = {}
+        for item in items:
+            groups.setdefault((item[0] >> shift) & 31, []).append(item)
+        for i, group in groups.items():
+            slots[i] = _trie_update(slots[i], group, shift + _BITS, stats)
+        if not any(slots):
+            return None
+        node = tuple(slots)
+    else:
+        leaf = dict(node) if node else {}
+        for _, key, value in items:
+            if value is _DELETE:
+                leaf.pop(key, None)
+            else:
+                leaf[key] = value
+        if len(leaf) > _LEAF and shift < 64 - _BITS:
+            return _trie_update((None,) * 32, [(_hash(k), k, v) for k, v in leaf.items()], shift, stats)
+        if not leaf:
+            return None
+        node = leaf
+    stats[0] += 1
+    stats[1] += sys.getsizeof(node)
+    return node
+
+def _trie_set(node, updates, stats):
+    items = [(_hash(key), key, value) for key, value in updates.items()]
+    return _trie_update(node, items, 0, stats) if items else node
+
+def _trie_diff(a, b, shift, out):
+    """
+    Append (key, old, new) for every key whose value differs between tries
+    `a` and `b` (None for a side missing it). Shared subtrees are skipped.
+    """
+    if a is b:
+        return
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        for x, y in zip(a, b):
+            if x is not y:
+                _trie_diff(x, y, shift + _BITS, out)
+        return
+    old = dict(_trie_items(a))
+    for key, new in _trie_items(b):
+        prev = old.pop(key, None)
+        if prev is not new and prev != new:
+            out.append((key, prev, new))
+    out.extend((key, prev, None) for key, prev in old.items())
+
+def _trie_bytes(node, seen):
+    """
+    Bytes of the trie nodes and values under `node` not yet in `seen`.
+    """
+    if node is None or id(node) in seen:
+        return 0
+    seen.add(id(node))
+    total = sys.getsizeof(node)
+    if isinstance(node, tuple):
+        return total + sum(_trie_bytes(child, seen) for child in node)
+    for value in node.values():
+        total += _value_bytes(value, seen)
+    return total
+
+def _value_bytes(value, seen):
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    # The value tuple and its position / member-id tuple; strings excluded
+    return sys.getsizeof(value) + sum(sys.getsizeof(part) for part in value if isinstance(part, tuple))
+
+
+# ─── Room Entries ────────────────────────────────────────────────────────────
+
+def room_fingerprint(room):
+    """
+    Digest of a room's element and device arrays: equal digests build the
+    same place tree.
+    """
+    h = hashlib.blake2b(room.name.encode(), digest_size=16)
+    h.update(room.elements.tobytes())
+    h.update(room.devices.tobytes())
+    return h.hexdigest()
+
+def room_entries(room):
+    """
+    (node id, (parent id, label, position)) for the place tree of `room`, in
+    `bigraph.build_room` order: the room, its elements, then every IoT
+    device under its nearest surface ("<unknown>" when there is none).
+    """
+    out = [(room.name, (None, room.name, None))]
+    for node_id, label, loc in zip(room.elements["id"].tolist(), room.labels(),
+                                   room.elements["location"].tolist()):
+        out.append((node_id, (room.name, label, tuple(loc))))
+    devs = room.devices
+    parents, _ = nearest_parents(devs["position"], room.surfaces())
+    for dev_id, name, pos, parent_id in zip(devs["id"].tolist(), devs["name"].tolist(),
+                                            devs["position"].tolist(), parents):
+        out.append((dev_id, (parent_id or "<unknown>", name or "IoT Device", tuple(pos))))
+    return out
+
+
+# ─── Versions ────────────────────────────────────────────────────────────────
+
+class VersionDiff(namedtuple("VersionDiff", ["added", "removed", "changed"])):
+    """
+    Node changes from one version to another: `added` / `removed` map node
+    ids to their (parent, label, position) entry, `changed` to (old, new).
+    """
+
+    __slots__ = ()
+
+    @property
+    def reparented(self):
+        """
+        {node id: (old parent, new parent)} for nodes present in both
+        versions under a different parent.
+        """
+        return {node_id: (old[0], new[0]) for node_id, (old, new) in self.changed.items()
+                if old[0] != new[0]}
+
+    @property
+    def moved(self):
+        """
+        {node id: (old position, new position)} for nodes that kept their
+        parent but not their position.
+        """
+        return {node_id: (old[2], new[2]) for node_id, (old, new) in self.changed.items()
+                if old[0] == new[0] and old[2] != new[2]}
+
+
+class BigraphVersion:
+    """
+    One immutable version: the roots of its node and room tries plus what
+    its commit cost. `number` is its position in the history, `parent` the
+    version it was committed on top of (None for the first).
+    """
+
+    __slots__ = ("number", "label", "parent", "nodes", "rooms", "n_nodes", "n_rooms",
+                 "changed_rooms", "new_nodes", "new_bytes")
+
+    def __init__(self, number, label, parent, nodes, rooms, n_nodes, n_rooms,
+                 changed_rooms, new_nodes, new_bytes):
+        self.number = number
+        self.label = label
+        self.parent = parent
+        self.nodes = nodes
+        self.rooms = rooms
+        self.n_nodes = n_nodes
+        self.n_rooms = n_rooms
+        self.changed_rooms = changed_rooms
+        self.new_nodes = new_nodes
+        self.new_bytes = new_bytes
+
+    def __repr__(self):
+        return (f"BigraphVersion({self.number}, label={self.label!r}, nodes={self.n_nodes}, "
+                f"rooms={self.n_rooms}, changed_rooms={len(self.changed_rooms)})")
+
+    def __len__(self):
+        return self.n_nodes
+
+    def __contains__(self, node_id):
+        return _trie_get(self.nodes, node_id) is not None
+
+    def get(self, node_id):
+        """
+        (parent id, label, position) of `node_id`, None when absent.
+        """
+        return _trie_get(self.nodes, node_id)
+
+    def parent_of(self, node_id):
+        entry = self.get(node_id)
+        if entry is None:
+            raise KeyError(node_id)
+        return entry[0]
+
+    def room_names(self):
+        """
+        Room names in the order they first entered the history.
+        """
+        return [name for name, _ in sorted(_trie_items(self.rooms), key=lambda item: item[1][2])]
+
+    def room_nodes(self, name):
+        """
+        Node ids of room `name`, room first, in `room_entries` order.
+        """
+        return _trie_get(self.rooms, name)[1]
+
+    def items(self):
+        """
+        (node id, entry) for every node, in no particular order.
+        """
+        return _trie_items(self.nodes)
+
+    def nbytes(self):
+        """
+        Bytes a standalone copy of this version would hold: every trie node
+        and entry reachable from its roots (id and label strings excluded).
+        """
+        seen = set()
+        return _trie_bytes(self.nodes, seen) + _trie_bytes(self.rooms, seen)
+
+    def to_forest(self):
+        """
+        This version's place graph as a `PlaceForest`, rooms in history
+        order and nodes in `build_room` order.
+        """
+        forest = PlaceForest(max(self.n_nodes, 1))
+        for name in self.room_names():
+            for node_id in self.room_nodes(name):
+                parent, label, pos = self.get(node_id)
+                if parent is not None and parent not in forest:
+                    forest.add(parent)
+                forest.add(node_id, label=label, parent=parent, position=pos)
+        return forest
+
+    def to_networkx(self):
+        return self.to_forest().to_networkx()
+
+
+class BigraphHistory:
+    """
+    Successive versions of the bigraph of one building.
+
+    `commit(rooms)` records the rooms as the next version; with `partial`,
+    rooms it is not given keep their previous state, otherwise they are
+    dropped (a full rescan). `checkout(v)` returns version `v` (number,
+    negative index or label) in O(1) and `diff(a, b)` the node changes
+    between two versions.
+    """
+
+    def __init__(self):
+        self.versions = []
+        self.labels = {}
+        self._next_seq = 0
+
+    def __len__(self):
+        return len(self.versions)
+
+    def __iter__(self):
+        return iter(self.versions)
+
+    @property
+    def head(self):
+        return self.versions[-1] if self.versions else None
+
+    def checkout(self, version):
+        """
+        The `BigraphVersion` for a version number (negative counts from the
+        head), a label, or a version itself.
+        """
+        if isinstance(version, BigraphVersion):
+            return version
+        if isinstance(version, str):
+            if version not in self.labels:
+                raise ValueError(f"no version labelled {version!r}")
+            return self.versions[self.labels[version]]
+        try:
+            return self.versions[version]
+        except IndexError:
+            raise ValueError(f"no version {version} (history has {len(self.versions)})") from None
+
+    def commit(self, rooms, label=None, partial=False):
+        """
+        Record `rooms` (`Room` objects, e.g. `stream_scene(path)`) as a new
+        version on top of the head and return it. Only rooms whose arrays
+        changed since the head are attached and written. Rooms that share a
+        name are one room: later ones add their nodes to it.
+        """
+        if label is not None and label in self.labels:
+            raise ValueError(f"label {label!r} is already used by version {self.labels[label]}")
+        head = self.head
+        nodes, room_trie = (head.nodes, head.rooms) if head else (None, None)
+        n_nodes, n_rooms = (head.n_nodes, head.n_rooms) if head else (0, 0)
+
+        with stage("history_commit"):
+            node_updates, room_updates, kept, seen = {}, {}, set(), set()
+            value_bytes, value_seen = 0, set()
+
+            def drop(ids):
+                for node_id in ids:
+                    if node_id not in kept:
+                        node_updates.setdefault(node_id, _DELETE)
+
+            # Room name → (fingerprint, node ids, seq) as of this commit, so a
+            # room that comes again (e.g. from another file) adds to the
+            # first instead of replacing it
+            merged = {}
+            for room in rooms:
+                seen.add(room.name)
+                fingerprint = room_fingerprint(room)
+                old = _trie_get(room_trie, room.name)
+                again = merged.get(room.name)
+                if again is not None:
+                    fingerprint = hashlib.blake2b((again[0] + fingerprint).encode(), digest_size=16).hexdigest()
+                elif old is not None and old[0] == fingerprint:
+                    merged[room.name] = old
+                    continue
+                entries = room_entries(room)
+                ids = tuple(node_id for node_id, _ in entries)
+                kept.update(ids)
+                for node_id, entry in entries:
+                    if _trie_get(nodes, node_id) != entry:
+                        node_updates[node_id] = entry
+                        value_bytes += _value_bytes(entry, value_seen)
+                    elif node_updates.get(node_id) is _DELETE:
+                        # Dropped by a room seen earlier, unchanged here
+                        del node_updates[node_id]
+                if again is not None:
+                    before = set(again[1])
+                    ids = again[1] + tuple(node_id for node_id in ids if node_id not in before)
+                    seq = again[2]
+                elif old is not None:
+                    drop(set(old[1]).difference(ids))
+                    seq = old[2]
+                else:
+                    seq, self._next_seq = self._next_seq, self._next_seq + 1
+                merged[room.name] = room_updates[room.name] = (fingerprint, ids, seq)
+                value_bytes += _value_bytes(room_updates[room.name], value_seen)
+
+            if head is not None and not partial:
+                for name, (_, ids, _) in _trie_items(room_trie):
+                    if name not in seen:
+                        room_updates[name] = _DELETE
+                        drop(ids)
+
+            # Entry counts after the edit, from what the head held
+            for node_id, entry in node_updates.items():
+                existed = _trie_get(nodes, node_id) is not None
+                n_nodes += (entry is not _DELETE) - existed
+            for name, entry in room_updates.items():
+                existed = _trie_get(room_trie, name) is not None
+                n_rooms += (entry is not _DELETE) - existed
+
+            stats = [0, value_bytes]
+            nodes = _trie_set(nodes, node_updates, stats)
+            room_trie = _trie_set(room_trie, room_updates, stats)
+            count("history_updates", len(node_updates))
+
+        version = BigraphVersion(len(self.versions), label, head.number if head else None,
+                                 nodes, room_trie, n_nodes, n_rooms,
+                                 tuple(sorted(room_updates)), stats[0], stats[1])
+        self.versions.append(version)
+        if label is not None:
+            self.labels[label] = version.number
+        return version
+
+    def diff(self, a, b):
+        """
+        `VersionDiff` from version `a` to version `b`; e.g.
+        `diff("monday", -1).reparented` lists the devices that changed
+        parent since Monday's scan.
+        """
+        a, b = self.checkout(a), self.checkout(b)
+        with stage("history_diff"):
+            changes = []
+            _trie_diff(a.nodes, b.nodes, 0, changes)
+        added, removed, changed = {}, {}, {}
+        for node_id, old, new in changes:
+            if old is None:
+                added[node_id] = new
+            elif new is None:
+                removed[node_id] = old
+            else:
+                changed[node_id] = (old, new)
+        return VersionDiff(added, removed, changed)
+
+    def memory_report(self):
+        """
+        One dict per version: its node and room counts, the rooms its
+        commit rewrote, the bytes its commit added (`new_bytes`, the only
+        memory it costs on top of its predecessors), the bytes a standalone
+        copy would hold (`full_bytes`) and the history's running total.
+        """
+        rows, seen, total = [], set(), 0
+        for version in self.versions:
+            total += _trie_bytes(version.nodes, seen) + _trie_bytes(version.rooms, seen)
+            rows.append({"version": version.number, "label": version.label,
+                         "nodes": version.n_nodes, "rooms": version.n_rooms,
+                         "changed_rooms": len(version.changed_rooms),
+                         "trie_nodes": version.new_nodes, "new_bytes": version.new_bytes,
+                         "full_bytes": version.nbytes(), "total_bytes": total})
+        return rows
@@ -0,0 +1,272 @@
+from collections import namedtuple
+
+import networkx as nx
+import numpy as np
+
+from .attach import aabb_distances, distance_matrix, plane_distances
+from .bigraph import add_node, add_room
+from .geometry import to_xyz
+from .scene import PLANE_GROUPS, element_row
+
+# Edges (parent, child) that an edit added to / removed from the graph
+EdgeDiff = namedtuple("EdgeDiff", ["added", "removed"])
+
+# ─── Per-Room State ──────────────────────────────────────────────────────────
+
+class _RoomState:
+    """
+    Cached surfaces of one room plus the current attachment of its devices:
+    position, parent column and distance, in growable arrays.
+    """
+
+    def __init__(self, surfaces):
+        self.surfaces = surfaces
+        self.alive = np.ones(len(surfaces), dtype=bool)
+        self.column = {obj: col for col, obj in enumerate(surfaces.objects)}
+
+        self.dev_ids = []
+        self.dev_row = {}
+        self.pos = np.zeros((0, 3))
+        self.parent = np.zeros(0, dtype=np.intp)
+        self.dist = np.zeros(0)
+        self.dev_alive = np.zeros(0, dtype=bool)
+
+    def distances(self, points):
+        d = distance_matrix(points, self.surfaces)
+        d[:, ~self.alive] = np.inf
+        return d
+
+    def nearest(self, points):
+        d = self.distances(points)
+        if d.shape[1] == 0:
+            return np.full(len(d), -1, dtype=np.intp), np.full(len(d), np.inf)
+        best = d.argmin(axis=1)
+        best_d = d[np.arange(len(best)), best]
+        # No live surface left at all
+        best[np.isinf(best_d)] = -1
+        return best, best_d
+
+    def add_devices(self, ids, positions):
+        rows = np.arange(len(self.dev_ids), len(self.dev_ids) + len(ids))
+        self.dev_ids.extend(ids)
+        self.dev_row.update(zip(ids, rows.tolist()))
+        self.pos = np.vstack([self.pos, positions])
+        parent, dist = self.nearest(positions)
+        self.parent = np.concatenate([self.parent, parent])
+        self.dist = np.concatenate([self.dist, dist])
+        self.dev_alive = np.concatenate([self.dev_alive, np.ones(len(ids), dtype=bool)])
+        return rows
+
+    def parent_id(self, col):
+        return self.surfaces.objects[col] if col >= 0 else "<unknown>"
+
+
+# ─── Live Bigraph ────────────────────────────────────────────────────────────
+
+class LiveBigraph:
+    """
+    A built place graph (room → element → device) that can be edited in
+    place as devices are re-registered.
+
+    Each room keeps its own copy of the `PackedSurfaces` from
+    `Room.surfaces()` (extended when surfaces are added, while the Room's
+    cache keeps matching its elements) and every device's parent column and
+    distance. An edit only recomputes the devices it can affect:
+
+      add/move a device     one row of distances against the room's surfaces
+      add a surface         one column of distances against the room's devices
+      remove a surface      full rows only for the devices that hung off it
+      remove a device       no distances at all
+
+    Every edit returns an `EdgeDiff` of the graph edges it changed.
+    """
+
+    def __init__(self, rooms=()):
+        self.G = nx.DiGraph()
+        self.rooms = {}
+        self.device_room = {}
+        self.surface_room = {}
+        for room in rooms:
+            self.add_room(room)
+
+    def add_room(self, room):
+        """
+        Add a parsed `Room` with its elements and devices. A room whose name
+        is already live is merged into it: its elements and devices that are
+        not in the graph yet are added as `add_surface` / `add_device` would.
+        """
+        if room.name in self.rooms:
+            return self._merge_room(room)
+        add_room(self.G, room)
+        state = _RoomState(room.surfaces().copy())
+        self.rooms[room.name] = state
+        self.surface_room.update(dict.fromkeys(state.column, room.name))
+
+        devs = room.devices
+        ids = devs["id"].tolist()
+        for dev_id, name, pos in zip(ids, devs["name"].tolist(), devs["position"]):
+            add_node(self.G, dev_id, label=name or "IoT Device", position=to_xyz(pos))
+        return self._link_new(room.name, state, ids, devs["position"])
+
+    def _merge_room(self, room):
+        packed = room.surfaces()
+        n = room.n_planes
+        diff = EdgeDiff([], [])
+        for col, (eid, label) in enumerate(zip(room.elements["id"].tolist(), room.labels())):
+            if eid in self.surface_room:
+                continue
+            if col < n:
+                kind, a, b = "plane", packed.plane_points[col], packed.plane_normals[col]
+            else:
+                kind, a, b = "box", packed.box_min[col - n], packed.box_max[col - n]
+            diff = _merge(diff, self._add_column(room.name, eid, label, room.position(eid), kind, a, b))
+
+        devs = room.devices
+        new = [row for row, dev_id in enumerate(devs["id"].tolist()) if dev_id not in self.device_room]
+        devs = devs[new]
+        ids = devs["id"].tolist()
+        for dev_id, name, pos in zip(ids, devs["name"].tolist(), devs["position"]):
+            add_node(self.G, dev_id, label=name or "IoT Device", position=to_xyz(pos))
+        return _merge(diff, self._link_new(room.name, self.rooms[room.name], ids, devs["position"]))
+
+    def _link_new(self, room_name, state, ids, positions):
+        rows = state.add_devices(ids, np.asarray(positions, dtype=float).reshape(-1, 3))
+        added = []
+        for dev_id, row in zip(ids, rows.tolist()):
+            self.device_room[dev_id] = room_name
+            parent = state.parent_id(state.parent[row])
+            self.G.add_edge(parent, dev_id)
+            added.append((parent, dev_id))
+        return EdgeDiff(added, [])
+
+    # ─── Devices ──────────────────────────────────────────────────────────
+
+    def add_device(self, room_name, dev_id, position, name="IoT Device"):
+        """
+        Register a new device at `position` ({'x','y','z'} or a 3-vector).
+        """
+        if dev_id in self.device_room:
+            raise ValueError(f"device {dev_id!r} already exists")
+        pos = _vec(position)
+        add_node(self.G, dev_id, label=name, position=to_xyz(pos))
+        return self._link_new(room_name, self.rooms[room_name], [dev_id], pos[None])
+
+    def move_device(self, dev_id, position):
+        """
+        Move a device; its parent edge changes only if another surface is
+        now the nearest one.
+        """
+        state = self.rooms[self.device_room[dev_id]]
+        row = state.dev_row[dev_id]
+        pos = _vec(position)
+        state.pos[row] = pos
+        self.G.nodes[dev_id]["position"] = to_xyz(pos)
+
+        parent, dist = state.nearest(pos[None])
+        state.dist[row] = dist[0]
+        return self._reparent(state, [row], parent)
+
+    def remove_device(self, dev_id):
+        room_name = self.device_room.pop(dev_id)
+        state = self.rooms[room_name]
+        row = state.dev_row.pop(dev_id)
+        state.dev_alive[row] = False
+        removed = [(u, dev_id) for u in self.G.predecessors(dev_id)]
+        self.G.remove_node(dev_id)
+        return EdgeDiff([], removed)
+
+    # ─── Surfaces ─────────────────────────────────────────────────────────
+
+    def add_surface(self, room_name, item, group):
+        """
+        Add a wall/door/window (`group` in walls/doors/windows) or an object
+        (`group` is its objects key, e.g. "furniture") given as a RoomPlan
+        dict. Only devices now strictly closer to it are re-attached.
+        """
+        eid, _, category, loc, _, centroid, normal, _ = element_row(
+            item, group, len(self.rooms[room_name].column))
+        if group in PLANE_GROUPS:
+            return self._add_column(room_name, eid, group[:-1].capitalize(), to_xyz(loc),
+                                    "plane", centroid, normal)
+        dims = item.get("dimensions", {})
+        half = 0.5 * np.array([dims.get("length", 0.0), dims.get("height", 0.0), dims.get("width", 0.0)])
+        return self._add_column(room_name, eid, category, to_xyz(loc), "box", loc - half, loc + half)
+
+    def _add_column(self, room_name, eid, label, position, kind, a, b):
+        # One new surface column (plane point + normal or box min + max),
+        # then re-attach the devices now strictly closer to it
+        state = self.rooms[room_name]
+        surfaces = state.surfaces
+        col = surfaces.append(kind, eid, a, b)
+        if kind == "plane":
+            column_dist = lambda pts: plane_distances(
+                pts, surfaces.plane_normals[-1:], surfaces.plane_offsets[-1:])[:, 0]
+        else:
+            column_dist = lambda pts: aabb_distances(
+                pts, surfaces.box_min[-1:], surfaces.box_max[-1:])[:, 0]
+        state.alive = np.append(state.alive, True)
+        state.column[eid] = col
+        self.surface_room[eid] = room_name
+
+        add_node(self.G, eid, label, position=position)
+        self.G.add_edge(room_name, eid)
+        diff = EdgeDiff([(room_name, eid)], [])
+
+        rows = np.flatnonzero(state.dev_alive)
+        if len(rows):
+            d = column_dist(state.pos[rows])
+            closer = d < state.dist[rows]
+            rows = rows[closer]
+            state.dist[rows] = d[closer]
+            diff = _merge(diff, self._reparent(state, rows, np.full(len(rows), col)))
+        return diff
+
+    def remove_surface(self, surface_id):
+        """
+        Remove a wall/door/window/object; devices attached to it move to
+        their next-nearest surface.
+        """
+        room_name = self.surface_room.pop(surface_id)
+        state = self.rooms[room_name]
+        col = state.column.pop(surface_id)
+        state.alive[col] = False
+
+        removed = [(room_name, surface_id)] + [(surface_id, v) for v in self.G.successors(surface_id)]
+        self.G.remove_node(surface_id)
+        diff = EdgeDiff([], removed)
+
+        rows = np.flatnonzero(state.dev_alive & (state.parent == col))
+        if len(rows):
+            parent, dist = state.nearest(state.pos[rows])
+            state.dist[rows] = dist
+            # Their old edges went with the removed node
+            diff = _merge(diff, self._reparent(state, rows, parent, detach=False))
+        return diff
+
+    # ─── Helpers ──────────────────────────────────────────────────────────
+
+    def _reparent(self, state, rows, new_cols, detach=True):
+        added, removed = [], []
+        for row, col in zip(np.asarray(rows).tolist(), np.asarray(new_cols).tolist()):
+            old = state.parent[row]
+            if old == col:
+                continue
+            dev_id = state.dev_ids[row]
+            new_parent = state.parent_id(col)
+            if detach:
+                old_parent = state.parent_id(old)
+                self.G.remove_edge(old_parent, dev_id)
+                removed.append((old_parent, dev_id))
+            self.G.add_edge(new_parent, dev_id)
+            added.append((new_parent, dev_id))
+            state.parent[row] = col
+        return EdgeDiff(added, removed)
+
+
+def _vec(position):
+    if isinstance(position, dict):
+        return np.array([position["x"], position["y"], position["z"]], dtype=float)
+    return np.asarray(position, dtype=float).reshape(3)
+
+def _merge(a, b):
+    return EdgeDiff(a.added + b.added, a.removed + b.removed)
@@ -0,0 +1,211 @@
+import numpy as np
+
+from .profiling import stage
+
+# ─── Child Index ─────────────────────────────────────────────────────────────
+
+def child_index(parent, order=None):
+    """
+    CSR children of a parent array: the children of row `p` are
+    `children[ptr[p]:ptr[p+1]]`. Siblings follow `order` (row order when
+    None), which is their left-to-right order in the layout.
+    """
+    parent = np.asarray(parent)
+    n = len(parent)
+    rows = np.arange(n) if order is None else np.asarray(order)
+    rows = rows[parent[rows] >= 0]
+    rows = rows[np.argsort(parent[rows], kind="stable")]
+    counts = np.bincount(parent[rows], minlength=n)
+    ptr = np.zeros(n + 1, dtype=np.intp)
+    np.cumsum(counts, out=ptr[1:])
+    return ptr, rows
+
+
+# ─── Tree Layout ─────────────────────────────────────────────────────────────
+
+class TreeLayout:
+    """
+    Top-down tree layout, the same one the scripts' recursive `hierarchy_pos`
+    draws: every node splits its width evenly between its children, one
+    `vert_gap` per level, several roots share the [0,1] band side by side.
+
+    Computed iteratively one level at a time over a child index, so deep
+    trees never hit the recursion limit and each level is a handful of NumPy
+    ops. The children of row `p` are `children[start[p]:start[p] + count[p]]`;
+    a list that changes is rewritten at the end of the `children` buffer, so
+    an edit touches only the lists of the parents it changed. `xy` is an
+    (N,2) array in row order; `width` is kept per node so `relayout` only
+    re-lays the branches under those parents.
+    """
+
+    def __init__(self, parent, ids=None, order=None, vert_gap=0.2, vert_loc=0.0):
+        self.vert_gap = vert_gap
+        self.vert_loc = vert_loc
+        self.ids = ids
+        # Siblings in row order, or in `order` with later children appended
+        self._row_order = order is None
+        self.parent = np.array(parent, dtype=np.intp)
+        self._index_children(order)
+        self.roots = np.flatnonzero(self.parent < 0)
+        self.xy = np.zeros((len(self.parent), 2))
+        self.width = np.zeros(len(self.parent))
+        self._layout_roots()
+
+    @classmethod
+    def from_forest(cls, forest, **kwargs):
+        return cls(forest.parent[:forest.n], ids=forest.ids, **kwargs)
+
+    @classmethod
+    def from_networkx(cls, G, **kwargs):
+        """
+        Layout of a DiGraph that is a forest; siblings keep
+        `G.successors` order, like `hierarchy_pos`.
+        """
+        ids = list(G.nodes)
+        index = {node: row for row, node in enumerate(ids)}
+        parent = np.full(len(ids), -1, dtype=np.intp)
+        order = []
+        for u in ids:
+            for v in G.successors(u):
+                parent[index[v]] = index[u]
+                order.append(index[v])
+        order = np.array(order + [index[r] for r in ids if parent[index[r]] < 0], dtype=np.intp)
+        return cls(parent, ids=ids, order=order, **kwargs)
+
+    # ─── Child Lists ──────────────────────────────────────────────────────
+
+    def _index_children(self, order=None):
+        ptr, self.children = child_index(self.parent, order)
+        self.start = ptr[:-1].copy()
+        self.count = np.diff(ptr)
+        self._used = self._live = len(self.children)
+
+    def _set_children(self, p, kids):
+        # Append the new list to the buffer (doubling it when full) and
+        # repack once dead lists take more room than live ones
+        end = self._used + len(kids)
+        if end > len(self.children):
+            grown = np.empty(max(2 * len(self.children), end, 16), dtype=np.intp)
+            grown[:self._used] = self.children[:self._used]
+            self.children = grown
+        self.children[self._used:end] = kids
+        self._live += len(kids) - self.count[p]
+        self.start[p], self.count[p] = self._used, len(kids)
+        self._used = end
+        if self._used > 2 * max(self._live, 1024):
+            offsets = np.cumsum(self.count) - self.count
+            rows = np.repeat(self.start, self.count) + np.arange(self._live) - np.repeat(offsets, self.count)
+            self.children = self.children[rows]
+            self.start = offsets
+            self._used = self._live
+
+    # ─── Level Pass ───────────────────────────────────────────────────────
+
+    def _expand(self, frontier):
+        """
+        Children of every node in `frontier`: rows, their parents, their rank
+        among siblings and the sibling count.
+        """
+        starts = self.start[frontier]
+        counts = self.count[frontier]
+        total = counts.sum()
+        offsets = np.repeat(np.cumsum(counts) - counts, counts)
+        rank = np.arange(total) - offsets
+        rows = self.children[np.repeat(starts, counts) + rank]
+        return rows, np.repeat(frontier, counts), rank, np.repeat(counts, counts)
+
+    def _layout_below(self, frontier):
+        xy, width = self.xy, self.width
+        while len(frontier):
+            rows, par, rank, count = self._expand(frontier)
+            dx = width[par] / count
+            width[rows] = dx
+            xy[rows, 0] = xy[par, 0] - width[par] / 2 + dx * (rank + 0.5)
+            xy[rows, 1] = xy[par, 1] - self.vert_gap
+            frontier = rows
+
+    def _layout_roots(self):
+        chunk = 1.0 / max(len(self.roots), 1)
+        self.width[self.roots] = chunk
+        self.xy[self.roots, 0] = (np.arange(len(self.roots)) + 0.5) * chunk
+        self.xy[self.roots, 1] = self.vert_loc
+        self._layout_below(self.roots)
+
+    # ─── Incremental Updates ──────────────────────────────────────────────
+
+    def relayout(self, parent, changed):
+        """
+        Update after a small edit. `parent` is the new parent array (rows may
+        have been appended) and `changed` the rows that were added or moved
+        to another parent. Only the child lists of their old and new parents
+        are rewritten and only the subtrees under those parents re-laid;
+        children gained go after their siblings (in row order when the
+        layout was built in row order). A new or removed root moves every
+        tree, so that falls back to a full layout.
+        """
+        parent = np.asarray(parent, dtype=np.intp)
+        changed = np.unique(np.asarray(changed, dtype=np.intp))
+        n_old, n = len(self.parent), len(parent)
+        if n > n_old:
+            grow = n - n_old
+            self.parent = np.concatenate([self.parent, np.full(grow, -1, dtype=np.intp)])
+            self.start = np.concatenate([self.start, np.zeros(grow, dtype=np.intp)])
+            self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.intp)])
+            self.xy = np.vstack([self.xy, np.zeros((grow, 2))])
+            self.width = np.concatenate([self.width, np.zeros(grow)])
+
+        existed = changed < n_old
+        old, new = self.parent[changed], parent[changed]
+        self.parent[changed] = new
+        roots_moved = ((old < 0) != (new < 0)) & existed | (new < 0) & ~existed
+
+        affected = np.unique(np.concatenate([old[existed & (old >= 0)], new[new >= 0]]))
+        for p in affected.tolist():
+            kids = self.children[self.start[p]:self.start[p] + self.count[p]]
+            kids = kids[self.parent[kids] == p]
+            gained = changed[(new == p) & ~np.isin(changed, kids)]
+            kids = np.concatenate([kids, gained])
+            self._set_children(p, np.sort(kids) if self._row_order else kids)
+
+        if roots_moved.any():
+            self.roots = np.flatnonzero(self.parent < 0)
+            self._layout_roots()
+            return self.xy
+        self._layout_below(_topmost(self.parent, affected))
+        return self.xy
+
+    def as_dict(self):
+        """
+        {node_id: (x, y)}, the form `nx.draw` takes.
+        """
+        ids = self.ids if self.ids is not None else range(len(self.xy))
+        return dict(zip(ids, zip(self.xy[:, 0].tolist(), self.xy[:, 1].tolist())))
+
+
+def _topmost(parent, rows):
+    """
+    Drop rows that lie under another row of `rows`; laying out the top one
+    covers them.
+    """
+    marked = set(rows.tolist())
+    keep = []
+    for row in rows.tolist():
+        p = parent[row]
+        while p >= 0 and p not in marked:
+            p = parent[p]
+        if p < 0:
+            keep.append(row)
+    return np.array(keep, dtype=np.intp)
+
+
+def hierarchy_layout(G, vert_gap=0.2, vert_loc=0.0):
+    """
+    Drop-in for the scripts' `hierarchy_pos` over all roots: a
+    {node: (x, y)} dict for `nx.draw`. Accepts a DiGraph or a `PlaceForest`.
+    """
+    with stage("layout"):
+        if hasattr(G, "first_child"):
+            layout = TreeLayout.from_forest(G, vert_gap=vert_gap, vert_loc=vert_loc)
+        else:
+            layout = TreeLayout.from_networkx(G, vert_gap=vert_gap, vert_loc=vert_loc)
+        return layout.as_dict()
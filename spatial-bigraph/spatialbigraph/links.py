@@ -0,0 +1,281 @@
+"""
+The link graph of a spatial bigraph: hyperedges between IoT devices.
+
+The place graph (`bigraph.py`) nests room → element → device; the link
+graph connects devices across that nesting. A link joins every device that
+shares an attribute value (same `type`, same `room`, same hub, ...) or that
+is connected through radio range (devices within `radius` of each other,
+transitively, form one network).
+
+    devices = scene_devices(Scene.load("Jsons/bigraphwithiot.json"))
+    links = build_link_graph(devices, attributes=("type",), radius=3.0)
+    links.links_of(device_id)       # [("type", "on table"), ("range", "r=3#0")]
+    edge, device = links.incidence()
+
+Range links come from a spatial hash with cells as wide as the radius, so
+only devices in neighbouring cells are compared, and the connected groups
+are found with a union-find; there is no all-pairs pass. Links are stored
+as a CSR incidence structure (`ptr`, `members`), one row per hyperedge.
+"""
+import numpy as np
+
+from .profiling import count, stage
+from .scene import DEVICE_DTYPE, device_row
+
+# ─── Devices ─────────────────────────────────────────────────────────────────
+
+def scene_devices(scene):
+    """
+    Every device of a `Scene` as one DEVICE_DTYPE array: each room's devices
+    (top-level `IoTDevices` already merged into their room), then the
+    top-level ones naming no known room.
+    """
+    parts = [room.devices for room in scene.rooms]
+    if scene.unassigned_devices:
+        parts.append(np.array([device_row(d) for d in scene.unassigned_devices], dtype=DEVICE_DTYPE))
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=DEVICE_DTYPE)
+
+
+# ─── Union-Find ──────────────────────────────────────────────────────────────
+
+class UnionFind:
+    """
+    Disjoint sets over rows 0..n-1, with whole arrays of unions at a time.
+
+    Each round links the larger root of every pair under the smaller one
+    (so no cycles can form; pairs that lost a write race simply go again in
+    the next round) and then compresses every path by pointer jumping.
+    """
+
+    def __init__(self, n):
+        self.parent = np.arange(n, dtype=np.intp)
+
+    def _compress(self):
+        parent = self.parent
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        self.parent = parent
+
+    def find(self, rows=None):
+        """
+        Root of every row in `rows` (all rows when None).
+        """
+        self._compress()
+        return self.parent if rows is None else self.parent[rows]
+
+    def union(self, a, b):
+        """
+        Merge the sets of a[i] and b[i] for every i.
+        """
+        a, b = np.asarray(a, dtype=np.intp), np.asarray(b, dtype=np.intp)
+        while len(a):
+            ra, rb = self.find(a), self.find(b)
+            apart = ra != rb
+            a, b, ra, rb = a[apart], b[apart], ra[apart], rb[apart]
+            self.parent[np.maximum(ra, rb)] = np.minimum(ra, rb)
+        return self
+
+    def groups(self):
+        """
+        Set number (0..k-1, in order of each set's smallest row) per row.
+        """
+        _, label = np.unique(self.find(), return_inverse=True)
+        return label
+
+
+# ─── Range Pairs ─────────────────────────────────────────────────────────────
+
+# Neighbour cells with a lexicographically positive offset: together with
+# the cell itself they visit every pair of adjacent cells once
+_HALF_OFFSETS = np.array([(dx, dy, dz)
+                          for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+                          if (dx, dy, dz) > (0, 0, 0)], dtype=np.int64)
+
+def range_pairs(positions, radius, groups=None):
+    """
+    Every pair (i < j) of points within `radius` of each other, found
+    through a spatial hash with `radius`-wide cells. With `groups`, only
+    points of the same group are paired. Returns two index arrays.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    n = len(positions)
+    if n < 2:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    cells = np.floor(positions / radius).astype(np.int64)
+    cells -= cells.min(axis=0) - 1
+    dims = cells.max(axis=0) + 2
+    key = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    if groups is not None:
+        key = np.asarray(groups, dtype=np.int64) * int(np.prod(dims)) + key
+
+    order = np.argsort(key, kind="stable")
+    cell_keys, starts, sizes = np.unique(key[order], return_index=True, return_counts=True)
+
+    pi, pj = [], []
+    for offset in [np.zeros(3, dtype=np.int64)] + list(_HALF_OFFSETS):
+        delta = (offset[0] * dims[1] + offset[1]) * dims[2] + offset[2]
+        k = np.searchsorted(cell_keys, cell_keys + delta)
+        k = np.minimum(k, len(cell_keys) - 1)
+        has = cell_keys[k] == cell_keys + delta
+        a, b = np.flatnonzero(has), k[has]
+        na, nb = sizes[a], sizes[b]
+        total = na * nb
+        # Every (point of cell a, point of cell b) combination
+        pair = np.repeat(np.arange(len(a)), total)
+        m = np.arange(total.sum()) - np.repeat(np.cumsum(total) - total, total)
+        i = order[starts[a][pair] + m // nb[pair]]
+        j = order[starts[b][pair] + m % nb[pair]]
+        if not delta:
+            keep = i < j
+            i, j = i[keep], j[keep]
+        pi.append(i)
+        pj.append(j)
+    i, j = np.concatenate(pi), np.concatenate(pj)
+    count("distance_evaluations", len(i))
+    d = positions[i] - positions[j]
+    near = np.einsum("ij,ij->i", d, d) <= radius * radius
+    i, j = i[near], j[near]
+    return np.minimum(i, j), np.maximum(i, j)
+
+
+# ─── Link Graph ──────────────────────────────────────────────────────────────
+
+class LinkGraph:
+    """
+    Hyperedges over an array of devices, as sparse incidence arrays:
+
+      ptr, members   CSR: link e joins device rows members[ptr[e]:ptr[e+1]]
+      kind           row into `kind_names` per link ("type", "range", ...)
+      keys           the shared value per link (attribute value, or
+                     "r=<radius>#<k>" for the k-th range group)
+
+    `devices` is the DEVICE_DTYPE array the rows refer to; `index` maps
+    device ids to rows.
+    """
+
+    def __init__(self, devices):
+        self.devices = devices
+        self.ids = devices["id"].tolist()
+        self.index = {dev_id: row for row, dev_id in enumerate(self.ids)}
+        self.kind_names = []
+        self.kind = np.zeros(0, dtype=np.intp)
+        self.keys = []
+        self.ptr = np.zeros(1, dtype=np.intp)
+        self.members = np.zeros(0, dtype=np.intp)
+        self._by_device = None
+
+    def __len__(self):
+        return len(self.kind)
+
+    def add_groups(self, kind, group, keys, min_size=2):
+        """
+        One link per group with at least `min_size` devices. `group` holds a
+        group number per device row (-1: in no group) and `keys[g]` the
+        shared value of group g. Returns the number of links added.
+        """
+        group = np.asarray(group, dtype=np.intp)
+        rows = np.flatnonzero(group >= 0)
+        sizes = np.bincount(group[rows], minlength=len(keys))
+        kept = np.flatnonzero(sizes >= min_size)
+        rows = rows[np.isin(group[rows], kept)]
+        rows = rows[np.argsort(group[rows], kind="stable")]
+
+        if kind not in self.kind_names:
+            self.kind_names.append(kind)
+        self.kind = np.concatenate([self.kind, np.full(len(kept), self.kind_names.index(kind))])
+        self.keys.extend(keys[g] for g in kept.tolist())
+        self.ptr = np.concatenate([self.ptr, self.ptr[-1] + np.cumsum(sizes[kept])])
+        self.members = np.concatenate([self.members, rows])
+        self._by_device = None
+        count("links", len(kept))
+        return len(kept)
+
+    def link_attribute(self, field, values=None, min_size=2):
+        """
+        Link devices sharing a value of `field` (a DEVICE_DTYPE field, or any
+        per-device `values`, e.g. hubs read from the raw dicts). Empty or
+        None values link nothing.
+        """
+        values = self.devices[field] if values is None else values
+        values = np.array(["" if v is None else str(v) for v in values], dtype=str)
+        keys, group = np.unique(values, return_inverse=True)
+        if len(keys) and keys[0] == "":
+            group = group - 1
+            keys = keys[1:]
+        return self.add_groups(field, group, keys.tolist(), min_size)
+
+    def link_range(self, radius, per_room=False, min_size=2):
+        """
+        Link devices connected through chains of devices at most `radius`
+        apart, one link per connected group. With `per_room` only devices
+        of the same room are chained (rooms exported separately need not
+        share a coordinate frame).
+        """
+        rooms = None
+        if per_room:
+            _, rooms = np.unique(self.devices["room"], return_inverse=True)
+        i, j = range_pairs(self.devices["position"], radius, rooms)
+        group = UnionFind(len(self.devices)).union(i, j).groups()
+        keys = [f"r={radius:g}#{g}" for g in range(int(group.max()) + 1 if len(group) else 0)]
+        return self.add_groups("range", group, keys, min_size)
+
+    # ─── Queries ──────────────────────────────────────────────────────────
+
+    def members_of(self, link):
+        """
+        Device ids joined by link number `link`.
+        """
+        return [self.ids[r] for r in self.members[self.ptr[link]:self.ptr[link + 1]].tolist()]
+
+    def incidence(self):
+        """
+        COO incidence: parallel (link, device row) arrays, one per membership.
+        """
+        return np.repeat(np.arange(len(self)), np.diff(self.ptr)), self.members
+
+    def device_links(self):
+        """
+        The transposed CSR, (ptr, links): device row r is in links
+        links[ptr[r]:ptr[r+1]]. Cached until links are added.
+        """
+        if self._by_device is None:
+            link, dev = self.incidence()
+            order = np.argsort(dev, kind="stable")
+            ptr = np.zeros(len(self.devices) + 1, dtype=np.intp)
+            np.cumsum(np.bincount(dev, minlength=len(self.devices)), out=ptr[1:])
+            self._by_device = (ptr, link[order])
+        return self._by_device
+
+    def links_of(self, device_id):
+        """
+        (kind, key) of every link the device is in.
+        """
+        ptr, links = self.device_links()
+        row = self.index[device_id]
+        return [(self.kind_names[self.kind[e]], self.keys[e]) for e in links[ptr[row]:ptr[row + 1]].tolist()]
+
+    def linked(self, a, b):
+        """
+        Do devices `a` and `b` share a link?
+        """
+        ptr, links = self.device_links()
+        ra, rb = self.index[a], self.index[b]
+        return bool(np.intersect1d(links[ptr[ra]:ptr[ra + 1]], links[ptr[rb]:ptr[rb + 1]]).size)
+
+
+def build_link_graph(devices, attributes=("type",), radius=None, per_room=False, min_size=2):
+    """
+    Link graph over a DEVICE_DTYPE array (see `scene_devices`): one link per
+    shared value of each field in `attributes`, plus range links when a
+    `radius` is given.
+    """
+    with stage("links"):
+        links = LinkGraph(devices)
+        for field in attributes:
+            links.link_attribute(field, min_size=min_size)
+        if radius is not None:
+            links.link_range(radius, per_room=per_room, min_size=min_size)
+    return links
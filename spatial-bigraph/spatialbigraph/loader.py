@@ -0,0 +1,220 @@
+import glob
+import json
+import os
+
+from .profiling import stage
+from .scene import Room, room_name_from_path
+
+# ─── Incremental JSON Reader ─────────────────────────────────────────────────
+
+_decoder = json.JSONDecoder()
+_WS = " \t\n\r"
+
+class JSONStream:
+    """
+    Incremental reader over a text file.
+
+    Walks the outer structure of a document token by token and decodes one
+    nested value at a time from a sliding buffer, so only the value currently
+    being decoded (e.g. one room) has to fit in memory.
+    """
+
+    def __init__(self, f, chunk_size=1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, min_size=0):
+        # Drop what has been consumed, then read at least `min_size` more
+        # characters so a value spanning many chunks is retried O(log n) times.
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        chunk = self.f.read(max(self.chunk_size, min_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def peek(self):
+        """
+        Next non-whitespace character, or "" at the end of the input.
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char!r} in JSON stream, found {found!r}")
+        self.pos += 1
+
+    def skip(self, char):
+        """
+        Consume `char` if it is next; return whether it was.
+        """
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def value(self):
+        """
+        Decode the next complete JSON value.
+        """
+        self.peek()
+        while True:
+            try:
+                val, end = _decoder.raw_decode(self.buf, self.pos)
+                # A value ending exactly at the buffer edge may be a cut-off number
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return val
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill(len(self.buf) - self.pos)
+
+    def skip_value(self):
+        """
+        Consume the next JSON value without keeping it. An array is decoded
+        one element at a time, so skipping the rooms holds one room at most.
+        """
+        if not self.skip("["):
+            self.value()
+            return
+        if self.skip("]"):
+            return
+        while True:
+            self.value()
+            if not self.skip(","):
+                break
+        self.expect("]")
+
+
+# ─── Room Streaming ──────────────────────────────────────────────────────────
+
+def stream_rooms(path, default_name=None, extras=None, chunk_size=1 << 16):
+    """
+    Yield `(room_name, room_data)` one room at a time from a RoomPlan export.
+
+    Accepts the `{"Rooms": [{name: room}, ...]}` layout under `Jsons/` and
+    the single `{"room": {...}}` layout under `Data/*/` (named after the file,
+    see `room_name_from_path`). Other top-level members are decoded into
+    `extras` when a dict is given, and skipped otherwise.
+    """
+    if default_name is None:
+        default_name = room_name_from_path(path)
+
+    with open(path, "r") as f:
+        stream = JSONStream(f, chunk_size)
+        stream.expect("{")
+        if stream.skip("}"):
+            return
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key == "Rooms":
+                stream.expect("[")
+                if not stream.skip("]"):
+                    while True:
+                        yield from stream.value().items()
+                        if not stream.skip(","):
+                            break
+                    stream.expect("]")
+            elif key == "room":
+                yield default_name, stream.value()
+            else:
+                val = stream.value()
+                if extras is not None:
+                    extras[key] = val
+            if not stream.skip(","):
+                break
+        stream.expect("}")
+
+
+def group_by_room(devices):
+    """
+    {room_name: [device, ...]} for a top-level `IoTDevices` list.
+    """
+    grouped = {}
+    for dev in devices:
+        grouped.setdefault(dev.get("room"), []).append(dev)
+    return grouped
+
+
+def top_level_members(path, skip=("Rooms", "room"), chunk_size=1 << 16):
+    """
+    {key: value} of the top-level members of a RoomPlan export other than
+    `skip` (by default the rooms, which are read past and dropped).
+    """
+    members = {}
+    with open(path, "r") as f:
+        stream = JSONStream(f, chunk_size)
+        stream.expect("{")
+        if stream.skip("}"):
+            return members
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key in skip:
+                stream.skip_value()
+            else:
+                members[key] = stream.value()
+            if not stream.skip(","):
+                break
+        stream.expect("}")
+    return members
+
+
+def stream_scene(path, chunk_size=1 << 16):
+    """
+    Like `Scene.load`, but yields one `Room` at a time.
+
+    Devices of a top-level `IoTDevices` list, before or after the rooms (as
+    the RoomPlan app writes it), are merged into their room, so every room
+    is yielded once with all of its devices. The list is read by a first
+    pass that drops every room as soon as it is decoded, so only one room
+    is held at a time in either pass. Devices naming no room in the file
+    are dropped.
+    """
+    with stage("json"):
+        pending = group_by_room(top_level_members(path, chunk_size=chunk_size).get("IoTDevices", []))
+    rooms = stream_rooms(path, chunk_size=chunk_size)
+    while True:
+        # Timed around next() only: the consumer's work between rooms is not
+        # part of parsing
+        with stage("json"):
+            item = next(rooms, None)
+        if item is None:
+            break
+        name, data = item
+        with stage("arrays", room=name):
+            room = Room.from_dict(name, data)
+            room.add_devices(pending.pop(name, []))
+        yield room
+
+
+# ─── Inputs ──────────────────────────────────────────────────────────────────
+
+def find_inputs(specs):
+    """
+    Expand files, directories (searched recursively for *.json) and glob
+    patterns into a sorted, de-duplicated list of JSON paths.
+    """
+    paths = []
+    for spec in specs:
+        if os.path.isdir(spec):
+            paths.extend(glob.glob(os.path.join(spec, "**", "*.json"), recursive=True))
+        elif os.path.isfile(spec):
+            paths.append(spec)
+        else:
+            paths.extend(glob.glob(spec, recursive=True))
+    return sorted(set(paths))
@@ -0,0 +1,327 @@
+"""
+Level-of-detail views of place graphs too large to draw node by node.
+
+    lod = LevelOfDetail.from_forest(forest)              # aggregates, once
+    view = lod.view(budget=300)                          # at most 300 nodes
+    view = lod.view(budget=500, focus="Kitchen")         # one room in full
+    view = lod.view(max_depth=1, expanded=["Kitchen"])
+    draw_lod(ax, view)                                   # see render.py
+
+One bottom-up pass gives every node the size of its subtree and the count
+of every label below it. A view then decides top down which nodes to open:
+a node shows its children only when all of them fit in the node budget
+(and it lies above `max_depth`); otherwise it stays a summary node standing
+for its whole subtree, e.g. "Kitchen / 84 nodes: 40 Light, 12 Wall, ...".
+Choosing and laying out a view touches only the nodes it shows, so a
+redraw costs what the budget allows, not what the building holds.
+"""
+from collections import deque, namedtuple
+
+import numpy as np
+
+from .layout import child_index
+from .profiling import count, stage
+
+# One view of the tree, all arrays over its visible nodes:
+#   ids, rows  node ids and their rows in the full tree (see OTHER_ROOTS)
+#   parent     parent as an index into `rows`, -1 for roots
+#   xy         (V,2) positions, see `leaf_layout`
+#   labels     text per node: its label, plus the counts below a summary
+#   hidden     nodes collapsed under each node (0 unless it is a summary)
+LodView = namedtuple("LodView", ["ids", "rows", "parent", "xy", "labels", "hidden"])
+
+# Id (and row -1) of the one summary node standing for the roots a view leaves out
+OTHER_ROOTS = "<more roots>"
+
+# ─── Aggregates ──────────────────────────────────────────────────────────────
+
+class LevelOfDetail:
+    """
+    A place tree with per-subtree aggregates, and the views cut from it.
+
+    `size[row]` is the number of nodes in the subtree of `row` (itself
+    included); the label counts below `row` are
+    `agg_label[agg_ptr[row]:agg_ptr[row+1]]` / `agg_count[...]`, rows into
+    `label_names` (the last row standing for unlabelled nodes). Both are
+    computed once in `__init__`, level by level from the leaves up.
+    Summary texts are cached per node the first time a view shows them.
+    """
+
+    def __init__(self, parent, label, label_names, ids=None, order=None):
+        with stage("lod_aggregate"):
+            self.parent = np.asarray(parent, dtype=np.intp)
+            n = len(self.parent)
+            self.ids = list(ids) if ids is not None else list(range(n))
+            self.index = {node_id: row for row, node_id in enumerate(self.ids)}
+            self.label_names = list(label_names) + [None]
+            # -1 (no label) → the trailing None entry
+            self.label = np.where(np.asarray(label) < 0, len(label_names), label).astype(np.intp)
+            self.ptr, self.children = child_index(self.parent, order)
+            self.roots = np.flatnonzero(self.parent < 0)
+            if order is not None:
+                order = np.asarray(order, dtype=np.intp)
+                self.roots = order[self.parent[order] < 0]
+
+            # Rows per depth, top down
+            self.depth = np.zeros(n, dtype=np.intp)
+            levels = [self.roots]
+            while len(levels[-1]):
+                frontier = levels[-1]
+                starts, stops = self.ptr[frontier], self.ptr[frontier + 1]
+                rows = self.children[np.repeat(starts, stops - starts)
+                                     + _ranks(stops - starts)]
+                self.depth[rows] = len(levels)
+                levels.append(rows)
+
+            # Bottom up: subtree sizes, and (node, label) → count pairs
+            # carried to the parent one level at a time
+            self.size = np.ones(n, dtype=np.intp)
+            n_labels = len(self.label_names)
+            carry_key, carry_count = np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+            keys, counts = [], []
+            for rows in reversed(levels[1:]):
+                np.add.at(self.size, self.parent[rows], self.size[rows])
+                up = self.parent[carry_key // n_labels] * n_labels + carry_key % n_labels
+                key = np.concatenate([self.parent[rows] * n_labels + self.label[rows], up])
+                weight = np.concatenate([np.ones(len(rows), dtype=np.intp), carry_count])
+                carry_key, inverse = np.unique(key, return_inverse=True)
+                carry_count = np.bincount(inverse, weights=weight, minlength=len(carry_key)).astype(np.intp)
+                keys.append(carry_key)
+                counts.append(carry_count)
+            key = np.concatenate(keys) if keys else np.empty(0, dtype=np.intp)
+            pick = np.argsort(key, kind="stable")
+            key = key[pick]
+            self.agg_label = key % n_labels
+            self.agg_count = (np.concatenate(counts)[pick] if counts else np.empty(0, dtype=np.intp))
+            self.agg_ptr = np.zeros(n + 1, dtype=np.intp)
+            np.cumsum(np.bincount(key // n_labels, minlength=n), out=self.agg_ptr[1:])
+            self.totals = np.bincount(self.label, minlength=n_labels)
+            self._summaries = {}
+            count("lod_aggregates", len(key))
+
+    @classmethod
+    def from_forest(cls, forest):
+        return cls(forest.parent[:forest.n], forest.label[:forest.n], forest.label_names, ids=forest.ids)
+
+    @classmethod
+    def from_networkx(cls, G):
+        """
+        Aggregates of a DiGraph that is a forest, labels from the `label`
+        node attribute and siblings in `G.successors` order.
+        """
+        ids = list(G.nodes)
+        index = {node: row for row, node in enumerate(ids)}
+        parent = np.full(len(ids), -1, dtype=np.intp)
+        order = []
+        for u in ids:
+            for v in G.successors(u):
+                parent[index[v]] = index[u]
+                order.append(index[v])
+        order = np.array([index[r] for r in ids if parent[index[r]] < 0] + order, dtype=np.intp)
+
+        names, label_index = [], {}
+        label = np.full(len(ids), -1, dtype=np.intp)
+        for row, (_, lab) in enumerate(G.nodes(data="label")):
+            if lab is not None:
+                if lab not in label_index:
+                    label_index[lab] = len(names)
+                    names.append(lab)
+                label[row] = label_index[lab]
+        return cls(parent, label, names, ids=ids, order=order)
+
+    def __len__(self):
+        return len(self.parent)
+
+    # ─── Per-Node Queries ─────────────────────────────────────────────────
+
+    def child_rows(self, row):
+        return self.children[self.ptr[row]:self.ptr[row + 1]]
+
+    def label_counts(self, node_id):
+        """
+        {label: count} over the nodes below `node_id`, most frequent first.
+        """
+        row = self.index[node_id]
+        lo, hi = self.agg_ptr[row], self.agg_ptr[row + 1]
+        pick = np.argsort(-self.agg_count[lo:hi], kind="stable")
+        return {self.label_names[lab]: c for lab, c in zip(self.agg_label[lo:hi][pick].tolist(),
+                                                           self.agg_count[lo:hi][pick].tolist())}
+
+    def summary(self, row, top=3):
+        """
+        Text of `row` as a summary node: its label, the size of what it
+        hides and its `top` most frequent labels. Cached per (row, top).
+        """
+        text = self._summaries.get((row, top))
+        if text is None:
+            counts = self.label_counts(self.ids[row])
+            parts = [f"{c} {lab if lab is not None else '?'}" for lab, c in list(counts.items())[:top]]
+            if len(counts) > top:
+                parts.append("...")
+            name = self.label_names[self.label[row]]
+            name = name if name is not None else str(self.ids[row])
+            text = self._summaries[(row, top)] = f"{name}\n{self.size[row] - 1} nodes: {', '.join(parts)}"
+        return text
+
+    # ─── Views ────────────────────────────────────────────────────────────
+
+    def view(self, budget=None, max_depth=None, focus=None, expanded=(), collapsed=(),
+             top=3, vert_gap=0.2):
+        """
+        `LodView` with at most `budget` nodes.
+
+        Nodes in `expanded` are opened along with their ancestors, and
+        nodes in `collapsed` never are; both by node id and regardless of
+        the budget. With `focus` (a node id, typically a room) only that
+        node's subtree is opened by budget, and the roots other than those
+        of `focus` and `expanded` fold into one `OTHER_ROOTS` summary node.
+        Otherwise nodes open breadth first, each only when all its children
+        still fit, and none at or below `max_depth`; roots beyond the
+        budget fold the same way.
+        """
+        budget = np.inf if budget is None else budget
+        max_depth = np.inf if max_depth is None else max_depth
+        closed = {self.index[node_id] for node_id in collapsed}
+        forced = list(expanded) + ([focus] if focus is not None else [])
+
+        # Roots kept apart: those of the forced nodes, then (without a
+        # focus) the others in order while they leave room for the group
+        kept = {self._root(self.index[node_id]) for node_id in forced}
+        roots = self.roots.tolist()
+        if focus is None and len(roots) > budget:
+            for row in roots:
+                if len(kept) >= budget - 1:
+                    break
+                kept.add(row)
+        if focus is not None or len(roots) > budget:
+            roots = [row for row in roots if row in kept]
+        n_shown = len(roots) + (len(roots) < len(self.roots))
+        is_open = set()
+
+        def open_row(row):
+            nonlocal n_shown
+            is_open.add(row)
+            n_shown += self.ptr[row + 1] - self.ptr[row]
+
+        with stage("lod_view"):
+            # Explicit expansions first, top down along their ancestor paths
+            for node_id in forced:
+                path = []
+                row = self.index[node_id]
+                while row >= 0:
+                    path.append(row)
+                    row = self.parent[row]
+                for row in reversed(path if node_id != focus else path[1:]):
+                    if row in closed:
+                        break
+                    if row not in is_open:
+                        open_row(row)
+
+            queue = deque([self.index[focus]] if focus is not None else roots)
+            while queue:
+                row = queue.popleft()
+                if row in closed or self.depth[row] >= max_depth:
+                    continue
+                if row not in is_open:
+                    n_kids = self.ptr[row + 1] - self.ptr[row]
+                    if n_kids == 0 or n_shown + n_kids > budget:
+                        continue
+                    open_row(row)
+                queue.extend(self.child_rows(row).tolist())
+
+            # Visible rows in tree order (roots, then children of open nodes
+            # in sibling order), so the layout keeps the full tree's order
+            rows = []
+            stack = roots[::-1]
+            while stack:
+                row = stack.pop()
+                rows.append(row)
+                if row in is_open:
+                    stack.extend(self.child_rows(row).tolist()[::-1])
+            local = {row: i for i, row in enumerate(rows)}
+            parent = [local.get(p, -1) for p in self.parent[rows].tolist()]
+            hidden = [0 if row in is_open else self.size[row] - 1 for row in rows]
+            labels = [self.summary(row, top) if h else self.label_names[self.label[row]]
+                      for row, h in zip(rows, hidden)]
+            ids = [self.ids[row] for row in rows]
+            if len(roots) < len(self.roots):
+                n_hidden, text = self._other_roots(roots, top)
+                rows.append(-1)
+                parent.append(-1)
+                hidden.append(n_hidden)
+                labels.append(text)
+                ids.append(OTHER_ROOTS)
+            parent = np.array(parent, dtype=np.intp)
+            xy = leaf_layout(parent, vert_gap)
+            count("lod_nodes", len(rows))
+        return LodView(ids, np.array(rows, dtype=np.intp), parent, xy, labels,
+                       np.array(hidden, dtype=np.intp))
+
+    def _root(self, row):
+        while self.parent[row] >= 0:
+            row = self.parent[row]
+        return row
+
+    def _other_roots(self, kept, top):
+        """
+        Size and summary text of the roots not in `kept`, from the forest
+        totals minus the kept subtrees (so only those are visited).
+        """
+        counts = self.totals.copy()
+        n_hidden = len(self)
+        for row in kept:
+            lo, hi = self.agg_ptr[row], self.agg_ptr[row + 1]
+            np.subtract.at(counts, self.agg_label[lo:hi], self.agg_count[lo:hi])
+            counts[self.label[row]] -= 1
+            n_hidden -= self.size[row]
+        pick = np.argsort(-counts, kind="stable")
+        pick = pick[counts[pick] > 0]
+        parts = [f"{counts[lab]} {self.label_names[lab] if self.label_names[lab] is not None else '?'}"
+                 for lab in pick[:top].tolist()]
+        if len(pick) > top:
+            parts.append("...")
+        n_roots = len(self.roots) - len(kept)
+        return n_hidden, f"{n_roots} more roots\n{n_hidden} nodes: {', '.join(parts)}"
+
+
+def leaf_layout(parent, vert_gap=0.2):
+    """
+    (V,2) top-down positions of a tree given in preorder (`parent` indexes
+    earlier rows, -1 for roots): every leaf, summary nodes included, gets
+    an equal slot of [0,1] from left to right and every other node sits
+    above the middle of its leaves. Unlike `TreeLayout`'s even split per
+    parent, a branch gets the width of what it shows, so an expanded room
+    next to hundreds of summarized ones stays readable.
+    """
+    parent = np.asarray(parent, dtype=np.intp)
+    n = len(parent)
+    xy = np.zeros((n, 2))
+    if n == 0:
+        return xy
+    is_leaf = np.ones(n, dtype=bool)
+    is_leaf[parent[parent >= 0]] = False
+    slot = (np.cumsum(is_leaf) - 1).astype(float)
+    first = np.where(is_leaf, slot, np.inf).tolist()
+    last = np.where(is_leaf, slot, -np.inf).tolist()
+    depth = [0] * n
+    up = parent.tolist()
+    for row in range(n):
+        if up[row] >= 0:
+            depth[row] = depth[up[row]] + 1
+    # Children come after their parent in preorder: fold leaf spans upwards
+    for row in range(n - 1, -1, -1):
+        p = up[row]
+        if p >= 0:
+            first[p] = min(first[p], first[row])
+            last[p] = max(last[p], last[row])
+    n_leaves = max(int(is_leaf.sum()), 1)
+    xy[:, 0] = ((np.array(first) + np.array(last)) / 2 + 0.5) / n_leaves
+    xy[:, 1] = -vert_gap * np.array(depth)
+    return xy
+
+
+def _ranks(counts):
+    """
+    0..c-1 for every count c, concatenated.
+    """
+    return np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
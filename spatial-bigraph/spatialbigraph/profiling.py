@@ -0,0 +1,292 @@
+"""
+Per-stage timers and counters for the bigraph pipeline.
+
+The library wraps each stage (`json`, `arrays`, `surfaces`, `attach`,
+`build_room`, `layout`, `render`, ...) in `stage(...)` and reports sizes
+through `count(...)`. Both are no-ops until a `Profiler` is enabled, so
+the cost with instrumentation off is one global lookup per call.
+
+Turn it on for any script without editing it:
+
+    SPATIALBIGRAPH_PROFILE=1 python bigraphs_with_planes.py
+    SPATIALBIGRAPH_PROFILE=cprofile,tracemalloc SPATIALBIGRAPH_PROFILE_OUT=prof.json python ...
+
+or from code with `with profiled("report.json", tracemalloc=True): ...`.
+The JSON report holds wall time per stage (and per room), peak traced
+memory per stage, counts of surfaces, distance evaluations, devices and
+nodes/edges per room, and optionally the top cProfile entries.
+"""
+import atexit
+import cProfile
+import json
+import os
+import pstats
+import time
+import tracemalloc as _tracemalloc
+from contextlib import contextmanager, nullcontext
+
+PROFILE_ENV = "SPATIALBIGRAPH_PROFILE"
+PROFILE_OUT_ENV = "SPATIALBIGRAPH_PROFILE_OUT"
+DEFAULT_REPORT = "bigraph_profile.json"
+
+# The enabled profiler, or None
+_active = None
+_NULL = nullcontext()
+
+# ─── Hooks ───────────────────────────────────────────────────────────────────
+
+def stage(name, room=None):
+    """
+    Context manager timing one pipeline stage. `room` attributes the time,
+    and every `count` inside without its own room, to that room.
+    """
+    if _active is None:
+        return _NULL
+    return _Stage(_active, name, room)
+
+def count(name, n=1, room=None):
+    """
+    Add `n` to counter `name` for `room` (default: the innermost stage's).
+    """
+    if _active is not None:
+        _active.count(name, n, room)
+
+def enabled():
+    return _active is not None
+
+
+# ─── Profiler ────────────────────────────────────────────────────────────────
+
+class _Stage:
+    __slots__ = ("profiler", "name", "room", "t0", "peak")
+
+    def __init__(self, profiler, name, room):
+        self.profiler = profiler
+        self.name = name
+        self.room = room
+        self.peak = 0
+
+    def __enter__(self):
+        self.profiler._enter(self)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._exit(self, time.perf_counter() - self.t0)
+        return False
+
+
+class Profiler:
+    """
+    Collects stage timings and counters between `start()` and `stop()`.
+
+    With `tracemalloc` each stage also records its peak traced memory
+    (nested stages roll their peak up into the enclosing one); with
+    `cprofile` the whole session runs under `cProfile` and the report lists
+    the top functions by cumulative time.
+    """
+
+    def __init__(self, cprofile=False, tracemalloc=False):
+        self.cprofile = cprofile
+        self.tracemalloc = tracemalloc
+        self.stages = {}
+        self.rooms = {}
+        self.totals = {}
+        self._stack = []
+        self._profile = None
+        self._started_tracing = False
+        self._t0 = self.seconds = None
+        self.peak_bytes = 0
+
+    # ─── Session ──────────────────────────────────────────────────────────
+
+    def start(self):
+        if self.tracemalloc and not _tracemalloc.is_tracing():
+            _tracemalloc.start()
+            self._started_tracing = True
+        if self.cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._t0 = time.perf_counter()
+        return self
+
+    def stop(self):
+        self.seconds = time.perf_counter() - self._t0
+        if self._profile is not None:
+            self._profile.disable()
+        if self.tracemalloc:
+            self.peak_bytes = max(self.peak_bytes, _tracemalloc.get_traced_memory()[1])
+            if self._started_tracing:
+                _tracemalloc.stop()
+                self._started_tracing = False
+        return self
+
+    # ─── Recording ────────────────────────────────────────────────────────
+
+    def _room(self, room):
+        if room is None:
+            for st in reversed(self._stack):
+                if st.room is not None:
+                    return st.room
+        return room
+
+    def _enter(self, st):
+        if self.tracemalloc:
+            # reset_peak() below would lose the enclosing stage's (and the
+            # session's) peak so far, so fold it in first
+            peak = _tracemalloc.get_traced_memory()[1]
+            self.peak_bytes = max(self.peak_bytes, peak)
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, peak)
+            _tracemalloc.reset_peak()
+        st.room = self._room(st.room)
+        self._stack.append(st)
+
+    def _exit(self, st, seconds):
+        self._stack.pop()
+        rec = self.stages.get(st.name)
+        if rec is None:
+            rec = self.stages[st.name] = {"calls": 0, "seconds": 0.0}
+        rec["calls"] += 1
+        rec["seconds"] += seconds
+        if self.tracemalloc:
+            peak = max(st.peak, _tracemalloc.get_traced_memory()[1])
+            rec["peak_bytes"] = max(rec.get("peak_bytes", 0), peak)
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, peak)
+        if st.room is not None:
+            per_room = self._room_record(st.room)["seconds"]
+            per_room[st.name] = per_room.get(st.name, 0.0) + seconds
+
+    def _room_record(self, room):
+        rec = self.rooms.get(room)
+        if rec is None:
+            rec = self.rooms[room] = {"seconds": {}, "counts": {}}
+        return rec
+
+    def count(self, name, n=1, room=None):
+        self.totals[name] = self.totals.get(name, 0) + n
+        room = self._room(room)
+        if room is not None:
+            counts = self._room_record(room)["counts"]
+            counts[name] = counts.get(name, 0) + n
+
+    # ─── Report ───────────────────────────────────────────────────────────
+
+    def report(self, top=25):
+        out = {
+            "wall_seconds": self.seconds,
+            "stages": self.stages,
+            "totals": self.totals,
+            "rooms": self.rooms,
+        }
+        if self.tracemalloc:
+            out["peak_traced_bytes"] = self.peak_bytes
+        try:
+            import resource
+            # ru_maxrss is in KiB on Linux
+            out["max_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            pass
+        if self._profile is not None:
+            out["cprofile"] = _top_functions(self._profile, top)
+        return out
+
+    def write(self, path, top=25):
+        """
+        Write the JSON report to `path`; with cProfile on, the raw stats go
+        next to it as `<path>.prof` (for snakeviz / pstats).
+        """
+        with open(path, "w") as f:
+            json.dump(self.report(top), f, indent=2)
+        if self._profile is not None:
+            self._profile.dump_stats(os.path.splitext(path)[0] + ".prof")
+        return path
+
+
+def _top_functions(profile, top):
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda kv: kv[1][3], reverse=True)[:top]
+    return [{
+        "function": f"{filename}:{line}({func})",
+        "calls": nc,
+        "tottime": tt,
+        "cumtime": ct,
+    } for (filename, line, func), (_, nc, tt, ct, _) in rows]
+
+
+# ─── Switching On ────────────────────────────────────────────────────────────
+
+def enable(cprofile=False, tracemalloc=False):
+    """
+    Start a `Profiler` and route every `stage`/`count` to it.
+    """
+    global _active
+    if _active is not None:
+        disable()
+    _active = Profiler(cprofile=cprofile, tracemalloc=tracemalloc).start()
+    return _active
+
+def disable():
+    """
+    Stop the active profiler and return it (None when none was running).
+    """
+    global _active
+    profiler, _active = _active, None
+    return profiler.stop() if profiler is not None else None
+
+@contextmanager
+def profiled(path=None, cprofile=False, tracemalloc=False):
+    """
+    Profile the body; the report is written to `path` when given.
+    """
+    profiler = enable(cprofile=cprofile, tracemalloc=tracemalloc)
+    try:
+        yield profiler
+    finally:
+        disable()
+        if path:
+            profiler.write(path)
+
+def parse_options(value):
+    """
+    Options for `enable` from a flag/env value: "1"/"on" (timers and
+    counters only) or a comma list of "cprofile" and "tracemalloc".
+    Returns None when profiling is off ("", "0", "off").
+    """
+    value = (value or "").strip().lower()
+    if value in ("", "0", "off", "false", "no"):
+        return None
+    parts = {p.strip() for p in value.split(",")}
+    return {"cprofile": "cprofile" in parts, "tracemalloc": "tracemalloc" in parts}
+
+def enable_from_env(path=None, value=None):
+    """
+    Enable profiling when `value` (a command-line flag) or else
+    `SPATIALBIGRAPH_PROFILE` asks for it, and write the report at exit to
+    `path`, `SPATIALBIGRAPH_PROFILE_OUT` or `bigraph_profile.json`.
+    Returns the profiler, or None when off.
+    """
+    options = parse_options(value if value is not None else os.environ.get(PROFILE_ENV))
+    if options is None:
+        return None
+    path = path or os.environ.get(PROFILE_OUT_ENV) or DEFAULT_REPORT
+    profiler = enable(**options)
+
+    def finish():
+        if _active is profiler:
+            disable()
+            profiler.write(path)
+    atexit.register(finish)
+    return profiler
+
+def add_arguments(parser):
+    """
+    `--profile [OPTIONS]` / `--profile-out PATH` for a command-line tool;
+    pass the parsed values to `enable_from_env`.
+    """
+    parser.add_argument("--profile", nargs="?", const="1", default=None, metavar="OPTIONS",
+                        help="write a per-stage timing report; OPTIONS is a comma list of "
+                             f"cprofile,tracemalloc (default: ${PROFILE_ENV})")
+    parser.add_argument("--profile-out", default=None, metavar="PATH",
+                        help=f"report path (default: ${PROFILE_OUT_ENV} or {DEFAULT_REPORT})")
@@ -0,0 +1,289 @@
+"""
+Indexed ancestor/descendant queries over a built place graph.
+
+    index = BigraphIndex.from_networkx(G)
+    index.descendants("Kitchen", depth=2)            # every device in the room
+    index.ancestors(device_id)                       # [wall_id, "Kitchen"]
+    index.under_label("Storage", depth=2)            # devices under any Storage
+    index.is_ancestor(["Kitchen"] * 3, device_ids)   # batched, elementwise
+
+Built once after the graph is: every node gets its preorder enter time
+`tin` and exit time `tout`, so its subtree is the contiguous slice
+`order[tin:tout]` and an ancestor test is two comparisons. Per-label and
+per-depth posting lists (sorted `tin`s) turn filtered subtree queries into
+two binary searches. Results are the same node sets as `nx.descendants` /
+`nx.ancestors`; subtrees come in preorder, ancestors nearest first.
+"""
+import numpy as np
+
+from .layout import child_index
+from .profiling import stage
+
+# ─── Index ───────────────────────────────────────────────────────────────────
+
+class BigraphIndex:
+    """
+    Euler-tour intervals and posting lists over a forest given as a parent
+    array:
+
+      tin, tout   preorder enter time and exit time (exclusive) per row
+      order       rows in preorder, so order[tin[r]] == r
+      depth       0 for roots (rooms)
+      label       row into `label_names`, -1 where a node has none
+
+    `ids[row]` / `index[node_id]` map between node ids and rows. Methods
+    named `*_rows` take and return int rows for batched use; the others
+    take node ids and return node ids.
+    """
+
+    def __init__(self, parent, ids=None, labels=None, order=None):
+        with stage("query_index"):
+            self.parent = np.asarray(parent, dtype=np.intp)
+            n = len(self.parent)
+            self.ids = list(ids) if ids is not None else list(range(n))
+            self.index = {node: row for row, node in enumerate(self.ids)}
+            self._tour(order)
+            self._postings(labels)
+
+    @classmethod
+    def from_networkx(cls, G, label="label"):
+        """
+        Index of a DiGraph that is a forest (every node has at most one
+        parent). Siblings keep `G.successors` order.
+        """
+        ids = list(G.nodes)
+        index = {node: row for row, node in enumerate(ids)}
+        parent = np.full(len(ids), -1, dtype=np.intp)
+        order = []
+        for u in ids:
+            for v in G.successors(u):
+                if parent[index[v]] >= 0:
+                    raise ValueError(f"node {v!r} has more than one parent; not a forest")
+                parent[index[v]] = index[u]
+                order.append(index[v])
+        order = np.array(order + [index[r] for r in ids if parent[index[r]] < 0], dtype=np.intp)
+        labels = [G.nodes[node].get(label) for node in ids]
+        return cls(parent, ids=ids, labels=labels, order=order)
+
+    @classmethod
+    def from_forest(cls, forest):
+        labels = [forest.label_names[lab] if lab >= 0 else None
+                  for lab in forest.label[:forest.n].tolist()]
+        return cls(forest.parent[:forest.n], ids=forest.ids, labels=labels)
+
+    def __len__(self):
+        return len(self.parent)
+
+    # ─── Building ─────────────────────────────────────────────────────────
+
+    def _tour(self, order):
+        """
+        tin/tout/depth one tree level at a time: subtree sizes bottom-up,
+        then every child starts right after its parent plus the sizes of
+        the siblings before it.
+        """
+        n = len(self.parent)
+        ptr, children = child_index(self.parent, order)
+        roots = np.flatnonzero(self.parent < 0)
+
+        # Levels of (rows, parents' group sizes), children grouped by parent
+        levels, frontier = [(roots, np.array([len(roots)]))], roots
+        while len(frontier):
+            starts = ptr[frontier]
+            counts = ptr[frontier + 1] - starts
+            offsets = np.repeat(np.cumsum(counts) - counts, counts)
+            frontier = children[np.repeat(starts, counts) + np.arange(counts.sum()) - offsets]
+            if len(frontier):
+                levels.append((frontier, counts[counts > 0]))
+        if sum(len(rows) for rows, _ in levels) != n:
+            raise ValueError("parent array has a cycle; not a forest")
+
+        size = np.ones(n, dtype=np.intp)
+        for rows, _ in reversed(levels[1:]):
+            size += np.bincount(self.parent[rows], weights=size[rows], minlength=n).astype(np.intp)
+
+        tin = np.zeros(n, dtype=np.intp)
+        depth = np.zeros(n, dtype=np.intp)
+        for d, (rows, groups) in enumerate(levels):
+            # Sizes of the earlier siblings, restarted for every parent
+            before = np.cumsum(size[rows]) - size[rows]
+            before -= np.repeat(before[np.cumsum(groups) - groups], groups)
+            tin[rows] = before if d == 0 else tin[self.parent[rows]] + 1 + before
+            depth[rows] = d
+
+        self.tin, self.tout, self.depth = tin, tin + size, depth
+        self.order = np.empty(n, dtype=np.intp)
+        self.order[tin] = np.arange(n)
+
+    def _postings(self, labels):
+        n = len(self.parent)
+        self.label_names, names = [], {}
+        self.label = np.full(n, -1, dtype=np.intp)
+        if labels is not None:
+            for row, lab in enumerate(labels):
+                if lab is not None:
+                    self.label[row] = names.setdefault(lab, len(names))
+            self.label_names = list(names)
+        self._label_index = names
+
+        def split(keys, n_keys):
+            # tins of every key, ascending, as one sorted array per key
+            rows = np.flatnonzero(keys >= 0)
+            tins = self.tin[rows]
+            by = np.lexsort((tins, keys[rows]))
+            bounds = np.searchsorted(keys[rows][by], np.arange(n_keys + 1))
+            return [tins[by][bounds[k]:bounds[k + 1]] for k in range(n_keys)]
+
+        self.label_postings = split(self.label, len(self.label_names))
+        self.depth_postings = split(self.depth, int(self.depth.max()) + 1 if n else 0)
+
+    # ─── Lookups ──────────────────────────────────────────────────────────
+
+    def rows(self, node_ids):
+        """
+        Rows of one node id or a sequence of them.
+        """
+        if isinstance(node_ids, (list, tuple, np.ndarray)):
+            return np.array([self.index[node] for node in node_ids], dtype=np.intp)
+        return self.index[node_ids]
+
+    def _ids(self, rows):
+        ids = self.ids
+        return [ids[r] for r in rows.tolist()]
+
+    def _posting(self, label=None, depth=None):
+        """
+        Sorted tins to search, or None for "every node". With both filters
+        the smaller list is intersected with the other condition.
+        """
+        post = None
+        if label is not None:
+            lab = self._label_index.get(label)
+            post = self.label_postings[lab] if lab is not None else np.zeros(0, dtype=np.intp)
+        if depth is not None:
+            by_depth = (self.depth_postings[depth] if 0 <= depth < len(self.depth_postings)
+                        else np.zeros(0, dtype=np.intp))
+            post = by_depth if post is None else post[self.depth[self.order[post]] == depth]
+        return post
+
+    def with_label(self, label):
+        """
+        Ids of every node labelled `label`, in preorder.
+        """
+        return self._ids(self.order[self._posting(label=label)])
+
+    # ─── Ancestors ────────────────────────────────────────────────────────
+
+    def is_ancestor_rows(self, a, b):
+        """
+        Elementwise: is row `a` a proper ancestor of row `b`? O(1) per pair.
+        """
+        a, b = np.asarray(a, dtype=np.intp), np.asarray(b, dtype=np.intp)
+        return (self.tin[a] < self.tin[b]) & (self.tout[b] <= self.tout[a])
+
+    def is_ancestor(self, ancestor, node):
+        """
+        `ancestor in nx.ancestors(G, node)`, for single ids or elementwise
+        for two equal-length sequences.
+        """
+        return self.is_ancestor_rows(self.rows(ancestor), self.rows(node))
+
+    def ancestor_rows(self, rows, depth):
+        """
+        Ancestor at tree depth `depth` of every row (0: the room, 1: the
+        wall/object, ...), -1 where the row is not deeper than that. The
+        node at that depth with the last tin before the row's own tin is
+        the only candidate, so this is one binary search per row.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        post = self._posting(depth=depth)
+        out = np.full(rows.shape, -1, dtype=np.intp)
+        if not len(post):
+            return out
+        k = np.searchsorted(post, self.tin[rows], side="right") - 1
+        cand = self.order[post[np.maximum(k, 0)]]
+        hit = (k >= 0) & self.is_ancestor_rows(cand, rows)
+        out[hit] = cand[hit]
+        return out
+
+    def ancestors_rows(self, rows):
+        """
+        (R, max depth) matrix of every row's ancestors, nearest first,
+        padded with -1.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        width = int(self.depth[rows].max()) if len(rows) else 0
+        out = np.full((len(rows), width), -1, dtype=np.intp)
+        cur = rows
+        for k in range(width):
+            cur = np.where(cur >= 0, self.parent[np.maximum(cur, 0)], -1)
+            out[:, k] = cur
+        return out
+
+    def ancestors(self, node):
+        """
+        Ids of the ancestors of `node`, nearest first (parent ... room):
+        the set `nx.ancestors(G, node)` in path order.
+        """
+        row = self.index[node]
+        out = []
+        p = self.parent[row]
+        while p >= 0:
+            out.append(self.ids[p])
+            p = self.parent[p]
+        return out
+
+    # ─── Descendants ──────────────────────────────────────────────────────
+
+    def _slices(self, post, lo, hi):
+        """
+        CSR (ptr, rows) of the preorder slices [lo, hi) per query, taken
+        from posting list `post` (every node when None).
+        """
+        if post is None:
+            a, b, source = lo, hi, None
+        else:
+            a, b, source = np.searchsorted(post, lo), np.searchsorted(post, hi), post
+        counts = np.maximum(b - a, 0)
+        ptr = np.zeros(len(counts) + 1, dtype=np.intp)
+        np.cumsum(counts, out=ptr[1:])
+        pos = np.repeat(a - ptr[:-1], counts) + np.arange(ptr[-1])
+        return ptr, self.order[pos if source is None else source[pos]]
+
+    def descendants_rows(self, rows, label=None, depth=None):
+        """
+        Proper descendants of every row, optionally only those with
+        `label` and/or at tree depth `depth`, as CSR (ptr, rows): the
+        descendants of rows[i] are out[ptr[i]:ptr[i+1]], in preorder.
+        """
+        rows = np.asarray(rows, dtype=np.intp).reshape(-1)
+        return self._slices(self._posting(label, depth), self.tin[rows] + 1, self.tout[rows])
+
+    def descendants(self, node, label=None, depth=None):
+        """
+        Ids of the proper descendants of `node` (the set
+        `nx.descendants(G, node)`), in preorder, optionally filtered by
+        label and/or tree depth.
+        """
+        _, rows = self.descendants_rows([self.index[node]], label=label, depth=depth)
+        return self._ids(rows)
+
+    def subtree_size(self, node):
+        return int(self.tout[self.index[node]] - self.tin[self.index[node]])
+
+    def under_label(self, ancestor_label, label=None, depth=None):
+        """
+        Ids of every node under any node labelled `ancestor_label` (e.g.
+        all devices under any Storage), each once, in preorder. Nested
+        matches are folded into the outermost one before the slices are
+        taken.
+        """
+        tins = self._posting(label=ancestor_label)
+        rows = self.order[tins]
+        outer = np.ones(len(rows), dtype=bool)
+        if len(rows):
+            # Intervals are nested or disjoint, and sorted by tin
+            reach = np.maximum.accumulate(self.tout[rows])
+            outer[1:] = self.tin[rows[1:]] >= reach[:-1]
+        _, found = self.descendants_rows(rows[outer], label=label, depth=depth)
+        return self._ids(found)
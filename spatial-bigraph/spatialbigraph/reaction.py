@@ -0,0 +1,380 @@
+"""
+Bigraph reaction rules applied to the place graph the scripts build.
+
+A rule is a redex (a small pattern over node labels and nesting) and a
+reactum (what to do with the matched nodes):
+
+    on_wall_to_chair = Rule(
+        "device moves from wall to chair",
+        redex=[PNode("r"), PNode("w", "Wall", "r"), PNode("d", {"camera", "Light"}, "w"),
+               PNode("c", "chair", "r")],
+        reactum=[Move("d", "c")],
+    )
+    door_opens = Rule("door opens", [PNode("r"), PNode("d", "Door", "r")],
+                      [Relabel("d", "Door (open)"), Link(("r", "d"))])
+
+    engine = ReactionEngine(G)
+    for match in engine.matches(on_wall_to_chair):    # {"r": room id, "w": ..., ...}
+        ...
+    engine.apply_all(on_wall_to_chair)                # rewrites G in place
+
+Matching does not search for subgraph isomorphisms. The engine keeps a
+posting set of rows per label and parent / children lists per node. Each
+connected part of a redex is anchored on its rarest label, and the other
+pattern nodes are reached from bound ones through the parent (one lookup)
+or the children (a short list) of that node. Rewrites update those
+structures in place, so matching after an edit needs no rebuild.
+Redex parts that share no nesting edge are matched independently and
+combined (a product), so keep them connected where possible.
+"""
+import itertools
+from collections import namedtuple
+
+from .incremental import EdgeDiff
+from .profiling import count, stage
+
+# One redex node: its variable, its label (None: any node; a string; or a
+# set of labels) and the variable of its parent (None: nested anywhere)
+PNode = namedtuple("PNode", "var label parent", defaults=(None, None))
+
+# Reactum operations, applied in order to the matched variables
+Move = namedtuple("Move", "var parent")             # re-nest var (and its subtree) under parent
+Relabel = namedtuple("Relabel", "var label")
+Add = namedtuple("Add", "var label parent")         # new node `var` under parent
+Remove = namedtuple("Remove", "var")                # the node and everything nested in it
+Link = namedtuple("Link", "vars name", defaults=(None,))  # one link joining the vars' nodes
+
+# ─── Rules ───────────────────────────────────────────────────────────────────
+
+def _label_spec(label):
+    if label is None or isinstance(label, str):
+        return label
+    return frozenset(label)
+
+class Rule:
+    """
+    A reaction rule: redex `PNode`s, reactum operations, and an optional
+    `where(match, engine)` test on a complete match (ids by variable) for
+    conditions that labels and nesting cannot express.
+    """
+
+    def __init__(self, name, redex, reactum, where=None):
+        self.name = name
+        self.redex = [PNode(p.var, _label_spec(p.label), p.parent)
+                      for p in (q if isinstance(q, PNode) else PNode(*q) for q in redex)]
+        self.reactum = list(reactum)
+        self.where = where
+
+        self.vars = [p.var for p in self.redex]
+        if len(set(self.vars)) != len(self.vars):
+            raise ValueError(f"rule {name!r}: repeated redex variable")
+        self.by_var = {p.var: p for p in self.redex}
+        for p in self.redex:
+            if p.parent is not None and p.parent not in self.by_var:
+                raise ValueError(f"rule {name!r}: unknown parent {p.parent!r} of {p.var!r}")
+
+        bound = set(self.vars)
+        for op in self.reactum:
+            if isinstance(op, Link):
+                used = list(op.vars)
+            elif isinstance(op, Move):
+                used = [op.var, op.parent]
+            elif isinstance(op, Add):
+                used = [op.parent]
+            else:
+                used = [op.var]
+            missing = [v for v in used if v not in bound]
+            if missing:
+                raise ValueError(f"rule {name!r}: {type(op).__name__} uses unbound {missing}")
+            if isinstance(op, Add):
+                bound.add(op.var)
+        self.edges = [(p.var, p.parent) for p in self.redex if p.parent is not None]
+
+    def __repr__(self):
+        return f"Rule({self.name!r})"
+
+
+# ─── Engine ──────────────────────────────────────────────────────────────────
+
+class ReactionEngine:
+    """
+    Matches and applies `Rule`s on a place-graph DiGraph (a forest, as
+    built by `build_bigraph`), editing it in place.
+
+      parent     parent row per node row, -1 for roots
+      children   child rows per node row, in insertion order
+      label      label per row
+      postings   {label: set of rows}
+      links      {link name: frozenset of node ids}, from `Link` operations
+
+    Removed nodes keep their row (marked dead) so rows stay valid.
+    """
+
+    def __init__(self, G, label="label"):
+        with stage("reaction_index"):
+            self.G = G
+            self.label_attr = label
+            self.ids = list(G.nodes)
+            self.index = {node: row for row, node in enumerate(self.ids)}
+            n = len(self.ids)
+            self.parent = [-1] * n
+            self.children = [[] for _ in range(n)]
+            self.alive = [True] * n
+            self.label = [G.nodes[node].get(label) for node in self.ids]
+            self.postings = {}
+            for row, lab in enumerate(self.label):
+                self.postings.setdefault(lab, set()).add(row)
+            for u, v in G.edges:
+                pu, cv = self.index[u], self.index[v]
+                if self.parent[cv] >= 0:
+                    raise ValueError(f"node {v!r} has more than one parent; not a place graph")
+                self.parent[cv] = pu
+                self.children[pu].append(cv)
+            self.links = {}
+            self._fresh = itertools.count()
+
+    # ─── Matching ─────────────────────────────────────────────────────────
+
+    def _has_label(self, row, spec):
+        if spec is None:
+            return True
+        if isinstance(spec, str):
+            return self.label[row] == spec
+        return self.label[row] in spec
+
+    def _candidates(self, spec):
+        if spec is None:
+            return [row for row, alive in enumerate(self.alive) if alive]
+        labels = [spec] if isinstance(spec, str) else sorted(spec, key=str)
+        return sorted(itertools.chain.from_iterable(self.postings.get(lab, ()) for lab in labels))
+
+    def _n_candidates(self, spec):
+        if spec is None:
+            return len(self.ids)
+        labels = [spec] if isinstance(spec, str) else spec
+        return sum(len(self.postings.get(lab, ())) for lab in labels)
+
+    def _plan(self, rule):
+        """
+        Order in which to bind the variables: each connected part of the
+        redex starts at its rarest label and grows along parent / child
+        edges. Steps are (kind, var, from_var, checks) with `checks` the
+        redex edges to verify once var is bound.
+        """
+        kids = {v: [] for v in rule.vars}
+        for child, parent in rule.edges:
+            kids[parent].append(child)
+
+        steps, bound = [], set()
+        while len(bound) < len(rule.vars):
+            anchor = min((v for v in rule.vars if v not in bound),
+                         key=lambda v: self._n_candidates(rule.by_var[v].label))
+            todo = [("anchor", anchor, None)]
+            while todo:
+                kind, var, src = todo.pop(0)
+                bound.add(var)
+                checks = [(c, p) for c, p in rule.edges
+                          if var in (c, p) and c in bound and p in bound and {c, p} != {var, src}]
+                steps.append((kind, var, src, checks))
+                parent = rule.by_var[var].parent
+                if parent is not None and parent not in bound and all(parent != t[1] for t in todo):
+                    todo.append(("parent", parent, var))
+                for child in kids[var]:
+                    if child not in bound and all(child != t[1] for t in todo):
+                        todo.append(("child", child, var))
+        return steps
+
+    def _search(self, rule, steps):
+        binding, used = {}, set()
+        parent, children, labels = self.parent, self.children, rule.by_var
+
+        def extend(k):
+            if k == len(steps):
+                yield dict(binding)
+                return
+            kind, var, src, checks = steps[k]
+            spec = labels[var].label
+            if kind == "anchor":
+                cands = self._candidates(spec)
+            elif kind == "child":
+                cands = [c for c in children[binding[src]] if self._has_label(c, spec)]
+            else:
+                p = parent[binding[src]]
+                cands = [p] if p >= 0 and self._has_label(p, spec) else []
+            for row in cands:
+                if row in used:
+                    continue
+                binding[var] = row
+                if all(parent[binding[c]] == binding[p] for c, p in checks):
+                    used.add(row)
+                    yield from extend(k + 1)
+                    used.discard(row)
+            binding.pop(var, None)
+
+        return extend(0)
+
+    def matches(self, rule, limit=None):
+        """
+        Yield every match of the rule's redex as {var: node id}; distinct
+        variables always bind distinct nodes.
+        """
+        ids = self.ids
+        found = 0
+        for rows in self._search(rule, self._plan(rule)):
+            match = {var: ids[row] for var, row in rows.items()}
+            if rule.where is not None and not rule.where(match, self):
+                continue
+            yield match
+            found += 1
+            if limit is not None and found >= limit:
+                return
+
+    def count_matches(self, rule):
+        with stage("match"):
+            n = sum(1 for _ in self.matches(rule))
+        count("matches", n)
+        return n
+
+    def is_match(self, rule, match):
+        """
+        Does `match` ({var: node id}) still satisfy the rule's redex?
+        """
+        rows = {}
+        for var in rule.vars:
+            row = self.index.get(match.get(var))
+            if row is None or not self.alive[row]:
+                return False
+            rows[var] = row
+        if len(set(rows.values())) != len(rows):
+            return False
+        if not all(self._has_label(rows[p.var], p.label) for p in rule.redex):
+            return False
+        if not all(self.parent[rows[c]] == rows[p] for c, p in rule.edges):
+            return False
+        return rule.where is None or bool(rule.where(match, self))
+
+    # ─── Rewriting ────────────────────────────────────────────────────────
+
+    def _relabel(self, row, label):
+        self.postings[self.label[row]].discard(row)
+        self.label[row] = label
+        self.postings.setdefault(label, set()).add(row)
+        self.G.nodes[self.ids[row]][self.label_attr] = label
+
+    def _move(self, row, new_parent, diff):
+        p = new_parent
+        while p >= 0:
+            if p == row:
+                raise ValueError(f"cannot nest {self.ids[row]!r} inside itself")
+            p = self.parent[p]
+        old = self.parent[row]
+        if old == new_parent:
+            return
+        node = self.ids[row]
+        if old >= 0:
+            self.children[old].remove(row)
+            self.G.remove_edge(self.ids[old], node)
+            diff.removed.append((self.ids[old], node))
+        self.parent[row] = new_parent
+        self.children[new_parent].append(row)
+        self.G.add_edge(self.ids[new_parent], node)
+        diff.added.append((self.ids[new_parent], node))
+
+    def _add(self, node, label, parent, diff):
+        if node in self.index:
+            raise ValueError(f"node {node!r} already exists")
+        row = len(self.ids)
+        self.ids.append(node)
+        self.index[node] = row
+        self.parent.append(parent)
+        self.children.append([])
+        self.alive.append(True)
+        self.label.append(label)
+        self.postings.setdefault(label, set()).add(row)
+        self.children[parent].append(row)
+        self.G.add_node(node, **{self.label_attr: label})
+        self.G.add_edge(self.ids[parent], node)
+        diff.added.append((self.ids[parent], node))
+        return row
+
+    def _remove(self, row, diff):
+        top = self.parent[row]
+        if top >= 0:
+            self.children[top].remove(row)
+        stack, gone = [row], []
+        while stack:
+            r = stack.pop()
+            gone.append(r)
+            stack.extend(self.children[r])
+        for r in gone:
+            p = self.parent[r]
+            if p >= 0:
+                diff.removed.append((self.ids[p], self.ids[r]))
+            self.alive[r] = False
+            self.postings[self.label[r]].discard(r)
+            self.children[r] = []
+            del self.index[self.ids[r]]
+        ids = [self.ids[r] for r in gone]
+        self.G.remove_nodes_from(ids)
+        dead = set(ids)
+        for name, members in list(self.links.items()):
+            if members & dead:
+                members = members - dead
+                if members:
+                    self.links[name] = members
+                else:
+                    del self.links[name]
+
+    def apply(self, rule, match):
+        """
+        Apply the reactum to one match ({var: node id}) in place and return
+        the `EdgeDiff` of place-graph edges. Raises ValueError when the
+        match no longer holds.
+        """
+        if not self.is_match(rule, match):
+            raise ValueError(f"rule {rule.name!r}: stale match {match!r}")
+        rows = {var: self.index[node] for var, node in match.items()}
+        diff = EdgeDiff([], [])
+        for op in rule.reactum:
+            if isinstance(op, Move):
+                self._move(rows[op.var], rows[op.parent], diff)
+            elif isinstance(op, Relabel):
+                self._relabel(rows[op.var], op.label)
+            elif isinstance(op, Add):
+                node = f"{rule.name}:{op.var}:{next(self._fresh)}"
+                rows[op.var] = self._add(node, op.label, rows[op.parent], diff)
+            elif isinstance(op, Remove):
+                self._remove(rows[op.var], diff)
+            elif isinstance(op, Link):
+                name = op.name or f"{rule.name}#{next(self._fresh)}"
+                self.links[name] = frozenset(self.ids[rows[v]] for v in op.vars)
+            else:
+                raise TypeError(f"unknown reactum operation {op!r}")
+        count("reactions")
+        return diff
+
+    def apply_all(self, rule, limit=None):
+        """
+        Apply the rule to every match found in the current graph (matches
+        invalidated by an earlier rewrite in the same pass are skipped).
+        Returns the number of reactions applied.
+        """
+        with stage("react"):
+            applied = 0
+            for match in list(self.matches(rule)):
+                if limit is not None and applied >= limit:
+                    break
+                if self.is_match(rule, match):
+                    self.apply(rule, match)
+                    applied += 1
+        return applied
+
+    def step(self, rules):
+        """
+        Apply the first match of the first rule that has one. Returns
+        (rule, match, EdgeDiff), or None when no rule matches.
+        """
+        for rule in rules:
+            for match in self.matches(rule, limit=1):
+                return rule, match, self.apply(rule, match)
+        return None
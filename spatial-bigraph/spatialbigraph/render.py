@@ -0,0 +1,479 @@
+"""
+Batched matplotlib rendering of floorplans and place trees.
+
+Instead of one artist per item, a floorplan is drawn with one
+`LineCollection` (room boundary + door/window segments), one
+`PatchCollection` (object rectangles) and one scatter (IoT devices); the
+legend is built once from a category table. `draw_tree` does the same for
+the bigraph scripts' `nx.draw`, and `draw_lod` / `LodRenderer` for the
+level-of-detail views of `lod.py` at building scale.
+
+Headless batch mode renders every room of many exports to image files on a
+single reused Agg figure, no display or pyplot needed:
+
+    python -m spatialbigraph.render Data/ Jsons/ --out-dir Figures/floorplans
+"""
+import argparse
+import os
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import cycle
+
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.collections import LineCollection, PatchCollection
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch, Rectangle
+from matplotlib.transforms import offset_copy
+
+from . import profiling
+from .profiling import stage
+from .rooms import locate_devices, opening_segments, room_polygon, wall_segments
+
+# Geometry of one room's floorplan in the (x, z) plane
+#   bounds     (xmin, xmax, zmin, zmax) of the wall locations
+#   outline    (V,2) room outline chained from the walls (see `rooms.py`)
+#   segments   (S,2,2) door/window segments, `segment_kinds` "doors"/"windows"
+#   rects      (R,4) object boxes as (x_center, z_center, length, width)
+#   points     (P,2) IoT device positions, `point_names` their labels
+FloorPlan = namedtuple("FloorPlan", [
+    "name", "bounds", "outline", "segments", "segment_kinds", "rects", "categories",
+    "points", "point_names",
+])
+
+# ─── Geometry ────────────────────────────────────────────────────────────────
+
+def floorplan(room, devices=None):
+    """
+    `FloorPlan` of a `Room`: the plan view `imagineroom.plot_room` draws.
+    `devices` defaults to all of the room's IoT devices.
+    """
+    wall_pts = room.walls["location"][:, [0, 2]]
+    if len(wall_pts):
+        xmin, zmin = wall_pts.min(axis=0)
+        xmax, zmax = wall_pts.max(axis=0)
+    else:
+        xmin = xmax = zmin = zmax = 0.0
+
+    # Doors/windows along the chained walls of the outline, snapped onto
+    # the nearest one when their corner lies on none
+    walls = wall_segments(room)
+    kinds = ["doors"] * len(room.doors) + ["windows"] * len(room.windows)
+    segments = np.concatenate([opening_segments(room, "doors", walls, snap=True),
+                               opening_segments(room, "windows", walls, snap=True)])
+
+    objs = room.objects
+    rects = np.column_stack([
+        objs["location"][:, 0], objs["location"][:, 2],
+        objs["dimensions"][:, 2], objs["dimensions"][:, 0],
+    ]).reshape(-1, 4)
+
+    devs = room.devices if devices is None else devices
+    return FloorPlan(
+        name=room.name,
+        bounds=(float(xmin), float(xmax), float(zmin), float(zmax)),
+        outline=room_polygon(room),
+        segments=segments,
+        segment_kinds=kinds,
+        rects=rects,
+        categories=objs["category"].tolist(),
+        points=devs["position"][:, [0, 2]].reshape(-1, 2),
+        point_names=[name or "IoT" for name in devs["name"].tolist()],
+    )
+
+def scene_floorplan(scene, room):
+    """
+    `FloorPlan` of `room` with its own labelled devices plus the scene's
+    unlabelled ones whose position falls inside its outline
+    (`rooms.locate_devices`).
+    """
+    room = scene[room] if isinstance(room, str) else room
+    located = locate_devices(scene)
+    devs = np.concatenate([room.devices[room.devices["room"] == room.name],
+                           located[located["room"] == room.name]])
+    return floorplan(room, devs)
+
+# ─── Category Table ──────────────────────────────────────────────────────────
+
+def category_table(plans):
+    """
+    {label: (kind, color)} over one or more `FloorPlan`s, in legend order:
+    wall, doors/windows, object categories, IoT names. Colors follow the
+    axes color cycle as in `plot_room` (sorted categories, then the shared
+    door/window color, then one per device name).
+    """
+    if isinstance(plans, FloorPlan):
+        plans = [plans]
+    categories = dict.fromkeys(c for p in plans for c in p.categories)
+    kinds = dict.fromkeys(k for p in plans for k in p.segment_kinds)
+    names = dict.fromkeys(n for p in plans for n in p.point_names)
+
+    cc = cycle(rcParams["axes.prop_cycle"].by_key()["color"])
+    cat_color = {c: next(cc) for c in sorted(categories)}
+    dw_color = next(cc)
+
+    table = {"wall": ("wall", "k")}
+    table.update((k, ("opening", dw_color)) for k in kinds)
+    table.update((c, ("object", cat_color[c])) for c in categories)
+    table.update((n, ("device", next(cc))) for n in names)
+    return table
+
+def legend_handles(table):
+    """
+    One proxy artist per table entry, so the legend never has to walk the
+    axes for handles.
+    """
+    handles = []
+    for label, (kind, color) in table.items():
+        if kind == "object":
+            handles.append(Patch(edgecolor=color, facecolor="none", lw=1.5, label=label))
+        elif kind == "device":
+            handles.append(Line2D([], [], color=color, marker="x", markersize=9,
+                                  linestyle="none", label=label))
+        else:
+            handles.append(Line2D([], [], color=color, lw=2, label=label))
+    return handles
+
+
+# ─── Drawing ─────────────────────────────────────────────────────────────────
+
+def draw_floorplan(ax, plan, table=None, annotate=True, legend=True):
+    """
+    Draw a `FloorPlan` onto `ax` with three collections. `annotate` adds the
+    category/device name texts (the only per-item artists); `table` lets
+    several plans share colors.
+    """
+    table = category_table(plan) if table is None else table
+    walls = np.stack([plan.outline, np.roll(plan.outline, -1, axis=0)], axis=1)
+    seg_colors = ["k"] * len(walls) + [table[k][1] for k in plan.segment_kinds]
+    ax.add_collection(LineCollection(np.concatenate([walls, plan.segments]),
+                                     colors=seg_colors, linewidths=2))
+
+    if len(plan.rects):
+        x, z, L, W = plan.rects.T
+        rect_colors = [table[c][1] for c in plan.categories]
+        patches = [Rectangle((bx, bz), l, w) for bx, bz, l, w in
+                   zip((x - L / 2).tolist(), (z - W / 2).tolist(), L.tolist(), W.tolist())]
+        ax.add_collection(PatchCollection(patches, facecolors="none",
+                                          edgecolors=rect_colors, linewidths=1.5))
+
+    if len(plan.points):
+        point_colors = [table[n][1] for n in plan.point_names]
+        ax.scatter(plan.points[:, 0], plan.points[:, 1], marker="x", s=80, c=point_colors)
+
+    if annotate:
+        for (x, z), cat in zip(plan.rects[:, :2].tolist(), plan.categories):
+            ax.text(x, z, cat, fontsize=7, ha="center", va="center", color=table[cat][1])
+        for (x, z), name in zip(plan.points.tolist(), plan.point_names):
+            ax.text(x, z, name, fontsize=7, ha="left", va="bottom", color=table[name][1])
+
+    ax.autoscale_view()
+    ax.set_aspect("equal", "box")
+    ax.set_xlabel("x (m)")
+    ax.set_ylabel("z (m)")
+    if legend:
+        used = {"wall", *plan.segment_kinds, *plan.categories, *plan.point_names}
+        ax.legend(handles=legend_handles({k: v for k, v in table.items() if k in used}),
+                  loc="upper right", fontsize=8)
+    return ax
+
+def draw_boundary(ax, room, annotate=True):
+    """
+    The `imagineRoomBoundary.py` view: the room outline plus the corner or
+    centroid `location` of every wall, door, window and object group as
+    one scatter per category, each point annotated with its coordinates.
+    """
+    outline = room_polygon(room)
+    ring = np.concatenate([outline, outline[:1]])
+    ax.plot(ring[:, 0], ring[:, 1], "k-", lw=2, label="Room boundary")
+
+    groups = room.elements["group"]
+    for group in dict.fromkeys(groups.tolist()):
+        xz = room.elements["location"][groups == group][:, [0, 2]]
+        ax.scatter(xz[:, 0], xz[:, 1], label=group, s=40)
+        if annotate:
+            for x, z in xz.tolist():
+                ax.text(x, z, f"({x:.2f}, {z:.2f})", fontsize=7, ha="right", va="bottom")
+
+    ax.set_aspect("equal", "box")
+    ax.set_xlabel("x (m)")
+    ax.set_ylabel("z (m)")
+    ax.set_title("Plan‐view: room outline + points w/ coords")
+    ax.legend(loc="upper right")
+    return ax
+
+def _draw_arrays(ax, xy, edges, texts, node_size, node_color, arrows, font_size):
+    """
+    One tree drawn from arrays: (V,2) node positions, (E,2) (parent, child)
+    rows, per-node texts (None for none). `node_size` / `node_color` are
+    scalars or per-node arrays.
+    """
+    sizes = np.broadcast_to(np.asarray(node_size, dtype=float), (len(xy),))
+    ax.add_collection(LineCollection(xy[edges], colors="k", linewidths=1, zorder=1))
+    ax.scatter(xy[:, 0], xy[:, 1], s=sizes, c=node_color, zorder=2)
+    if arrows and len(edges):
+        # Shift each marker up by the node radius plus its own half height
+        # (sizes are in points) so its tip touches the child's rim; one
+        # scatter per distinct node size
+        head_size = 60
+        child_sizes = sizes[edges[:, 1]]
+        for size in np.unique(child_sizes).tolist():
+            lift = (np.sqrt(size) + np.sqrt(head_size)) / 2
+            above = offset_copy(ax.transData, fig=ax.figure, y=lift, units="points")
+            heads = xy[edges[child_sizes == size, 1]]
+            ax.scatter(heads[:, 0], heads[:, 1], marker="v", s=head_size, c="k", zorder=3, transform=above)
+    for text, (x, y) in zip(texts, xy.tolist()):
+        if text is not None:
+            ax.text(x, y, text, fontsize=font_size, ha="center", va="center", zorder=4)
+
+    ax.autoscale_view()
+    ax.set_axis_off()
+    return ax
+
+def draw_tree(ax, G, pos, labels=None, node_size=500, node_color="lightblue",
+              arrows=True, font_size=10):
+    """
+    Batched stand-in for `nx.draw(G, pos, ...)` on a tree: edges as one
+    `LineCollection`, nodes as one scatter and arrowheads as one scatter of
+    "v" markers sitting on top of each child node. `labels` maps node → text
+    (None draws none).
+    """
+    nodes = list(G.nodes)
+    xy = np.array([pos[n] for n in nodes], dtype=float).reshape(-1, 2)
+    row = {n: i for i, n in enumerate(nodes)}
+    edges = np.array([(row[u], row[v]) for u, v in G.edges()], dtype=np.intp).reshape(-1, 2)
+    texts = [labels.get(n) for n in nodes] if labels else []
+    return _draw_arrays(ax, xy, edges, texts, node_size, node_color, arrows, font_size)
+
+def draw_lod(ax, view, node_size=500, node_color="lightblue", summary_size=1200,
+             summary_color="moccasin", arrows=True, font_size=10, summary_font_size=7):
+    """
+    Draw a `lod.LodView` like `draw_tree`: summary nodes (collapsed
+    subtrees) bigger, in `summary_color` and with their label counts.
+    Markers shrink to the slot each leaf gets across the axis and texts to
+    the slots below their node; a summary whose counts would drop under 4pt
+    shows its first line alone, and a text that would even then is left out.
+    """
+    summary = view.hidden > 0
+    edges = np.column_stack([view.parent, np.arange(len(view.parent))])[view.parent >= 0]
+    # Leaves below every node (the rows are in preorder), for the width it spans
+    is_leaf = np.ones(len(view.parent), dtype=bool)
+    is_leaf[view.parent[view.parent >= 0]] = False
+    leaves = is_leaf.astype(np.intp)
+    for row, p in reversed(list(enumerate(view.parent.tolist()))):
+        if p >= 0:
+            leaves[p] += leaves[row]
+    slot = ax.get_window_extent().width * 72 / ax.figure.dpi / max(int(is_leaf.sum()), 1)
+    sizes = np.minimum(np.where(summary, summary_size, node_size), (0.9 * slot) ** 2)
+    colors = [summary_color if s else node_color for s in summary.tolist()]
+    _draw_arrays(ax, view.xy, edges, [None] * len(view.xy), sizes, colors, arrows, font_size)
+    for text, (x, y), s, span in zip(view.labels, view.xy.tolist(), summary.tolist(), leaves.tolist()):
+        if text is None:
+            continue
+        for text in (text, text.split("\n")[0]):
+            # ~0.6em per character
+            size = min(summary_font_size if s else font_size,
+                       span * slot / (0.6 * max(len(line) for line in text.split("\n"))))
+            if size >= 4:
+                ax.text(x, y, text, fontsize=size, ha="center", va="center", zorder=4)
+                break
+    return ax
+
+class LodRenderer:
+    """
+    Interactive level-of-detail tree on one axis. Clicking a summary node
+    expands it, clicking an expanded node collapses it again, and clicking
+    the node for the other roots leaves the focus room; each redraw
+    cuts a new view from the same `LevelOfDetail`, so it costs what the
+    budget shows, not the size of the graph.
+
+        renderer = LodRenderer(ax, LevelOfDetail.from_networkx(G), budget=300)
+        renderer.draw()
+        renderer.connect()      # click to expand / collapse
+    """
+
+    def __init__(self, ax, lod, budget=300, max_depth=None, focus=None, **draw_kwargs):
+        self.ax = ax
+        self.lod = lod
+        self.budget = budget
+        self.max_depth = max_depth
+        self.focus = focus
+        self.draw_kwargs = draw_kwargs
+        self.expanded = []
+        self.collapsed = set()
+        self.view = None
+
+    def expand(self, node_id):
+        self.collapsed.discard(node_id)
+        if node_id not in self.expanded:
+            self.expanded.append(node_id)
+        return self.draw()
+
+    def collapse(self, node_id):
+        if node_id in self.expanded:
+            self.expanded.remove(node_id)
+        self.collapsed.add(node_id)
+        return self.draw()
+
+    def set_focus(self, node_id):
+        self.focus = node_id
+        return self.draw()
+
+    def draw(self):
+        self.view = self.lod.view(budget=self.budget, max_depth=self.max_depth, focus=self.focus,
+                                  expanded=self.expanded, collapsed=self.collapsed)
+        with stage("draw_lod"):
+            self.ax.clear()
+            draw_lod(self.ax, self.view, **self.draw_kwargs)
+        self.ax.figure.canvas.draw_idle()
+        return self.view
+
+    def connect(self):
+        """
+        Toggle the node nearest to a click (within 3% of the axis span).
+        Returns the matplotlib callback id.
+        """
+        return self.ax.figure.canvas.mpl_connect("button_press_event", self._on_click)
+
+    def _on_click(self, event):
+        if event.inaxes is not self.ax or self.view is None or not len(self.view.xy):
+            return
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        d = np.hypot((self.view.xy[:, 0] - event.xdata) / (x1 - x0),
+                     (self.view.xy[:, 1] - event.ydata) / (y1 - y0))
+        i = int(d.argmin())
+        if d[i] > 0.03:
+            return
+        node_id = self.view.ids[i]
+        if self.view.rows[i] < 0:
+            self.set_focus(None)
+        elif self.view.hidden[i]:
+            self.expand(node_id)
+        elif self.lod.size[self.view.rows[i]] > 1:
+            self.collapse(node_id)
+
+
+# ─── Headless Batch Mode ─────────────────────────────────────────────────────
+
+def _file_name(path, room_name, fmt):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r"[^\w.-]+", "_", f"{stem}__{room_name}") + "." + fmt
+
+class FloorplanRenderer:
+    """
+    Saves floorplans to files on one Agg figure and axes that are cleared
+    and reused for every room; no GUI backend or pyplot state is involved.
+    """
+
+    def __init__(self, out_dir, fmt="png", dpi=100, figsize=(8, 8), annotate=True):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.annotate = annotate
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+
+    def render(self, room, out):
+        # cla() keeps the axes object, far cheaper than a fresh subplot
+        self.ax.cla()
+        with stage("render", room=room.name):
+            draw_floorplan(self.ax, floorplan(room), annotate=self.annotate)
+            self.ax.set_title(f"Room '{room.name}'")
+        with stage("savefig", room=room.name):
+            self.fig.savefig(out, format=self.fmt)
+        return out
+
+    def render_file(self, path):
+        """
+        Every room of one export, as "<file>__<room>.<fmt>" under `out_dir`.
+        """
+        from .scene import Scene
+
+        return [self.render(room, os.path.join(self.out_dir, _file_name(path, room.name, self.fmt)))
+                for room in Scene.load(path)]
+
+
+_worker_renderer = None
+
+def _init_worker(options):
+    global _worker_renderer
+    _worker_renderer = FloorplanRenderer(**options)
+
+def _render_file(path):
+    return _worker_renderer.render_file(path)
+
+def render_floorplans(paths, out_dir, fmt="png", dpi=100, figsize=(8, 8), annotate=True,
+                      workers=1):
+    """
+    Save the floorplan of every room of `paths` under `out_dir`. With
+    `workers` > 1 the files are spread over a process pool, each worker
+    holding its own reused figure (None → os.cpu_count()).
+
+    Returns a report with the room count, wall time and rooms/second.
+    """
+    options = dict(out_dir=out_dir, fmt=fmt, dpi=dpi, figsize=figsize, annotate=annotate)
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    t0 = time.perf_counter()
+
+    if workers == 1:
+        renderer = FloorplanRenderer(**options)
+        for path in paths:
+            written.extend(renderer.render_file(path))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(options,)) as pool:
+            for outs in pool.map(_render_file, paths):
+                written.extend(outs)
+
+    elapsed = time.perf_counter() - t0
+    return {
+        "files": len(paths),
+        "rooms": len(written),
+        "workers": workers,
+        "seconds": elapsed,
+        "rooms_per_second": len(written) / elapsed if elapsed > 0 else float("inf"),
+        "written": written,
+    }
+
+
+# ─── Command Line ────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    from .loader import find_inputs
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="+",
+                        help="RoomPlan JSON files, directories or glob patterns")
+    parser.add_argument("-o", "--out-dir", default="Figures/floorplans",
+                        help="directory for the images (default: Figures/floorplans)")
+    parser.add_argument("--format", default="png", help="image format (default: png)")
+    parser.add_argument("--dpi", type=int, default=100, help="resolution (default: 100)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes (default: 1 = no pool, 0 = CPU count)")
+    parser.add_argument("--no-labels", action="store_true",
+                        help="skip the per-item name texts (fastest)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    profiling.enable_from_env(args.profile_out, args.profile)
+
+    paths = find_inputs(args.inputs)
+    if not paths:
+        parser.error("no JSON files matched the given inputs")
+
+    report = render_floorplans(paths, args.out_dir, fmt=args.format, dpi=args.dpi,
+                               annotate=not args.no_labels, workers=args.workers or None)
+    print(f"{report['rooms']} floorplans from {report['files']} files on {report['workers']} workers in "
+          f"{report['seconds']:.2f}s — {report['rooms_per_second']:.1f} rooms/s → {args.out_dir}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
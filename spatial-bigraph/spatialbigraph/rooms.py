@@ -0,0 +1,507 @@
+"""
+Room outlines from the wall list, and bulk point-in-room assignment.
+
+An export gives every wall as a corner `location` plus a `width` (`length`
+is 0) but not the direction the wall runs from that corner, so the min/max
+rectangle of the wall corners is all `plot_room` used to draw. Here the
+walls are chained into a closed outline instead: each wall may end at one
+of four axis-aligned points, and the chain follows whichever of them meets
+the next wall's corner (or end), which also resolves every wall's
+direction. L-shaped rooms and rooms with a missing wall come out right.
+
+    polygon = room_polygon(scene["Kitchen"])       # (V,2) x/z ring, CCW
+    locator = RoomLocator.from_rooms(scene.rooms)
+    rows = locator.assign(device_positions)        # room row per point, -1: none
+    devices = locate_devices(scene)                # unlabelled devices, `room` filled
+
+`RoomLocator` keeps the outlines as one array of edges and a uniform grid
+over the room bounding boxes, so a batch of points is classified in one
+vectorized crossing-number pass over just the rooms whose cell it falls in.
+"""
+import itertools
+
+import numpy as np
+
+from .links import scene_devices
+from .profiling import count, stage
+
+# Walls whose ends lie closer than this (in metres) are taken to meet;
+# scanned corners are off by a few centimetres
+WALL_TOL = 0.1
+
+# Unit steps a wall can run along from its corner: +x, -x, +z, -z
+_DIRECTIONS = np.array([(1.0, 0.0), (-1.0, 0.0), (0.0, 1.0), (0.0, -1.0)])
+
+# ─── Wall Chains ─────────────────────────────────────────────────────────────
+
+def _wall_points(walls):
+    """
+    (n,5,2) plan points per wall: the corner, then its four possible ends.
+    """
+    corner = walls["location"][:, [0, 2]]
+    extent = np.maximum(walls["dimensions"][:, 0], walls["dimensions"][:, 2])
+    ends = corner[:, None] + extent[:, None, None] * _DIRECTIONS
+    return np.concatenate([corner[:, None], ends], axis=1)
+
+def _steps(wall, at, near, score, visited):
+    """
+    Ways on from wall `wall` entered at point `at` (0: its corner, 1-4: one
+    of its ends): leave through an opposite point towards an unvisited wall
+    point within tolerance. [(exit point, next wall, next point)], best
+    score first.
+    """
+    exits = [1, 2, 3, 4] if at == 0 else [0]
+    cand = near[wall, exits] & ~visited[None, :, None]
+    x, nxt, nat = np.nonzero(cand)
+    order = np.argsort(score[wall, exits][x, nxt, nat], kind="stable")
+    return [(exits[a], b, c) for a, b, c in zip(x[order].tolist(), nxt[order].tolist(), nat[order].tolist())]
+
+def _walks(first, entry, near, score, points, budget):
+    """
+    Chains of walls from wall `first` entered at point `entry`, depth first
+    along `_steps` and backtracking after every dead end, at most `budget`
+    steps. Yields every chain that cannot go on, as [(wall, entry point,
+    exit point)], its last wall leaving towards the first point.
+    """
+    visited = np.zeros(len(points), dtype=bool)
+    visited[first] = True
+    chain = []
+    stack = [[first, entry, _steps(first, entry, near, score, visited), False]]
+    while stack:
+        top = stack[-1]
+        wall, at, steps, tried = top
+        if steps and budget > 0:
+            exit, nxt, nat = steps.pop(0)
+            budget -= 1
+            top[3] = True
+            chain.append((wall, at, exit))
+            visited[nxt] = True
+            stack.append([nxt, nat, _steps(nxt, nat, near, score, visited), False])
+            continue
+        if not tried:
+            exits = [1, 2, 3, 4] if at == 0 else [0]
+            gap = np.linalg.norm(points[wall, exits] - points[first, entry], axis=1)
+            yield chain + [(wall, at, exits[int(np.argmin(gap))])]
+        stack.pop()
+        visited[wall] = False
+        if stack:
+            chain.pop()
+
+def _chain_ring(chain, points, tol):
+    """
+    Outline vertices of a chain: one per joint (the mean of the two points
+    that met), plus both loose ends when the chain does not close. Returns
+    (ring, gap between the loose ends).
+    """
+    exits = np.array([points[w, x] for w, _, x in chain])
+    entries = np.array([points[w, e] for w, e, _ in chain])
+    joints = (exits[:-1] + entries[1:]) / 2
+    gap = float(np.linalg.norm(exits[-1] - entries[0]))
+    if gap <= tol:
+        return np.vstack([(exits[-1] + entries[0]) / 2, joints]), gap
+    return np.vstack([entries[:1], joints, exits[-1:]]), gap
+
+def polygon_area(ring):
+    """
+    Signed area of a closed (V,2) ring, positive when counter-clockwise.
+    """
+    x, z = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(z, -1)) - np.dot(z, np.roll(x, -1)))
+
+def _reversals(ring, tol, closed=True):
+    """
+    Vertices where a ring doubles back on itself (a wall chained the wrong
+    way along its neighbour), a sign of a wrong turn in a near-square room.
+    Edges shorter than `tol` could point anywhere and are skipped, as is
+    the edge across the gap of an open chain.
+    """
+    edges = np.diff(np.vstack([ring, ring[:1]]) if closed else ring, axis=0)
+    norm = np.linalg.norm(edges, axis=1)
+    long = norm > max(tol, 1e-9)
+    edges = edges[long] / norm[long, None]
+    if not closed:
+        return int((np.einsum("ij,ij->i", edges[:-1], edges[1:]) < -0.99).sum())
+    return int((np.einsum("ij,ij->i", edges, np.roll(edges, -1, axis=0)) < -0.99).sum())
+
+def _cross(a, b):
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+def _tidy(ring, eps=1e-9):
+    """
+    `ring` without repeated vertices and without spikes (vertices where the
+    ring runs straight back the way it came).
+    """
+    while len(ring) >= 3:
+        prev = ring - np.roll(ring, 1, axis=0)
+        next = np.roll(ring, -1, axis=0) - ring
+        repeated = np.linalg.norm(next, axis=1) <= eps
+        spike = (np.abs(_cross(prev, next)) <= eps) & (np.einsum("ij,ij->i", prev, next) < 0)
+        # Repeats first: a spike test across a zero-length edge means nothing
+        drop = repeated if repeated.any() else spike
+        if not drop.any():
+            break
+        ring = ring[~drop]
+    return ring
+
+def _first_crossing(ring, eps=1e-9):
+    """
+    First pair of edges (i, j), i < j, of a closed ring that are not
+    neighbours but cross or touch (edge i runs from vertex i to i + 1), and
+    a point they share. None when the ring is simple.
+    """
+    v = len(ring)
+    d = np.roll(ring, -1, axis=0) - ring
+    i, j = np.triu_indices(v, 2)
+    keep = ~((i == 0) & (j == v - 1))
+    i, j = i[keep], j[keep]
+    w = ring[j] - ring[i]
+    denom = _cross(d[i], d[j])
+    parallel = np.abs(denom) <= eps
+    denom = np.where(parallel, 1.0, denom)
+    t, u = _cross(w, d[j]) / denom, _cross(w, d[i]) / denom
+    hit = ~parallel & (t >= -eps) & (t <= 1 + eps) & (u >= -eps) & (u <= 1 + eps)
+
+    # Parallel edges meet when on one line and overlapping along it
+    length2 = np.maximum(np.einsum("ij,ij->i", d[i], d[i]), eps)
+    s0 = np.einsum("ij,ij->i", w, d[i]) / length2
+    s1 = np.einsum("ij,ij->i", w + d[j], d[i]) / length2
+    inline = np.abs(_cross(w, d[i])) <= eps * np.sqrt(length2)
+    overlap = parallel & inline & (np.maximum(s0, s1) >= -eps) & (np.minimum(s0, s1) <= 1 + eps)
+
+    found = np.flatnonzero(hit | overlap)
+    if not len(found):
+        return None
+    k = found[0]
+    at = t[k] if hit[k] else np.clip(min(s0[k], s1[k]), 0.0, 1.0)
+    return int(i[k]), int(j[k]), ring[i[k]] + at * d[i[k]]
+
+def simple_ring(ring):
+    """
+    `ring` when it is simple (no two edges meet but neighbours, at their
+    shared vertex); else the loop of largest area it splits into, cut at
+    its crossings one at a time. Spurs, where the ring runs out and back
+    along itself, are cut off. Fewer than 3 vertices when nothing with an
+    area is left.
+    """
+    ring = _tidy(np.asarray(ring, dtype=float))
+    while len(ring) >= 3:
+        found = _first_crossing(ring)
+        if found is None:
+            break
+        i, j, point = found
+        inner = np.vstack([point, ring[i + 1:j + 1]])
+        outer = np.vstack([ring[j + 1:], ring[:i + 1], point])
+        ring = _tidy(max(inner, outer, key=lambda loop: abs(polygon_area(loop))))
+    return ring
+
+def wall_chain(walls, tol=WALL_TOL):
+    """
+    Best chain through an array of walls: closed, covering the most wall
+    length, without reversals, then enclosing the most area (open chains:
+    leaving the narrowest gap). Chains are searched from every (wall,
+    entry) start, `8 n` steps each; the first clean chain that closes over
+    all walls with a simple outline wins early.
+    Returns (chain, ring, closed), chain as [(wall, entry point, exit point)]
+    and ring its outline made simple (see `simple_ring`).
+    """
+    points = _wall_points(walls)
+    n = len(points)
+    length = np.maximum(walls["dimensions"][:, 0], walls["dimensions"][:, 2])
+
+    # Distances between every pair of wall points; meeting at a guessed end
+    # costs more than meeting at a recorded corner
+    flat = points.reshape(-1, 2)
+    dist = np.linalg.norm(flat[:, None] - flat[None], axis=2).reshape(n, 5, n, 5)
+    guessed = (np.arange(5) > 0).astype(float)
+    score = dist + tol / 4 * (guessed[None, :, None, None] + guessed[None, None, None, :])
+    near = dist <= tol
+    near[np.arange(n), :, np.arange(n), :] = False
+    count("wall_pairs", n * n)
+
+    best, best_key = None, None
+    for first, entry in itertools.product(range(n), range(5)):
+        for chain in _walks(first, entry, near, score, points, 8 * n):
+            ring, gap = _chain_ring(chain, points, tol)
+            closed = gap <= tol
+            covered = round(float(length[[w for w, _, _ in chain]].sum()), 6)
+            reversals = _reversals(ring, tol, closed)
+            outline = simple_ring(ring)
+            simple = len(outline) == len(ring) and np.array_equal(outline, ring)
+            fit = abs(polygon_area(outline)) if closed else -gap
+            key = (closed and len(ring) >= 3, covered, -reversals, fit)
+            if best_key is None or key > best_key:
+                best, best_key = (chain, outline, closed), key
+            if closed and len(chain) == n and simple and not reversals:
+                return best
+    return best
+
+def room_polygon(room, tol=WALL_TOL):
+    """
+    Outline of a `Room` as a counter-clockwise (V,2) array of (x, z)
+    vertices, the ring implicitly closed and simple (the wall chain's
+    outline cut at its crossings, see `simple_ring`). Falls back to the
+    rectangle of the wall corners when the walls chain into nothing with an
+    area, and is empty for a room without walls.
+    """
+    walls = room.walls
+    if not len(walls):
+        return np.zeros((0, 2))
+    with stage("polygon", room=room.name):
+        ring = wall_chain(walls, tol)[1] if len(walls) >= 2 else np.zeros((0, 2))
+        if len(ring) < 3 or abs(polygon_area(ring)) < tol * tol:
+            xz = walls["location"][:, [0, 2]]
+            (xmin, zmin), (xmax, zmax) = xz.min(axis=0), xz.max(axis=0)
+            ring = np.array([(xmin, zmin), (xmax, zmin), (xmax, zmax), (xmin, zmax)])
+        if polygon_area(ring) < 0:
+            ring = ring[::-1]
+    return ring
+
+def wall_segments(room, tol=WALL_TOL):
+    """
+    (n,2,2) plan segment per wall, corner first, with the direction the wall
+    chain resolved. Walls left out of the chain keep their +x end.
+    """
+    walls = room.walls
+    points = _wall_points(walls)
+    ends = np.ones(len(walls), dtype=int)
+    if len(walls) >= 2:
+        for wall, entry, exit in wall_chain(walls, tol)[0]:
+            ends[wall] = exit if entry == 0 else entry
+    return np.stack([points[:, 0], points[np.arange(len(walls)), ends]], axis=1)
+
+def opening_segments(room, kind="doors", segments=None, tol=WALL_TOL, snap=False):
+    """
+    (k,2,2) plan segment per door (or window, `kind="windows"`), corner
+    first, running along the wall its corner lies on: the same way as the
+    wall when the opening fits either way (or spans several walls), else
+    the way that stays on it. Openings on no wall run along +x, unless
+    `snap` moves their corner to the closest point of the nearest wall
+    first (as a plan view wants them). `segments` are the room's
+    `wall_segments` when already at hand.
+    """
+    openings = getattr(room, kind)
+    corner = openings["location"][:, [0, 2]]
+    width = np.maximum(openings["dimensions"][:, 0], openings["dimensions"][:, 2])
+    step = np.tile(_DIRECTIONS[0], (len(openings), 1))
+    segments = wall_segments(room, tol) if segments is None else segments
+    if len(openings) and len(segments):
+        p, q = segments[:, 0], segments[:, 1]
+        if snap:
+            corner = _snap_to_segments(corner, p, q, tol)
+        axis = (np.abs(q[:, 1] - p[:, 1]) > np.abs(q[:, 0] - p[:, 0])).astype(int)
+        along = np.eye(2)[axis]                                   # (n,2) unit axis
+        sign = np.where(np.einsum("ij,ij->i", q - p, along) < 0, -1.0, 1.0)
+        lo = np.minimum(p, q).max(axis=1, where=along > 0, initial=-np.inf)
+        hi = np.maximum(p, q).max(axis=1, where=along > 0, initial=-np.inf)
+
+        # (opening, wall): corner on the wall line and inside its extent
+        t = corner @ along.T                                      # along the wall
+        off = np.abs(corner @ (1 - along).T - np.einsum("ij,ij->i", p, 1 - along))
+        on = (off <= tol) & (t >= lo - tol) & (t <= hi + tol)
+        fwd = on & (t + width[:, None] * sign <= hi + tol) & (t + width[:, None] * sign >= lo - tol)
+        back = on & (t - width[:, None] * sign <= hi + tol) & (t - width[:, None] * sign >= lo - tol)
+        # Fits running with the wall > against it > merely starts on it
+        # (spans several walls); nearer wall lines first within a level
+        level = np.select([fwd, back, on], [3, 2, 1], 0)
+        wall = (level - off / (2 * tol if tol > 0 else 1)).argmax(axis=1)
+        best = level[np.arange(len(openings)), wall]
+        found = best > 0
+        direction = np.where(best == 2, -1.0, 1.0) * sign[wall]
+        step[found] = (along[wall] * direction[:, None])[found]
+    return np.stack([corner, corner + width[:, None] * step], axis=1)
+
+def _snap_to_segments(points, p, q, tol):
+    """
+    `points` (k,2), those farther than `tol` from every segment p→q moved
+    to the closest point of the nearest one.
+    """
+    d = q - p
+    length2 = np.maximum(np.einsum("ij,ij->i", d, d), 1e-12)
+    u = np.clip(np.einsum("kij,ij->ki", points[:, None] - p, d) / length2, 0.0, 1.0)
+    closest = p + u[..., None] * d                                # (k,n,2)
+    dist = np.linalg.norm(points[:, None] - closest, axis=2)
+    wall = dist.argmin(axis=1)
+    rows = np.arange(len(points))
+    far = dist[rows, wall] > tol
+    return np.where(far[:, None], closest[rows, wall], points)
+
+
+# ─── Point In Room ───────────────────────────────────────────────────────────
+
+def points_in_polygon(points, ring):
+    """
+    Crossing-number test of (P,2) points against one (V,2) ring.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    a, b = ring, np.roll(ring, -1, axis=0)
+    px, pz = points[:, 0, None], points[:, 1, None]
+    crosses = (a[:, 1] > pz) != (b[:, 1] > pz)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = a[:, 0] + (pz - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+    return (crosses & (px < x)).sum(axis=1) % 2 == 1
+
+class RoomLocator:
+    """
+    Which room outline each of many points falls in.
+
+      ax, az      start of every outline edge, one column each
+      dx, dz      edge vector (end - start); `inv_len2` is 1/|edge|²
+      edge_ptr    CSR: room r owns edges edge_ptr[r]:edge_ptr[r+1]
+      bounds      (R,4) (xmin, zmin, xmax, zmax) per room
+      area        outline area per room; a point inside nested outlines
+                  goes to the smallest
+
+    Points within `tol` of an outline count as inside it, so devices
+    mounted on a wall land in the room even when the scan puts them a few
+    centimetres behind it; a point strictly inside one room and near the
+    wall of another keeps the first.
+
+    The grid covers the union of the room bounds with `cell`-wide cells
+    (default: half the median room extent); `cell_ptr`/`cell_rooms` list, per
+    cell, the rooms whose bounds (grown by `tol`) overlap it.
+    """
+
+    def __init__(self, polygons, names=None, cell=None, tol=WALL_TOL):
+        polygons = [np.asarray(p, dtype=float).reshape(-1, 2) for p in polygons]
+        self.names = list(names) if names is not None else list(range(len(polygons)))
+        if len(self.names) != len(polygons):
+            raise ValueError(f"{len(self.names)} names for {len(polygons)} polygons")
+        n = len(polygons)
+        self.tol = tol
+        sizes = np.array([len(p) if len(p) >= 3 else 0 for p in polygons], dtype=np.intp)
+        self.edge_ptr = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(sizes, out=self.edge_ptr[1:])
+        rings = [p for p, s in zip(polygons, sizes) if s]
+        a = np.concatenate(rings) if rings else np.zeros((0, 2))
+        d = np.concatenate([np.roll(p, -1, axis=0) - p for p in rings]) if rings else np.zeros((0, 2))
+        self.ax, self.az = a[:, 0].copy(), a[:, 1].copy()
+        self.dx, self.dz = d[:, 0].copy(), d[:, 1].copy()
+        with np.errstate(divide="ignore"):
+            self.inv_len2 = np.where(self.dx ** 2 + self.dz ** 2 > 0, 1 / (self.dx ** 2 + self.dz ** 2), 0.0)
+
+        self.bounds = np.full((n, 4), np.nan)
+        self.area = np.zeros(n)
+        for r, (p, s) in enumerate(zip(polygons, sizes)):
+            if s:
+                self.bounds[r] = (*p.min(axis=0), *p.max(axis=0))
+                self.area[r] = abs(polygon_area(p))
+        self._build_grid(cell)
+
+    @classmethod
+    def from_rooms(cls, rooms, tol=WALL_TOL, cell=None):
+        """
+        Locator over the outlines of `Room`s, named by room name.
+        """
+        rooms = list(rooms)
+        return cls([room_polygon(room, tol) for room in rooms], [room.name for room in rooms], cell, tol)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _build_grid(self, cell):
+        rooms = np.flatnonzero(~np.isnan(self.bounds[:, 0]))
+        b = self.bounds[rooms] + np.array([-1, -1, 1, 1]) * self.tol
+        if cell is None:
+            cell = float(np.median(np.maximum(b[:, 2] - b[:, 0], b[:, 3] - b[:, 1]))) / 2 if len(b) else 1.0
+        self.cell = max(cell, 1e-3)
+        self.origin = b[:, :2].min(axis=0) if len(b) else np.zeros(2)
+        lo = np.floor((b[:, :2] - self.origin) / self.cell).astype(np.intp)
+        hi = np.floor((b[:, 2:] - self.origin) / self.cell).astype(np.intp)
+        self.shape = (hi.max(axis=0) + 1) if len(b) else np.zeros(2, dtype=np.intp)
+
+        # Every (cell, room) pair of a room's bounding box, sorted into CSR
+        nx, nz = hi[:, 0] - lo[:, 0] + 1, hi[:, 1] - lo[:, 1] + 1
+        total = nx * nz
+        pair = np.repeat(np.arange(len(rooms)), total)
+        m = np.arange(total.sum()) - np.repeat(np.cumsum(total) - total, total)
+        cx = lo[pair, 0] + m // nz[pair]
+        cz = lo[pair, 1] + m % nz[pair]
+        key = cx * self.shape[1] + cz
+        order = np.argsort(key, kind="stable")
+        self.cell_rooms = rooms[pair[order]]
+        self.cell_ptr = np.zeros(int(np.prod(self.shape)) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(key, minlength=len(self.cell_ptr) - 1), out=self.cell_ptr[1:])
+
+    def assign(self, points, chunk=65536):
+        """
+        Room row per point (-1: in no room). `points` are (P,2) plan (x, z)
+        or (P,3) positions.
+        """
+        points = np.asarray(points, dtype=float)
+        if points.ndim == 2 and points.shape[1] == 3:
+            points = points[:, [0, 2]]
+        points = points.reshape(-1, 2)
+        out = np.full(len(points), -1, dtype=np.intp)
+        with stage("locate"):
+            for lo in range(0, len(points), chunk):
+                out[lo:lo + chunk] = self._assign(points[lo:lo + chunk])
+        return out
+
+    def _assign(self, points):
+        out = np.full(len(points), -1, dtype=np.intp)
+        if not len(self.cell_rooms):
+            return out
+        c = np.floor((points - self.origin) / self.cell).astype(np.intp)
+        on_grid = np.flatnonzero(((c >= 0) & (c < self.shape)).all(axis=1))
+        key = c[on_grid, 0] * self.shape[1] + c[on_grid, 1]
+
+        # Candidate (point, room) pairs from the point's cell, then bounds
+        start, size = self.cell_ptr[key], self.cell_ptr[key + 1] - self.cell_ptr[key]
+        pt = np.repeat(on_grid, size)
+        room = self.cell_rooms[np.repeat(start - np.cumsum(size) + size, size) + np.arange(size.sum())]
+        px, pz = points[pt, 0], points[pt, 1]
+        t = self.tol
+        keep = ((px >= self.bounds[room, 0] - t) & (px <= self.bounds[room, 2] + t) &
+                (pz >= self.bounds[room, 1] - t) & (pz <= self.bounds[room, 3] + t))
+        pt, room, px, pz = pt[keep], room[keep], px[keep], pz[keep]
+        if not len(pt):
+            return out
+
+        # Every (pair, edge of its room): count edges crossing the ray to +x
+        n_edges = self.edge_ptr[room + 1] - self.edge_ptr[room]
+        first = np.cumsum(n_edges) - n_edges
+        pair = np.repeat(np.arange(len(pt)), n_edges)
+        edge = np.repeat(self.edge_ptr[room] - first, n_edges) + np.arange(n_edges.sum())
+        count("edge_tests", len(edge))
+        ux, uz = px[pair] - self.ax[edge], pz[pair] - self.az[edge]
+        dx, dz = self.dx[edge], self.dz[edge]
+        crosses = (uz < 0) != (uz < dz)
+        left = (ux * dz < uz * dx) == (dz > 0)
+        hits = np.bincount(pair[crosses & left], minlength=len(pt))
+        strict = hits % 2 == 1
+
+        # Distance to the nearest edge of the room, for points on its walls
+        s = np.clip((ux * dx + uz * dz) * self.inv_len2[edge], 0, 1)
+        ux -= s * dx
+        uz -= s * dz
+        d2 = np.minimum.reduceat(ux * ux + uz * uz, first)
+        inside = strict | (d2 <= t * t)
+        pt, room, strict = pt[inside], room[inside], strict[inside]
+
+        # Written last, and so kept: strictly inside, then the smallest outline
+        order = np.lexsort((-self.area[room], strict))
+        out[pt[order]] = room[order]
+        return out
+
+    def room_names(self, rows):
+        """
+        Room name per row from `assign` ("" for -1).
+        """
+        return ["" if r < 0 else self.names[r] for r in np.asarray(rows).tolist()]
+
+
+# ─── Devices ─────────────────────────────────────────────────────────────────
+
+def locate_devices(scene, locator=None):
+    """
+    The scene's devices with no known room (an empty `room` field, or a
+    top-level device naming no room) with `room` set to the room whose
+    outline holds them ("" when none does). All rooms of the scene are
+    assumed to share one coordinate frame.
+    """
+    if locator is None:
+        locator = RoomLocator.from_rooms(scene.rooms)
+    devices = scene_devices(scene)
+    devices = devices[~np.isin(devices["room"], list(scene.by_name))]
+    devices["room"] = locator.room_names(locator.assign(devices["position"]))
+    return devices
@@ -0,0 +1,298 @@
+import json
+import os
+
+import numpy as np
+
+from .attach import PackedSurfaces
+from .geometry import plane_frame, plane_normal, rectangle_frames, surface_axis, to_xyz
+from .profiling import count, stage
+from .spatial_index import SurfaceIndex
+
+# ─── Array Layouts ───────────────────────────────────────────────────────────
+
+PLANE_GROUPS = ("walls", "doors", "windows")
+
+# One row per wall/door/window/object. `dimensions` is (width, height, length)
+# as exported; `location` is the raw JSON location (a corner for
+# walls/doors/windows, the centroid for objects).
+ELEMENT_DTYPE = np.dtype([
+    ("id",         "U64"),
+    ("group",      "U32"),   # walls/doors/windows or the `objects` key (fixture, ...)
+    ("category",   "U32"),   # RoomPlan category (sink, table, ...) or the group
+    ("location",   "f8", 3),
+    ("dimensions", "f8", 3),
+    ("centroid",   "f8", 3),
+    ("normal",     "f8", 3), # zero for objects
+    ("axis",       "f8", 3), # width axis of a `transform`, else zero (see `surface_axis`)
+])
+
+DEVICE_DTYPE = np.dtype([
+    ("id",       "U64"),
+    ("name",     "U64"),
+    ("type",     "U32"),
+    ("room",     "U64"),
+    ("position", "f8", 3),
+])
+
+def _xyz(point):
+    return (point["x"], point["y"], point["z"]) if point else (0.0, 0.0, 0.0)
+
+def _dims(dims):
+    return (dims.get("width", 0.0), dims.get("height", 0.0), dims.get("length", 0.0))
+
+def element_row(item, group, i):
+    """
+    One ELEMENT_DTYPE row (as a tuple) for a wall/door/window/object dict.
+    """
+    dims = item.get("dimensions", {})
+    loc = np.array(_xyz(item.get("location") or item.get("position")), dtype=float)
+    wdl = np.array(_dims(dims), dtype=float)
+
+    if group in PLANE_GROUPS:
+        # Corner + half extents (or the `transform`), like `build_surfaces`
+        category = group
+        axis = surface_axis(item)
+        if "transform" in item:
+            centroid, normal = plane_frame(item)
+        else:
+            centroid = loc + 0.5 * wdl
+            normal = plane_normal(dims)
+    else:
+        category = item.get("category", group)
+        centroid = loc
+        normal = axis = (0.0, 0.0, 0.0)
+    return (item.get("id", f"{group}_{i}"), group, category, loc, wdl, centroid, normal, axis)
+
+def device_row(dev):
+    """
+    One DEVICE_DTYPE row (as a tuple) for an IoT device dict. Missing
+    `name`/`type`/`room` fields are stored as "".
+    """
+    return (dev["id"], dev.get("name", ""), dev.get("type", ""),
+            dev.get("room", ""), _xyz(dev["position"]))
+
+
+# ─── Room / Scene ────────────────────────────────────────────────────────────
+
+class Room:
+    """
+    One RoomPlan room held as contiguous structured arrays.
+
+    `elements` stores walls, then doors, then windows, then every object
+    group in file order — the same order the bigraph scripts add nodes in.
+    `walls`, `doors`, `windows` and `objects` are views into it. IoT devices
+    live in `devices`. `index` / `device_index` map ids to rows.
+    """
+
+    def __init__(self, name, elements, devices, counts):
+        self.name = name
+        self.elements = elements
+        self.devices = devices
+        self.counts = counts  # {"walls": n, "doors": n, "windows": n}
+        self.index = {eid: row for row, eid in enumerate(elements["id"].tolist())}
+        self.device_index = {did: row for row, did in enumerate(devices["id"].tolist())}
+        self._surfaces = None
+        self._rects = None
+        self._index = None
+
+    @classmethod
+    def from_dict(cls, name, room_data):
+        rows, counts = [], {}
+        for group in PLANE_GROUPS:
+            items = room_data.get(group, [])
+            counts[group] = len(items)
+            rows.extend(element_row(item, group, i) for i, item in enumerate(items))
+        for group, items in room_data.get("objects", {}).items():
+            rows.extend(element_row(item, group, i) for i, item in enumerate(items))
+
+        devs = [device_row(d) for d in room_data.get("iot_devices", [])]
+        return cls(name,
+                   np.array(rows, dtype=ELEMENT_DTYPE),
+                   np.array(devs, dtype=DEVICE_DTYPE),
+                   counts)
+
+    @property
+    def n_planes(self):
+        return sum(self.counts.values())
+
+    @property
+    def walls(self):
+        return self.elements[:self.counts["walls"]]
+
+    @property
+    def doors(self):
+        start = self.counts["walls"]
+        return self.elements[start:start + self.counts["doors"]]
+
+    @property
+    def windows(self):
+        start = self.counts["walls"] + self.counts["doors"]
+        return self.elements[start:start + self.counts["windows"]]
+
+    @property
+    def objects(self):
+        return self.elements[self.n_planes:]
+
+    def labels(self):
+        """
+        Node labels in `elements` order: "Wall"/"Door"/"Window" for the
+        planes, the RoomPlan category for objects.
+        """
+        return [group[:-1].capitalize() if group in PLANE_GROUPS else cat
+                for group, cat in zip(self.elements["group"].tolist(),
+                                      self.elements["category"].tolist())]
+
+    def position(self, element_id):
+        """
+        The element's raw JSON location as an {'x','y','z'} dict.
+        """
+        return to_xyz(self.elements["location"][self.index[element_id]])
+
+    def add_devices(self, devices):
+        """
+        Append IoT device dicts (e.g. from a top-level `IoTDevices` list).
+        """
+        if not devices:
+            return
+        new = np.array([device_row(d) for d in devices], dtype=DEVICE_DTYPE)
+        self.devices = np.concatenate([self.devices, new])
+        self.device_index = {did: row for row, did in enumerate(self.devices["id"].tolist())}
+
+    def update_devices(self, devices):
+        """
+        Move the devices of `devices` (dicts with `id` and `position`, and
+        optionally `name`/`type`) that the room has, append the others.
+        `devices` is replaced rather than written into, so arrays handed
+        out earlier stay as they were. Returns the number moved.
+        """
+        known = [d for d in devices if d["id"] in self.device_index]
+        if known:
+            updated = self.devices.copy()
+            for dev in known:
+                row = updated[self.device_index[dev["id"]]]
+                row["position"] = _xyz(dev["position"])
+                for field in ("name", "type"):
+                    if dev.get(field) is not None:
+                        row[field] = dev[field]
+            self.devices = updated
+        self.add_devices([d for d in devices if d["id"] not in self.device_index])
+        return len(known)
+
+    def remove_devices(self, ids):
+        """
+        Drop the devices with the given ids (unknown ids are ignored).
+        """
+        keep = ~np.isin(self.devices["id"], list(ids))
+        self.devices = self.devices[keep]
+        self.device_index = {did: row for row, did in enumerate(self.devices["id"].tolist())}
+
+    def surfaces(self, finite=False):
+        """
+        `PackedSurfaces` for the room, built straight from the columns:
+        planes (centroid + normal) for walls/doors/windows, AABBs for
+        objects. With `finite`, walls/doors/windows are their bounded
+        rectangles (`geometry.rectangle_frames`, turned by their
+        `transform`) instead of infinite planes. Each variant is cached after its first call.
+        """
+        cached = self._rects if finite else self._surfaces
+        if cached is not None:
+            return cached
+        with stage("surfaces", room=self.name):
+            n = self.n_planes
+            planes = self.elements[:n]
+            objs = self.objects
+            # Objects are boxed with length along x and width along z
+            half = 0.5 * objs["dimensions"][:, [2, 1, 0]]
+            boxes = dict(box_min=objs["location"] - half, box_max=objs["location"] + half)
+            if finite:
+                axes, extents = rectangle_frames(planes["normal"], planes["dimensions"], planes["axis"])
+                packed = self._rects = PackedSurfaces.from_columns(
+                    self.elements["id"].tolist(), plane_points=(), plane_normals=(),
+                    rect_centers=planes["centroid"], rect_axes=axes, rect_half=extents, **boxes)
+            else:
+                packed = self._surfaces = PackedSurfaces.from_columns(
+                    self.elements["id"].tolist(),
+                    plane_points=planes["centroid"],
+                    plane_normals=planes["normal"],
+                    **boxes,
+                )
+            count("surfaces", len(packed))
+        return packed
+
+    def surface_index(self):
+        """
+        `SurfaceIndex` over `surfaces(finite=True)`, built on first call and
+        cached: a nearest-surface query then visits the surfaces near each
+        device instead of all of them.
+        """
+        if self._index is None:
+            with stage("surface_index", room=self.name):
+                self._index = SurfaceIndex.from_packed(self.surfaces(finite=True))
+        return self._index
+
+
+class Scene:
+    """
+    All rooms of one RoomPlan export, parsed once.
+
+    Handles both the multi-room `{"Rooms": [{name: room}, ...]}` layout under
+    `Jsons/` and the single `{"room": {...}}` layout under `Data/*/`. Devices
+    from a top-level `IoTDevices` list are moved into the room named by
+    their `room` field; those naming no known room end up in
+    `unassigned_devices`.
+    """
+
+    def __init__(self, rooms, unassigned_devices=None):
+        self.rooms = rooms
+        self.by_name = {room.name: room for room in rooms}
+        self.unassigned_devices = unassigned_devices or []
+
+    def __iter__(self):
+        return iter(self.rooms)
+
+    def __len__(self):
+        return len(self.rooms)
+
+    def __getitem__(self, name):
+        return self.by_name[name]
+
+    @classmethod
+    def from_dict(cls, data, default_name="room"):
+        rooms = [Room.from_dict(name, room_data) for name, room_data in iter_rooms(data, default_name)]
+        scene = cls(rooms)
+        per_room = {}
+        for dev in data.get("IoTDevices", []):
+            if dev.get("room") in scene.by_name:
+                per_room.setdefault(dev["room"], []).append(dev)
+            else:
+                scene.unassigned_devices.append(dev)
+        for name, devs in per_room.items():
+            scene[name].add_devices(devs)
+        return scene
+
+    @classmethod
+    def load(cls, path):
+        with stage("json"), open(path, "r") as f:
+            data = json.load(f)
+        with stage("arrays"):
+            return cls.from_dict(data, default_name=room_name_from_path(path))
+
+
+def iter_rooms(data, default_name="room"):
+    """
+    Yield `(room_name, room_data)` for either JSON layout.
+    """
+    if "Rooms" in data:
+        for room_dict in data["Rooms"]:
+            yield from room_dict.items()
+    elif "room" in data:
+        yield default_name, data["room"]
+
+def room_name_from_path(path):
+    """
+    Name for a single-`room` export: `Data/Kitchen/RoomBigraphKitchen.json`
+    becomes "Kitchen".
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    prefix = "RoomBigraph"
+    return stem[len(prefix):] if stem.startswith(prefix) and stem != prefix else stem
@@ -0,0 +1,641 @@
+"""
+Local HTTP service that keeps scenes and their bigraphs hot in memory.
+
+Scenes are parsed once; RoomPlan uploads and IoT position updates rebuild
+only the rooms they touch, in a worker pool off the event loop, and
+bigraph, query and floorplan responses are served from an LRU cache keyed
+by scene/room version. Standard library only (asyncio streams and a
+minimal HTTP/1.1 with keep-alive), meant for localhost:
+
+    python -m spatialbigraph.service Jsons/floor.json Data/ --port 8765 -j 2
+
+    POST /scenes/<scene>                      RoomPlan export (either layout)
+    PUT  /scenes/<scene>/rooms/<room>         one room's dict, rebuilds that room
+    POST /scenes/<scene>/devices              {"devices": [{"id", "position", "room"?}, ...]}
+    GET  /scenes/<scene>/bigraph              {"nodes": [...], "edges": [...]}, as batch --out
+    GET  /scenes/<scene>/query?node=Kitchen&op=descendants&depth=2
+    GET  /scenes/<scene>/rooms/<room>/floorplan.png
+    GET  /scenes, /health, /metrics           /metrics: latency percentiles per route
+
+A device update goes to the room named in it, else the room already
+holding the device, else the room whose outline contains its position
+(`rooms.RoomLocator`). Its response lists the parent edges that changed.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import re
+import signal
+import sys
+import time
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import networkx as nx
+import numpy as np
+
+from . import profiling
+from .batch import build_chunk
+from .geometry import to_xyz
+from .loader import find_inputs
+from .profiling import stage
+from .query import BigraphIndex
+from .rooms import RoomLocator
+from .scene import Room, Scene, room_name_from_path
+
+MAX_BODY = 64 << 20
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+Request = namedtuple("Request", "method path query body params")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ─── Worker Tasks ────────────────────────────────────────────────────────────
+
+_png_renderer = None
+
+def _render_png(room, options):
+    """
+    Worker task: one room's floorplan as PNG bytes, on a figure reused for
+    every call in this worker.
+    """
+    global _png_renderer
+    if _png_renderer is None:
+        from .render import FloorplanRenderer
+        _png_renderer = FloorplanRenderer(out_dir=None, fmt="png", **options)
+    buf = io.BytesIO()
+    _png_renderer.render(room, buf)
+    return buf.getvalue()
+
+
+# ─── Cache / Metrics ─────────────────────────────────────────────────────────
+
+class LRUCache:
+    """
+    Response bytes by key, evicting the least recently used entry once more
+    than `max_entries` entries or `max_bytes` bytes are held. Keys carry
+    the scene/room version, so stale entries are never hit and age out.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if key in self.entries:
+            self.nbytes -= len(self.entries.pop(key))
+        self.entries[key] = value
+        self.nbytes += len(value)
+        while self.entries and (len(self.entries) > self.max_entries or self.nbytes > self.max_bytes):
+            _, old = self.entries.popitem(last=False)
+            self.nbytes -= len(old)
+
+    def report(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self.entries), "bytes": self.nbytes, "hits": self.hits,
+                "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class LatencyStats:
+    """
+    Request count, error count and the last `window` latencies per route.
+    """
+
+    def __init__(self, window=4096):
+        self.window = window
+        self.routes = {}
+
+    def record(self, route, seconds, error=False):
+        stats = self.routes.setdefault(route, {"count": 0, "errors": 0,
+                                               "latencies": deque(maxlen=self.window)})
+        stats["count"] += 1
+        stats["errors"] += bool(error)
+        stats["latencies"].append(seconds)
+
+    def report(self):
+        out = {}
+        for route, stats in sorted(self.routes.items()):
+            ms = np.array(stats["latencies"]) * 1e3
+            p50, p90, p99 = np.percentile(ms, [50, 90, 99]).tolist()
+            out[route] = {"count": stats["count"], "errors": stats["errors"],
+                          "p50_ms": p50, "p90_ms": p90, "p99_ms": p99, "max_ms": float(ms.max())}
+        return out
+
+
+# ─── Scene State ─────────────────────────────────────────────────────────────
+
+class SceneState:
+    """
+    One scene held by the service: its `Room`s, each room's built subgraph
+    (node and edge lists from `batch.build_chunk`) and the version counters
+    the cache keys use. The merged DiGraph, its `BigraphIndex` and the
+    `RoomLocator` are rebuilt lazily when their version is stale.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.rooms = {}
+        self.parts = {}
+        self.room_version = {}
+        self.version = 0
+        self.geometry_version = 0
+        self._graph = (-1, None)
+        self._index = (-1, None)
+        self._locator = (-1, None)
+
+    def graph(self):
+        version, G = self._graph
+        if version != self.version:
+            with stage("service_merge"):
+                G = nx.DiGraph()
+                for name in self.rooms:
+                    nodes, edges = self.parts.get(name, ((), ()))
+                    G.add_nodes_from(nodes)
+                    G.add_edges_from(edges)
+            self._graph = (self.version, G)
+        return G
+
+    def index(self):
+        version, index = self._index
+        if version != self.version:
+            index = BigraphIndex.from_networkx(self.graph())
+            self._index = (self.version, index)
+        return index
+
+    def locator(self):
+        version, locator = self._locator
+        if version != self.geometry_version:
+            locator = RoomLocator.from_rooms(self.rooms.values())
+            self._locator = (self.geometry_version, locator)
+        return locator
+
+    def device_rooms(self):
+        """
+        {device id: name of the room holding it}.
+        """
+        return {did: name for name, room in self.rooms.items() for did in room.device_index}
+
+    def summary(self):
+        return {"version": self.version, "rooms": list(self.rooms),
+                "devices": sum(len(room.devices) for room in self.rooms.values())}
+
+
+def _snapshot(room):
+    """
+    A `Room` sharing `room`'s arrays but not its surface cache, safe to hand
+    to a worker while the service keeps editing `room` (edits replace the
+    arrays, they never write into them).
+    """
+    return Room(room.name, room.elements, room.devices, room.counts)
+
+def _device(dev):
+    if not isinstance(dev, dict) or "id" not in dev or "position" not in dev:
+        raise HTTPError(400, "every device needs an `id` and a `position`")
+    pos = dev["position"]
+    if isinstance(pos, (list, tuple)):
+        if len(pos) != 3:
+            raise HTTPError(400, f"position of {dev['id']!r} must have 3 coordinates")
+        dev = dict(dev, position=to_xyz(pos))
+    elif not isinstance(pos, dict) or not {"x", "y", "z"} <= set(pos):
+        raise HTTPError(400, f"position of {dev['id']!r} must be [x, y, z] or {{x, y, z}}")
+    return dev
+
+
+# ─── Service ─────────────────────────────────────────────────────────────────
+
+ROUTES = [
+    ("GET",    r"/health",                                        "health"),
+    ("GET",    r"/metrics",                                       "metrics"),
+    ("GET",    r"/scenes",                                        "list_scenes"),
+    ("POST",   r"/scenes/(?P<scene>[^/]+)",                       "put_scene"),
+    ("DELETE", r"/scenes/(?P<scene>[^/]+)",                       "delete_scene"),
+    ("PUT",    r"/scenes/(?P<scene>[^/]+)/rooms/(?P<room>[^/]+)", "put_room"),
+    ("POST",   r"/scenes/(?P<scene>[^/]+)/devices",               "put_devices"),
+    ("GET",    r"/scenes/(?P<scene>[^/]+)/bigraph",               "bigraph"),
+    ("GET",    r"/scenes/(?P<scene>[^/]+)/query",                 "query"),
+    ("GET",    r"/scenes/(?P<scene>[^/]+)/rooms/(?P<room>[^/]+)/floorplan\.png", "floorplan"),
+]
+
+
+class BigraphService:
+    """
+    Request handling and state for `serve`. Everything runs on one event
+    loop; room builds go to `builders` and floorplan renders to `renderers`
+    (`workers` processes each, or one thread for `workers` <= 1), so a
+    device update never queues behind a slow render. Concurrent misses on
+    the same cache key share one computation.
+    """
+
+    def __init__(self, workers=None, cache_entries=256, cache_bytes=64 << 20,
+                 render_options=None, max_body=MAX_BODY):
+        workers = workers or os.cpu_count() or 1
+        self.workers = workers
+        self.builders, self.renderers = [
+            ProcessPoolExecutor(max_workers=workers) if workers > 1 else ThreadPoolExecutor(max_workers=1)
+            for _ in range(2)]
+        self.render_options = render_options or {}
+        self.max_body = max_body
+        self.scenes = {}
+        self.cache = LRUCache(cache_entries, cache_bytes)
+        self.latency = LatencyStats()
+        self.started = time.time()
+        self._room_versions = 0
+        self._in_flight = {}
+        self.routes = [(method, re.compile(pattern + r"/?\Z"), name)
+                       for method, pattern, name in ROUTES]
+
+    def close(self):
+        for pool in (self.builders, self.renderers):
+            pool.shutdown(cancel_futures=True)
+
+    # ─── Rebuilding ───────────────────────────────────────────────────────
+
+    async def rebuild(self, state, names):
+        """
+        Rebuild the named rooms of `state` in the pool and install their
+        subgraphs. Returns (added, removed) edges over those rooms. A result
+        is dropped if the room was edited again meanwhile; the newer
+        rebuild installs its own.
+        """
+        loop = asyncio.get_running_loop()
+        tickets = []
+        for name in names:
+            self._room_versions += 1
+            state.room_version[name] = self._room_versions
+            tickets.append((name, self._room_versions, loop.run_in_executor(
+                self.builders, build_chunk, [_snapshot(state.rooms[name])])))
+
+        added, removed = [], []
+        for name, version, future in tickets:
+            nodes, edges, _ = await future
+            if state.room_version.get(name) != version:
+                continue
+            old = set(state.parts.get(name, ((), ()))[1])
+            new = set(edges)
+            added.extend(sorted(new - old))
+            removed.extend(sorted(old - new))
+            state.parts[name] = (nodes, edges)
+            state.version += 1
+        return added, removed
+
+    def place_devices(self, state, devices):
+        """
+        Move or add `devices` in the rooms they belong to (see the module
+        docstring). Returns the names of the rooms changed and the ids of
+        devices no room claims.
+        """
+        holder = state.device_rooms()
+        loose = [dev for dev in devices if dev.get("room") not in state.rooms and dev["id"] not in holder]
+        located = {}
+        if loose and state.rooms:
+            locator = state.locator()
+            rows = locator.assign(np.array([[d["position"][k] for k in "xyz"] for d in loose]))
+            located = {d["id"]: name for d, name in zip(loose, locator.room_names(rows))}
+
+        per_room, unplaced = {}, []
+        for dev in devices:
+            name = dev.get("room") if dev.get("room") in state.rooms else None
+            name = name or holder.get(dev["id"]) or located.get(dev["id"])
+            if not name:
+                unplaced.append(dev["id"])
+                continue
+            old = holder.get(dev["id"])
+            if old and old != name:
+                state.rooms[old].remove_devices([dev["id"]])
+                per_room.setdefault(old, [])
+            per_room.setdefault(name, []).append(dict(dev, room=name))
+        for name, devs in per_room.items():
+            state.rooms[name].update_devices(devs)
+        return list(per_room), unplaced
+
+    async def load_scene(self, name, data):
+        scene = Scene.from_dict(data, default_name=name)
+        state = SceneState(name)
+        state.rooms = {room.name: room for room in scene}
+        state.geometry_version = 1
+        _, unplaced = self.place_devices(state, [_device(d) for d in scene.unassigned_devices])
+        self.scenes[name] = state
+        await self.rebuild(state, list(state.rooms))
+        return state, unplaced
+
+    async def cached(self, key, compute):
+        """
+        Cached response bytes for `key`, computing them with the coroutine
+        function `compute` on a miss; concurrent misses await one call.
+        """
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+        if key in self._in_flight:
+            return await asyncio.shield(self._in_flight[key])
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await compute()
+            self.cache.put(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Retrieved here, so waiters that left early log no warning
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    # ─── Handlers ─────────────────────────────────────────────────────────
+
+    def _scene(self, req):
+        state = self.scenes.get(req.params["scene"])
+        if state is None:
+            raise HTTPError(404, f"no scene {req.params['scene']!r}")
+        return state
+
+    def _room(self, state, req):
+        if req.params["room"] not in state.rooms:
+            raise HTTPError(404, f"no room {req.params['room']!r} in scene {state.name!r}")
+        return state.rooms[req.params["room"]]
+
+    async def health(self, req):
+        return 200, {"status": "ok", "scenes": len(self.scenes), "workers": self.workers,
+                     "uptime_s": time.time() - self.started}
+
+    async def metrics(self, req):
+        return 200, {"routes": self.latency.report(), "cache": self.cache.report()}
+
+    async def list_scenes(self, req):
+        return 200, {name: state.summary() for name, state in self.scenes.items()}
+
+    async def put_scene(self, req):
+        if not isinstance(req.body, dict):
+            raise HTTPError(400, "body must be a RoomPlan export object")
+        t0 = time.perf_counter()
+        state, unplaced = await self.load_scene(req.params["scene"], req.body)
+        return 201, dict(state.summary(), unplaced=unplaced, seconds=time.perf_counter() - t0)
+
+    async def delete_scene(self, req):
+        self._scene(req)
+        del self.scenes[req.params["scene"]]
+        return 200, {"deleted": req.params["scene"]}
+
+    async def put_room(self, req):
+        state = self._scene(req)
+        name = req.params["room"]
+        if not isinstance(req.body, dict):
+            raise HTTPError(400, "body must be a RoomPlan room object")
+        room = Room.from_dict(name, req.body)
+        # A RoomPlan rescan carries no devices; the room keeps those it had
+        if "iot_devices" not in req.body and name in state.rooms:
+            room.devices = state.rooms[name].devices
+            room.device_index = state.rooms[name].device_index
+        state.rooms[name] = room
+        state.geometry_version += 1
+        added, removed = await self.rebuild(state, [name])
+        return 200, {"room": name, "version": state.version,
+                     "added": len(added), "removed": len(removed)}
+
+    async def put_devices(self, req):
+        state = self._scene(req)
+        body = req.body
+        devices = body.get("devices") if isinstance(body, dict) else body
+        if not isinstance(devices, list):
+            raise HTTPError(400, "body must be a device list or {\"devices\": [...]}")
+        changed, unplaced = self.place_devices(state, [_device(d) for d in devices])
+        added, removed = await self.rebuild(state, changed)
+        return 200, {"rooms": changed, "version": state.version, "unplaced": unplaced,
+                     "added": added, "removed": removed}
+
+    async def bigraph(self, req):
+        state = self._scene(req)
+
+        async def compute():
+            G = state.graph()
+            return _json({"nodes": [{"id": n, **attrs} for n, attrs in G.nodes(data=True)],
+                          "edges": list(G.edges())})
+        return 200, await self.cached(("bigraph", state.name, state.version), compute)
+
+    async def query(self, req):
+        state = self._scene(req)
+        q = {k: v[-1] for k, v in req.query.items()}
+        if "node" not in q:
+            raise HTTPError(400, "missing `node`")
+        op = q.get("op", "descendants")
+        if op not in ("descendants", "ancestors"):
+            raise HTTPError(400, f"unknown op {op!r} (descendants, ancestors)")
+        try:
+            depth = int(q["depth"]) if q.get("depth") else None
+        except ValueError:
+            raise HTTPError(400, f"depth must be an integer, not {q['depth']!r}")
+
+        async def compute():
+            index = state.index()
+            if q["node"] not in index.index:
+                raise HTTPError(404, f"no node {q['node']!r} in scene {state.name!r}")
+            if op == "ancestors":
+                nodes = index.ancestors(q["node"])
+            else:
+                nodes = index.descendants(q["node"], label=q.get("label") or None, depth=depth)
+            return _json({"node": q["node"], "op": op, "nodes": list(nodes)})
+        key = ("query", state.name, state.version, op, q["node"], q.get("label"), depth)
+        return 200, await self.cached(key, compute)
+
+    async def floorplan(self, req):
+        state = self._scene(req)
+        room = self._room(state, req)
+        loop = asyncio.get_running_loop()
+
+        async def compute():
+            return await loop.run_in_executor(self.renderers, _render_png, _snapshot(room),
+                                              self.render_options)
+        key = ("png", state.name, room.name, state.room_version.get(room.name))
+        return 200, await self.cached(key, compute)
+
+    # ─── HTTP ─────────────────────────────────────────────────────────────
+
+    def route(self, method, path):
+        allowed = False
+        for route_method, pattern, name in self.routes:
+            match = pattern.match(path)
+            if match:
+                if route_method == method:
+                    return name, {k: unquote(v) for k, v in match.groupdict().items()}
+                allowed = True
+        raise HTTPError(405 if allowed else 404, f"{method} {path} not supported" if allowed
+                        else f"no route for {path}")
+
+    async def dispatch(self, method, target, body):
+        """
+        (status, content type, payload bytes) for one request; the latency
+        goes to `latency` under the route name.
+        """
+        t0 = time.perf_counter()
+        route = "unrouted"
+        try:
+            url = urlsplit(target)
+            route, params = self.route(method, url.path)
+            try:
+                body = json.loads(body) if body else None
+            except ValueError as exc:
+                raise HTTPError(400, f"body is not JSON: {exc}")
+            status, payload = await getattr(self, route)(Request(method, url.path, parse_qs(url.query), body, params))
+        except HTTPError as exc:
+            status, payload = exc.status, {"error": str(exc)}
+        except (ValueError, KeyError) as exc:
+            status, payload = 400, {"error": f"{type(exc).__name__}: {exc}"}
+        except Exception as exc:
+            print(f"{method} {target}: {type(exc).__name__}: {exc}", file=sys.stderr)
+            status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+        self.latency.record(route, time.perf_counter() - t0, error=status >= 400)
+
+        if isinstance(payload, bytes):
+            ctype = "image/png" if route == "floorplan" else "application/json"
+        else:
+            ctype, payload = "application/json", _json(payload)
+        return status, ctype, payload
+
+    async def handle(self, reader, writer):
+        """
+        One client connection: requests in order until either side closes
+        or a request asks for `Connection: close`.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    await _respond(writer, 400, "application/json",
+                                   _json({"error": "malformed request line"}), False)
+                    break
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = header.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= self.max_body:
+                    status = 400 if length < 0 else 413
+                    await _respond(writer, status, "application/json",
+                                   _json({"error": f"bad Content-Length {headers['content-length']!r}"}), False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, ctype, payload = await self.dispatch(method.upper(), target, body)
+                await _respond(writer, status, ctype, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+
+def _json(obj):
+    return json.dumps(obj).encode()
+
+async def _respond(writer, status, ctype, payload, keep_alive):
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {ctype}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + payload)
+    await writer.drain()
+
+
+# ─── Command Line ────────────────────────────────────────────────────────────
+
+async def serve(paths, host="127.0.0.1", port=8765, ready=None, **options):
+    """
+    Load `paths` (one scene per file, named by `room_name_from_path`) and
+    serve until cancelled or sent SIGTERM. `ready(url)` is called once
+    listening.
+    """
+    service = BigraphService(**options)
+    try:
+        # SIGTERM cancels like Ctrl-C, so the worker pool is shut down too
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass
+    try:
+        for path in paths:
+            with open(path, "r") as f:
+                data = json.load(f)
+            await service.load_scene(room_name_from_path(path), data)
+        server = await asyncio.start_server(service.handle, host, port)
+        bound = server.sockets[0].getsockname()
+        url = f"http://{bound[0]}:{bound[1]}"
+        if ready:
+            ready(url)
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="*",
+                        help="RoomPlan JSON files, directories or glob patterns to load at start")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port (default: 8765, 0 = any free)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes for room builds, and as many for renders "
+                             "(default: CPU count, 1 = one thread each)")
+    parser.add_argument("--cache-entries", type=int, default=256,
+                        help="responses kept in the LRU cache (default: 256)")
+    parser.add_argument("--cache-mb", type=float, default=64,
+                        help="bytes kept in the LRU cache, in MB (default: 64)")
+    parser.add_argument("--dpi", type=int, default=100, help="floorplan PNG resolution (default: 100)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    profiling.enable_from_env(args.profile_out, args.profile)
+
+    paths = find_inputs(args.inputs)
+    if args.inputs and not paths:
+        parser.error("no JSON files matched the given inputs")
+
+    def ready(url):
+        print(f"serving {len(paths)} scenes on {url}", flush=True)
+
+    try:
+        asyncio.run(serve(paths, args.host, args.port, ready=ready, workers=args.workers,
+                          cache_entries=args.cache_entries, cache_bytes=int(args.cache_mb * (1 << 20)),
+                          render_options={"dpi": args.dpi}))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
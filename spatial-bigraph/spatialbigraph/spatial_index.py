@@ -0,0 +1,214 @@
+import heapq
+import math
+
+import numpy as np
+
+from .attach import aabb_distances, rect_distances
+from .geometry import surface_rectangle
+
+# ─── Finite Surface Extents ──────────────────────────────────────────────────
+
+def surface_bounds(surfaces):
+    """
+    Axis-aligned extent of every entry of a `build_surfaces` list.
+
+    Planes (walls/doors/windows) are bounded by their finite rectangle
+    (`geometry.surface_rectangle`, centred on the `plane_frame` centre), so
+    a `transform` moves and turns the bounds along with the plane. Rectangles are
+    bounded by their centre ± the half extents along their axes. Boxes keep
+    their own min/max. Returns two (S,3) arrays.
+    """
+    mins = np.zeros((len(surfaces), 3))
+    maxs = np.zeros((len(surfaces), 3))
+    for i, (kind, obj, *params) in enumerate(surfaces):
+        if kind in ("plane", "rect"):
+            center, axes, half = surface_rectangle(obj) if kind == "plane" else params
+            reach = np.abs(np.asarray(axes, dtype=float)).T @ np.asarray(half, dtype=float)
+            mins[i], maxs[i] = center - reach, center + reach
+        else:
+            mins[i], maxs[i] = params
+    return mins, maxs
+
+
+# ─── Bounding-Volume Hierarchy ───────────────────────────────────────────────
+
+class SurfaceIndex:
+    """
+    BVH over the finite extents of one room's (or floor's) surfaces.
+
+    Built once from the `build_surfaces` output; answers k-nearest and
+    within-radius queries by best-first traversal, so a query only touches
+    the few leaves near the point instead of every surface.
+
+    Distances are point-to-finite-extent, so for a wall they are measured to
+    the actual wall rectangle and not to its infinite plane: a ("plane", ...)
+    entry is measured to its `surface_rectangle`, a ("rect", ...) entry to
+    its own oriented rectangle, their boxes only bounding the tree. Results are column indices into the original surface list;
+    `objects[i]` maps back to the JSON dict.
+    """
+
+    def __init__(self, surfaces, leaf_size=8):
+        # Planes become their finite rectangles once, for bounds and distances
+        surfaces = [("rect", s[1], *surface_rectangle(s[1])) if s[0] == "plane" else s for s in surfaces]
+        self.objects = [obj for _, obj, *_ in surfaces]
+        self.box_min, self.box_max = surface_bounds(surfaces)
+        self.leaf_size = leaf_size
+
+        # Row of every plane / ("rect", ...) entry in the rectangle arrays, else -1
+        rects = [(i, params) for i, (kind, _, *params) in enumerate(surfaces) if kind == "rect"]
+        self.rect_row = np.full(len(surfaces), -1, dtype=np.intp)
+        self.rect_row[[i for i, _ in rects]] = np.arange(len(rects))
+        self.rect_centers = np.array([p[0] for _, p in rects], dtype=float).reshape(-1, 3)
+        self.rect_axes = np.array([p[1] for _, p in rects], dtype=float).reshape(-1, 2, 3)
+        self.rect_half = np.array([p[2] for _, p in rects], dtype=float).reshape(-1, 2)
+
+        self.order = np.arange(len(surfaces), dtype=np.intp)
+        self._centroids = 0.5 * (self.box_min + self.box_max)
+        self._lo, self._hi, self._left, self._right, self._start, self._end = [], [], [], [], [], []
+        if len(surfaces):
+            self._build(0, len(surfaces))
+
+        self.node_min = np.array(self._lo).reshape(-1, 3)
+        self.node_max = np.array(self._hi).reshape(-1, 3)
+        self.left = np.array(self._left, dtype=np.intp)
+        self.right = np.array(self._right, dtype=np.intp)
+        self.start = np.array(self._start, dtype=np.intp)
+        self.end = np.array(self._end, dtype=np.intp)
+        del self._lo, self._hi, self._left, self._right, self._start, self._end, self._centroids
+
+        # Plain-float copies for the traversal: per-node NumPy calls on 2 rows
+        # cost more than the arithmetic itself.
+        self._bounds = [tuple(lo) + tuple(hi) for lo, hi in zip(self.node_min.tolist(), self.node_max.tolist())]
+        self._children = list(zip(self.left.tolist(), self.right.tolist()))
+
+    @classmethod
+    def from_packed(cls, packed, leaf_size=8):
+        """
+        Index over a `PackedSurfaces` of rectangles and boxes, e.g.
+        `Room.surfaces(finite=True)`, with the same columns and objects.
+        Infinite planes have no extent to bound, so they are refused.
+        """
+        if len(packed.plane_cols):
+            raise ValueError("infinite planes cannot be indexed; pass finite surfaces")
+        surfaces = [None] * len(packed)
+        for row, col in enumerate(packed.rect_cols.tolist()):
+            surfaces[col] = ("rect", packed.objects[col], packed.rect_centers[row],
+                             packed.rect_axes[row], packed.rect_half[row])
+        for row, col in enumerate(packed.box_cols.tolist()):
+            surfaces[col] = ("box", packed.objects[col], packed.box_min[row], packed.box_max[row])
+        return cls(surfaces, leaf_size)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def _build(self, start, end):
+        ids = self.order[start:end]
+        node = len(self._lo)
+        self._lo.append(self.box_min[ids].min(axis=0))
+        self._hi.append(self.box_max[ids].max(axis=0))
+        self._start.append(start)
+        self._end.append(end)
+        self._left.append(-1)
+        self._right.append(-1)
+        if end - start <= self.leaf_size:
+            return node
+
+        # Median split along the axis where the centroids spread the most
+        c = self._centroids[ids]
+        axis = np.ptp(c, axis=0).argmax()
+        mid = (end - start) // 2
+        self.order[start:end] = ids[np.argpartition(c[:, axis], mid)]
+
+        self._left[node] = self._build(start, start + mid)
+        self._right[node] = self._build(start + mid, end)
+        return node
+
+    # ─── Queries ──────────────────────────────────────────────────────────
+
+    def _node_dist(self, p, node):
+        x, y, z = p
+        x0, y0, z0, x1, y1, z1 = self._bounds[node]
+        dx = max(x0 - x, 0.0, x - x1)
+        dy = max(y0 - y, 0.0, y - y1)
+        dz = max(z0 - z, 0.0, z - z1)
+        return math.sqrt(dx * dx + dy * dy + dz * dz)
+
+    def _leaf_items(self, p, node):
+        ids = self.order[self.start[node]:self.end[node]]
+        d = aabb_distances(p[None], self.box_min[ids], self.box_max[ids])[0]
+        rows = self.rect_row[ids]
+        rect = rows >= 0
+        if rect.any():
+            rows = rows[rect]
+            d[rect] = rect_distances(p[None], self.rect_centers[rows], self.rect_axes[rows],
+                                     self.rect_half[rows])[0]
+        return ids, d
+
+    def _knn_one(self, p, k):
+        best = []  # max-heap of (-dist, -item) holding the k closest so far
+        pf = p.tolist()
+        heap = [(self._node_dist(pf, 0), 0)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if len(best) == k and d > -best[0][0]:
+                break
+            left, right = self._children[node]
+            if left < 0:
+                for item, dist in zip(*self._leaf_items(p, node)):
+                    entry = (-dist, -item)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+            else:
+                heapq.heappush(heap, (self._node_dist(pf, left), left))
+                heapq.heappush(heap, (self._node_dist(pf, right), right))
+        best = sorted((-d, -i) for d, i in best)
+        return [i for _, i in best], [d for d, _ in best]
+
+    def query(self, points, k=1):
+        """
+        k nearest surfaces for every point.
+
+        Returns `(idx, dist)`, both (D,k), sorted closest first. Rows are
+        padded with -1 / inf when the index holds fewer than k surfaces.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        idx = np.full((len(points), k), -1, dtype=np.intp)
+        dist = np.full((len(points), k), np.inf)
+        if len(self) == 0:
+            return idx, dist
+        for row, p in enumerate(points):
+            items, dists = self._knn_one(p, k)
+            idx[row, :len(items)] = items
+            dist[row, :len(dists)] = dists
+        return idx, dist
+
+    def query_radius(self, points, r):
+        """
+        All surfaces within distance `r` of every point.
+
+        Returns one `(idx, dist)` pair of 1-D arrays per point, sorted
+        closest first.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        results = []
+        for p in points:
+            hits, hit_d = [], []
+            pf = p.tolist()
+            stack = [0] if len(self) and self._node_dist(pf, 0) <= r else []
+            while stack:
+                node = stack.pop()
+                left, right = self._children[node]
+                if left < 0:
+                    ids, d = self._leaf_items(p, node)
+                    keep = d <= r
+                    hits.append(ids[keep])
+                    hit_d.append(d[keep])
+                else:
+                    stack.extend(c for c in (left, right) if self._node_dist(pf, c) <= r)
+            ids = np.concatenate(hits) if hits else np.empty(0, dtype=np.intp)
+            d = np.concatenate(hit_d) if hit_d else np.empty(0)
+            order = np.lexsort((ids, d))
+            results.append((ids[order], d[order]))
+        return results
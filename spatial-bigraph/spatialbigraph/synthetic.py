@@ -0,0 +1,235 @@
+"""
+Seeded synthetic buildings in the RoomPlan JSON format.
+
+Rooms are axis-aligned rectangles laid out on a grid, with their walls split
+into segments, doors/windows flush on the boundary, objects inside and IoT
+devices scattered at device heights. Output follows the exports under
+`Jsons/` (`{"Rooms": [...]}`, optionally with a top-level `IoTDevices` list)
+or under `Data/*/` (one `{"room": {...}}` file per room).
+
+    python -m spatialbigraph.synthetic --rooms 200 --seed 1 -o /tmp/building.json
+    python -m spatialbigraph.synthetic --rooms 20 --layout room -o /tmp/Data
+"""
+import argparse
+import json
+import os
+import uuid
+
+import numpy as np
+
+# Object categories per `objects` group, as RoomPlan names them
+CATEGORIES = {
+    "furniture": ["chair", "table", "sofa", "bed", "storage"],
+    "fixture":   ["sink", "toilet", "bathtub", "fireplace"],
+    "appliance": ["refrigerator", "stove", "oven", "dishwasher", "washerDryer", "television"],
+}
+
+DEVICE_NAMES = ["camera", "smart tv", "ac", "laptop", "Light", "Flush", "thermostat",
+                "smoke detector", "speaker", "motion sensor"]
+
+WALL_HEIGHT = 2.7
+
+# ─── Helpers ─────────────────────────────────────────────────────────────────
+
+def _id(rng):
+    return str(uuid.UUID(bytes=rng.bytes(16), version=4)).upper()
+
+def _xyz(x, y, z):
+    return {"x": float(x), "y": float(y), "z": float(z)}
+
+def _dims(width, height, length):
+    return {"width": float(width), "height": float(height), "length": float(length)}
+
+def category_list(n_categories):
+    """
+    The first `n_categories` (group, category) pairs, taken round-robin over
+    the groups so small counts still mix furniture, fixtures and appliances.
+    """
+    pairs, depth = [], 0
+    while len(pairs) < n_categories:
+        added = False
+        for group, cats in CATEGORIES.items():
+            if depth < len(cats) and len(pairs) < n_categories:
+                pairs.append((group, cats[depth]))
+                added = True
+        if not added:
+            break
+        depth += 1
+    return pairs
+
+
+# ─── Rooms ───────────────────────────────────────────────────────────────────
+
+def _boundary(x0, z0, w, d):
+    # Sides as (start, direction, length), counter-clockwise
+    return [
+        (np.array([x0, z0]), np.array([1.0, 0.0]), w),          # bottom
+        (np.array([x0 + w, z0]), np.array([0.0, 1.0]), d),      # right
+        (np.array([x0 + w, z0 + d]), np.array([-1.0, 0.0]), w), # top
+        (np.array([x0, z0 + d]), np.array([0.0, -1.0]), d),     # left
+    ]
+
+def _anchor(start, direction, a, b):
+    """
+    Exported `location` of the stretch [a, b] along a side: its min-x end on
+    horizontal sides, its max-z end on vertical ones, which is how
+    `plot_room` reads it back.
+    """
+    p, q = start + a * direction, start + b * direction
+    if direction[0] != 0:
+        return p if p[0] <= q[0] else q
+    return p if p[1] >= q[1] else q
+
+def generate_room(rng, origin=(0.0, 0.0), size=None, n_walls=4, n_doors=1, n_windows=1,
+                  n_objects=6, n_categories=6, n_devices=3):
+    """
+    One room dict (`walls`, `doors`, `windows`, `objects`, `iot_devices`).
+
+    The 4 sides are split into `n_walls` (>= 4) wall segments. Like the
+    exports, every wall/door/window stores its extent as `width` with
+    `length` 0 and a corner `location`. Openings sit on the boundary.
+    """
+    x0, z0 = origin
+    w, d = size if size is not None else rng.uniform(2.5, 8.0, 2)
+    sides = _boundary(x0, z0, w, d)
+
+    walls = []
+    splits = np.bincount(rng.integers(0, 4, max(n_walls, 4) - 4), minlength=4) + 1
+    for (start, direction, length), parts in zip(sides, splits.tolist()):
+        cuts = np.sort(np.concatenate([[0.0, length], rng.uniform(0, length, parts - 1)]))
+        for a, b in zip(cuts[:-1], cuts[1:]):
+            x, z = _anchor(start, direction, a, b)
+            walls.append({"id": _id(rng), "dimensions": _dims(b - a, WALL_HEIGHT, 0),
+                          "location": _xyz(x, 0, z)})
+
+    def openings(n, height, y):
+        out = []
+        for side in rng.integers(0, 4, n).tolist():
+            start, direction, length = sides[side]
+            width = min(rng.uniform(0.7, 1.6), 0.8 * length)
+            a = rng.uniform(0, length - width)
+            x, z = _anchor(start, direction, a, a + width)
+            out.append({"id": _id(rng), "dimensions": _dims(width, height, 0),
+                        "location": _xyz(x, y, z)})
+        return out
+
+    objects = {}
+    pairs = category_list(n_categories)
+    for _ in range(n_objects if pairs else 0):
+        group, category = pairs[rng.integers(len(pairs))]
+        width, height, length = rng.uniform(0.3, 1.2), rng.uniform(0.4, 1.8), rng.uniform(0.3, 1.2)
+        x = x0 + rng.uniform(length / 2, max(w - length / 2, length / 2))
+        z = z0 + rng.uniform(width / 2, max(d - width / 2, width / 2))
+        objects.setdefault(group, []).append({
+            "id": _id(rng), "category": category,
+            "dimensions": _dims(width, height, length),
+            "location": _xyz(x, height / 2, z),
+        })
+
+    devices = [{
+        "id": _id(rng),
+        "name": DEVICE_NAMES[rng.integers(len(DEVICE_NAMES))],
+        "type": "",
+        "position": _xyz(x0 + rng.uniform(0, w), rng.uniform(0.3, 2.5), z0 + rng.uniform(0, d)),
+    } for _ in range(n_devices)]
+
+    return {
+        "walls": walls,
+        "doors": openings(n_doors, 2.1, 0.0),
+        "windows": openings(n_windows, 1.2, 0.9),
+        "objects": objects,
+        "iot_devices": devices,
+    }
+
+
+# ─── Buildings ───────────────────────────────────────────────────────────────
+
+def generate_rooms(n_rooms, seed=0, spacing=10.0, **room_kwargs):
+    """
+    Yield `(name, room_dict)` for `n_rooms` rooms on a square grid, each
+    device tagged with its room name. Same `seed` → same rooms.
+    """
+    rng = np.random.default_rng(seed)
+    cols = max(int(np.ceil(np.sqrt(n_rooms))), 1)
+    for i in range(n_rooms):
+        name = f"room {i}"
+        room = generate_room(rng, origin=(spacing * (i % cols), spacing * (i // cols)), **room_kwargs)
+        for dev in room["iot_devices"]:
+            dev["room"] = name
+        yield name, room
+
+def generate_building(n_rooms, seed=0, top_level_devices=0.0, **room_kwargs):
+    """
+    A multi-room export in the `Jsons/` layout. A `top_level_devices`
+    fraction of every room's devices is moved to a top-level `IoTDevices`
+    list, as in `Jsons/bigraphwithiot.json`.
+    """
+    rng = np.random.default_rng([seed, 1])
+    rooms, top = [], []
+    for name, room in generate_rooms(n_rooms, seed=seed, **room_kwargs):
+        devs = room["iot_devices"]
+        moved = rng.random(len(devs)) < top_level_devices
+        room["iot_devices"] = [dev for dev, m in zip(devs, moved) if not m]
+        top.extend(dev for dev, m in zip(devs, moved) if m)
+        rooms.append({name: room})
+    data = {"Rooms": rooms}
+    if top:
+        data["IoTDevices"] = top
+    return data
+
+def write_building(out, n_rooms, layout="Rooms", seed=0, **kwargs):
+    """
+    Write a synthetic building and return the paths written: one JSON file
+    at `out` for the "Rooms" layout, or `out/<Name>/RoomBigraph<Name>.json`
+    per room for the single "room" layout.
+    """
+    if layout == "Rooms":
+        os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+        with open(out, "w") as f:
+            json.dump(generate_building(n_rooms, seed=seed, **kwargs), f)
+        return [out]
+    if layout != "room":
+        raise ValueError(f"unknown layout {layout!r} (expected 'Rooms' or 'room')")
+
+    kwargs.pop("top_level_devices", None)
+    paths = []
+    for name, room in generate_rooms(n_rooms, seed=seed, **kwargs):
+        folder = name.title().replace(" ", "")
+        path = os.path.join(out, folder, f"RoomBigraph{folder}.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"room": room}, f)
+        paths.append(path)
+    return paths
+
+
+# ─── Command Line ────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--rooms", type=int, default=10, help="number of rooms (default: 10)")
+    parser.add_argument("-o", "--out", required=True,
+                        help="output JSON file (Rooms layout) or folder (room layout)")
+    parser.add_argument("--layout", choices=["Rooms", "room"], default="Rooms",
+                        help="multi-room `Rooms` file or one `room` file per room")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--walls", type=int, default=4, help="walls per room (>= 4)")
+    parser.add_argument("--doors", type=int, default=1, help="doors per room")
+    parser.add_argument("--windows", type=int, default=1, help="windows per room")
+    parser.add_argument("--objects", type=int, default=6, help="objects per room")
+    parser.add_argument("--categories", type=int, default=6, help="distinct object categories")
+    parser.add_argument("--devices", type=int, default=3, help="IoT devices per room")
+    parser.add_argument("--top-level-devices", type=float, default=0.0,
+                        help="fraction of devices listed under top-level IoTDevices (Rooms layout)")
+    args = parser.parse_args(argv)
+
+    paths = write_building(args.out, args.rooms, layout=args.layout, seed=args.seed,
+                           n_walls=args.walls, n_doors=args.doors, n_windows=args.windows,
+                           n_objects=args.objects, n_categories=args.categories,
+                           n_devices=args.devices, top_level_devices=args.top_level_devices)
+    print(f"{args.rooms} rooms → {len(paths)} file(s) under {args.out}")
+    return paths
+
+
+if __name__ == "__main__":
+    main()
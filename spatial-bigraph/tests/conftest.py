@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def jsons():
+    """
+    Path of a file under `Jsons/`.
+    """
+    return lambda name: os.path.join(ROOT, "Jsons", name)
@@ -0,0 +1,26 @@
+from spatialbigraph.adjacency import add_room_links, room_adjacency
+from spatialbigraph.bigraph import build_bigraph
+from spatialbigraph.loader import stream_scene
+from spatialbigraph.scene import Scene
+
+
+def test_floor_rooms_touch(jsons):
+    adjacency = room_adjacency(Scene.load(jsons("floor.json")).rooms)
+    assert {(a.room_a, a.room_b, a.kind) for a in adjacency} == {
+        ("Bathroom", "Meeting Room", "wall"), ("Bathroom", "Meeting Room", "door")}
+
+
+def test_repeated_room_does_not_touch_itself(jsons):
+    # The same room passed twice, as two rescans of it would be
+    rooms = list(stream_scene(jsons("bigraphwithiot.json"))) * 2
+    assert [room.name for room in rooms] == ["office", "office"]
+    assert room_adjacency(rooms) == []
+
+
+def test_no_self_links(jsons):
+    for name in ("floor.json", "bigraphwithiot.json"):
+        rooms = list(stream_scene(jsons(name)))
+        links = add_room_links(build_bigraph(rooms), room_adjacency(rooms))
+        for link in links:
+            room_a, room_b = link.split(":", 1)[1].split("|")
+            assert room_a != room_b, link
@@ -0,0 +1,20 @@
+import pytest
+
+from spatialbigraph.batch import batch_build
+
+
+def test_rooms_of_other_files_keep_their_own_root(jsons):
+    paths = [jsons("floor.json"), jsons("kitchenroom.json")]
+    with pytest.warns(UserWarning, match="Meeting Room"):
+        G, report = batch_build(paths, workers=1)
+    roots = sorted(n for n in G if G.in_degree(n) == 0)
+    assert roots == sorted(["Bathroom", "Meeting Room", f"{paths[1]}:Meeting Room", "Kitchen"])
+    assert report["rooms"] == 4
+    assert set(G.successors(f"{paths[1]}:Meeting Room")).isdisjoint(G.successors("Meeting Room"))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_each_room_counts_once(jsons, workers):
+    G, report = batch_build([jsons("bigraphwithiot.json")], workers=workers)
+    assert report["rooms"] == 1
+    assert [n for n in G if G.in_degree(n) == 0] == ["office"]
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from spatialbigraph import cache
+from spatialbigraph.cache import BigraphCache, source_key
+
+
+@pytest.fixture
+def room_file(jsons, tmp_path):
+    """
+    Write the office of `bigraphwithiot.json` as a single-`room` export
+    named after `folder`, and return its path.
+    """
+    (data,) = json.load(open(jsons("bigraphwithiot.json")))["Rooms"][0].values()
+
+    def write(folder, room=data):
+        path = tmp_path / folder / f"RoomBigraph{folder}.json"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(json.dumps({"room": room}))
+        return str(path)
+    return write
+
+
+def test_unchanged_file_hits(room_file, tmp_path):
+    path = room_file("Kitchen")
+    store = BigraphCache(str(tmp_path / "cache"))
+    assert store.load(path) is None
+    built = store.get(path)
+    assert store.load(path).entry_dir == built.entry_dir
+    assert sorted(built.graph().edges()) == sorted(store.load(path).graph().edges())
+
+
+def test_content_change_misses(room_file, tmp_path):
+    path = room_file("Kitchen")
+    store = BigraphCache(str(tmp_path / "cache"))
+    key = source_key(path)
+    store.get(path)
+    data = json.load(open(path))["room"]
+    data["walls"] = data["walls"][1:]
+    room_file("Kitchen", data)
+    assert source_key(path) != key
+    assert store.load(path) is None
+
+
+@pytest.mark.parametrize("version", ["ALGORITHM_VERSION", "FORMAT_VERSION"])
+def test_version_change_misses(room_file, tmp_path, monkeypatch, version):
+    path = room_file("Kitchen")
+    store = BigraphCache(str(tmp_path / "cache"))
+    key = source_key(path)
+    store.get(path)
+    monkeypatch.setattr(cache, version, getattr(cache, version) + 1)
+    assert source_key(path) != key
+    assert store.load(path) is None
+
+
+def test_room_name_is_part_of_the_key(room_file, tmp_path):
+    # Equal contents, but each file names its room after its folder
+    kitchen, bath = room_file("Kitchen"), room_file("Bath")
+    assert open(kitchen).read() == open(bath).read()
+    assert source_key(kitchen) != source_key(bath)
+    store = BigraphCache(str(tmp_path / "cache"))
+    assert store.get(kitchen).room_names == ["Kitchen"]
+    assert store.get(bath).room_names == ["Bath"]
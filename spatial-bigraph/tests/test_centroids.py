@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+import pytest
+
+from spatialbigraph.attach import nearest_centroids
+from spatialbigraph.centroids import CentroidTree, centroid_parents, element_centroids
+from spatialbigraph.scene import Scene
+
+
+def brute_knn(points, centroids, k):
+    d = np.linalg.norm(points[:, None, :] - centroids[None], axis=2)
+    rows = np.argsort(d, axis=1, kind="stable")[:, :k]
+    return rows, np.take_along_axis(d, rows, axis=1)
+
+
+@pytest.mark.parametrize("k", [1, 4])
+@pytest.mark.parametrize("leaf_size", [1, 16])
+def test_tree_matches_brute_force(k, leaf_size):
+    rng = np.random.default_rng(0)
+    centroids = rng.uniform(0, 10, (500, 3))
+    # Repeated centroids: ties go to the lower row
+    centroids[250:300] = centroids[:50]
+    points = np.vstack([rng.uniform(-1, 11, (200, 3)), centroids[:20]])
+    rows, dist = CentroidTree(centroids, leaf_size).query(points, k=k)
+    want_rows, want_dist = brute_knn(points, centroids, k)
+    if k == 1:
+        want_rows, want_dist = want_rows[:, 0], want_dist[:, 0]
+    assert np.array_equal(rows, want_rows)
+    assert np.allclose(dist, want_dist)
+
+
+def test_tree_pads_when_k_exceeds_its_points():
+    rows, dist = CentroidTree(np.zeros((2, 3))).query(np.ones((1, 3)), k=3)
+    assert rows.tolist() == [[0, 1, -1]]
+    assert np.isinf(dist[0, 2])
+
+
+def test_centroids_follow_corner_plus_half_extents(jsons):
+    # The rule of bigraphs_with_centroid.py, from the raw JSON
+    (data,) = json.load(open(jsons("room_2_with_iot.json")))["Rooms"][0].values()
+    want = {}
+    for group in ("walls", "doors", "windows"):
+        for item in data[group]:
+            loc, dims = item["location"], item["dimensions"]
+            want[item["id"]] = [loc["x"] + 0.5 * dims["width"], loc["y"] + 0.5 * dims["height"],
+                                loc["z"] + 0.5 * dims["length"]]
+    for items in data["objects"].values():
+        for item in items:
+            want[item["id"]] = [item["location"][k] for k in "xyz"]
+
+    room = Scene.load(jsons("room_2_with_iot.json")).rooms[0]
+    got = dict(zip(room.elements["id"].tolist(), element_centroids(room).tolist()))
+    assert got.keys() == want.keys()
+    for eid, centroid in want.items():
+        assert np.allclose(got[eid], centroid), eid
+
+
+@pytest.mark.parametrize("chain", [False, True])
+def test_parents_match_a_scan(jsons, chain):
+    for room in Scene.load(jsons("floor.json")).rooms:
+        parents, dist = centroid_parents(room, chain=chain)
+        rows, scan_dist = nearest_centroids(room.devices["position"], element_centroids(room, chain=chain))
+        assert parents == [room.elements["id"][r] for r in rows.tolist()]
+        assert np.allclose(dist, scan_dist)
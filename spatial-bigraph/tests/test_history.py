@@ -0,0 +1,54 @@
+import copy
+import json
+
+import pytest
+
+from spatialbigraph.bigraph import build_bigraph
+from spatialbigraph.history import BigraphHistory
+from spatialbigraph.loader import stream_scene
+from spatialbigraph.scene import Room, Scene
+
+
+@pytest.fixture
+def late_devices(jsons, tmp_path):
+    """
+    `floor.json` with devices in its rooms and two more in a trailing
+    `IoTDevices` list.
+    """
+    data = json.load(open(jsons("floor.json")))
+    late = []
+    for room in data["Rooms"]:
+        (room_data,) = room.values()
+        for dev in copy.deepcopy(room_data["iot_devices"]):
+            dev["id"] += "-late"
+            dev["position"]["y"] += 0.5
+            late.append(dev)
+    data["IoTDevices"] = late[:2]
+    path = tmp_path / "floor.json"
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+def check_stable(history, rooms_a, rooms_b, n_nodes):
+    first = history.commit(rooms_a)
+    second = history.commit(rooms_b)
+    for version in (first, second):
+        assert version.n_nodes == version.to_networkx().number_of_nodes() == n_nodes
+    assert history.diff(first, second) == ({}, {}, {})
+
+
+def test_late_devices_commit_twice(late_devices):
+    n_nodes = build_bigraph(Scene.load(late_devices).rooms).number_of_nodes()
+    check_stable(BigraphHistory(), stream_scene(late_devices), stream_scene(late_devices), n_nodes)
+
+
+def test_repeated_room_names_merge(jsons):
+    # One room handed over in two parts, each with half of its devices
+    (data,) = json.load(open(jsons("room_2_with_iot.json")))["Rooms"][0].values()
+    devices = data["iot_devices"]
+
+    def parts():
+        return [Room.from_dict("meeting room", dict(data, iot_devices=devices[:2])),
+                Room.from_dict("meeting room", dict(data, iot_devices=devices[2:]))]
+    n_nodes = build_bigraph([Room.from_dict("meeting room", data)]).number_of_nodes()
+    check_stable(BigraphHistory(), parts(), parts(), n_nodes)
@@ -0,0 +1,94 @@
+import copy
+import json
+
+import pytest
+
+from spatialbigraph.bigraph import build_bigraph
+from spatialbigraph.incremental import LiveBigraph
+from spatialbigraph.scene import Room
+
+
+@pytest.fixture
+def meeting_room(jsons):
+    (data,) = json.load(open(jsons("room_2_with_iot.json")))["Rooms"][0].values()
+    return data
+
+
+def rebuilt(data):
+    return set(build_bigraph([Room.from_dict("meeting room", data)]).edges())
+
+
+def device(dev_id, position):
+    return {"id": dev_id, "name": "sensor", "room": "meeting room",
+            "position": dict(zip("xyz", position))}
+
+
+def test_edits_match_a_full_rebuild(meeting_room):
+    data = copy.deepcopy(meeting_room)
+    live = LiveBigraph([Room.from_dict("meeting room", data)])
+    assert set(live.G.edges()) == rebuilt(data)
+
+    chair = data["objects"]["furniture"][0]
+    near_chair = [chair["location"][k] + 0.05 for k in "xyz"]
+    live.add_device("meeting room", "sensor-1", near_chair, name="sensor")
+    data["iot_devices"].append(device("sensor-1", near_chair))
+    assert set(live.G.edges()) == rebuilt(data)
+
+    moved = data["iot_devices"][0]
+    window = data["windows"][0]["location"]
+    moved["position"] = {k: window[k] + 0.1 for k in "xyz"}
+    live.move_device(moved["id"], moved["position"])
+    assert set(live.G.edges()) == rebuilt(data)
+
+    # A new table right where the first device sits
+    table = dict(copy.deepcopy(chair), id="table-1", category="table",
+                 location=dict(data["iot_devices"][1]["position"]))
+    live.add_surface("meeting room", table, "furniture")
+    data["objects"]["furniture"].append(table)
+    assert set(live.G.edges()) == rebuilt(data)
+
+    wall = copy.deepcopy(data["walls"][0])
+    wall["id"] = "wall-1"
+    wall["location"]["x"] += 0.3
+    live.add_surface("meeting room", wall, "walls")
+    data["walls"].append(wall)
+    assert set(live.G.edges()) == rebuilt(data)
+
+    # Removing a parent moves its devices to their next-nearest surface
+    parent = next(live.G.predecessors(data["iot_devices"][2]["id"]))
+    live.remove_surface(parent)
+    for group in ("walls", "doors", "windows"):
+        data[group] = [item for item in data[group] if item["id"] != parent]
+    data["objects"] = {key: [item for item in items if item["id"] != parent]
+                       for key, items in data["objects"].items()}
+    assert set(live.G.edges()) == rebuilt(data)
+
+    live.remove_device("sensor-1")
+    data["iot_devices"] = [d for d in data["iot_devices"] if d["id"] != "sensor-1"]
+    assert set(live.G.edges()) == rebuilt(data)
+
+
+def test_edits_leave_the_room_alone(meeting_room):
+    room = Room.from_dict("meeting room", meeting_room)
+    n = len(room.surfaces())
+    live = LiveBigraph([room])
+    wall = dict(copy.deepcopy(meeting_room["walls"][0]), id="wall-1")
+    live.add_surface("meeting room", wall, "walls")
+    assert len(room.surfaces()) == n
+    assert "wall-1" not in room.surfaces().objects
+    assert len(live.rooms["meeting room"].surfaces) == n + 1
+
+
+def test_repeated_room_merges_into_the_live_one(meeting_room):
+    # The second part brings the last wall and the other half of the devices
+    devices = meeting_room["iot_devices"]
+    first = dict(meeting_room, walls=meeting_room["walls"][:-1], iot_devices=devices[:2])
+    second = dict(meeting_room, iot_devices=devices[2:])
+    live = LiveBigraph([Room.from_dict("meeting room", first), Room.from_dict("meeting room", second)])
+    assert set(live.G.edges()) == rebuilt(meeting_room)
+
+    moved = copy.deepcopy(meeting_room)
+    window = moved["windows"][0]["location"]
+    moved["iot_devices"][1]["position"] = {k: window[k] + 0.1 for k in "xyz"}
+    live.move_device(devices[1]["id"], moved["iot_devices"][1]["position"])
+    assert set(live.G.edges()) == rebuilt(moved)
@@ -0,0 +1,68 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from spatialbigraph.layout import TreeLayout
+
+
+def random_forest(rng, n, n_roots=3):
+    parent = np.full(n, -1, dtype=np.intp)
+    for row in range(n_roots, n):
+        parent[row] = rng.integers(0, row)
+    return parent
+
+
+def under(parent, row):
+    while row >= 0:
+        yield row
+        row = parent[row]
+
+
+@pytest.mark.parametrize("seed, edits", [(0, 40), (1, 40), (2, 40), (3, 1500)])
+def test_relayout_matches_a_full_layout(seed, edits):
+    # 1500 edits rewrite enough child lists to repack the buffer
+    rng = np.random.default_rng(seed)
+    parent = random_forest(rng, 300)
+    layout = TreeLayout(parent)
+    for _ in range(edits):
+        if rng.random() < 0.5:
+            # Append a leaf
+            parent = np.append(parent, rng.integers(0, len(parent)))
+            changed = [len(parent) - 1]
+        else:
+            # Move a subtree under a node outside it
+            row = int(rng.integers(3, len(parent)))
+            target = int(rng.integers(0, len(parent)))
+            if row in set(under(parent, target)):
+                continue
+            parent = parent.copy()
+            parent[row] = target
+            changed = [row]
+        layout.relayout(parent, changed)
+        assert np.allclose(layout.xy, TreeLayout(parent).xy)
+
+
+def test_relayout_keeps_successors_order():
+    rng = np.random.default_rng(0)
+    G = nx.DiGraph((int(p), row) for row, p in enumerate(random_forest(rng, 200)) if p >= 0)
+    layout = TreeLayout.from_networkx(G)
+    ids = list(G.nodes)
+    for _ in range(30):
+        node = ids[int(rng.integers(3, len(ids)))]
+        target = ids[int(rng.integers(0, len(ids)))]
+        if not G.in_degree(node) or node == target or node in nx.ancestors(G, target):
+            continue
+        G.remove_edge(next(G.predecessors(node)), node)
+        G.add_edge(target, node)
+        index = {v: row for row, v in enumerate(ids)}
+        parent = np.array([index[next(G.predecessors(v))] if G.in_degree(v) else -1 for v in ids])
+        layout.relayout(parent, [index[node]])
+        assert np.allclose(layout.xy, TreeLayout.from_networkx(G).xy)
+
+
+def test_new_root_lays_out_every_tree():
+    parent = np.array([-1, 0, 0, 1])
+    layout = TreeLayout(parent)
+    parent = np.append(parent, -1)
+    layout.relayout(parent, [4])
+    assert np.allclose(layout.xy, TreeLayout(parent).xy)
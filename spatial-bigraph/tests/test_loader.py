@@ -0,0 +1,82 @@
+import io
+import json
+
+import pytest
+
+from spatialbigraph import loader
+from spatialbigraph.loader import JSONStream, stream_scene
+from spatialbigraph.scene import Room, Scene
+
+FILES = ["floor.json", "bigraphwithiot.json", "room_2_with_iot.json", "roomwithiot1.json"]
+
+
+def merged(rooms):
+    # {room name: (element ids, device ids)}, a repeated room folded into the first
+    out = {}
+    for room in rooms:
+        elements, devices = out.setdefault(room.name, ([], []))
+        elements.extend(i for i in room.elements["id"].tolist() if i not in elements)
+        devices.extend(room.devices["id"].tolist())
+    return out
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1 << 16])
+@pytest.mark.parametrize("name", FILES)
+def test_stream_matches_load(jsons, name, chunk_size):
+    assert merged(stream_scene(jsons(name), chunk_size)) == merged(Scene.load(jsons(name)).rooms)
+
+
+def test_rooms_are_decoded_one_at_a_time(jsons, monkeypatch):
+    decoded = []
+    from_dict = Room.from_dict
+
+    def counted(name, data):
+        decoded.append(name)
+        return from_dict(name, data)
+    monkeypatch.setattr(loader.Room, "from_dict", counted)
+    rooms = stream_scene(jsons("floor.json"), chunk_size=64)
+    assert next(rooms).name == "Bathroom"
+    assert decoded == ["Bathroom"]
+
+
+def test_skip_value_leaves_the_stream_after_it():
+    text = '{"a": [1, {"s": "]}\\"[{"}, "x\\\\"], "b": {"c": []}, "d": 2}'
+    for chunk_size in (1, 3, 1 << 16):
+        stream = JSONStream(io.StringIO(text), chunk_size)
+        stream.expect("{")
+        assert stream.value() == "a"
+        stream.expect(":")
+        stream.skip_value()
+        stream.expect(",")
+        assert stream.value() == "b"
+        stream.expect(":")
+        stream.skip_value()
+        stream.expect(",")
+        assert stream.value() == "d"
+        stream.expect(":")
+        assert stream.value() == 2
+
+
+def test_cut_off_file_is_an_error(jsons, tmp_path):
+    text = open(jsons("floor.json")).read()
+    cut = tmp_path / "floor.json"
+    cut.write_text(text[:text.index('"Meeting Room"') + 200])
+    with pytest.raises(ValueError):
+        list(stream_scene(str(cut), chunk_size=64))
+
+
+def test_late_iot_devices(jsons):
+    # The list follows "Rooms": the room still comes once, with its devices
+    (room,) = stream_scene(jsons("bigraphwithiot.json"))
+    devices = json.load(open(jsons("bigraphwithiot.json")))["IoTDevices"]
+    assert room.name == "office"
+    assert room.devices["id"].tolist() == [d["id"] for d in devices]
+
+
+def test_early_iot_devices_merge_into_their_room(jsons, tmp_path):
+    data = json.load(open(jsons("bigraphwithiot.json")))
+    devices = data["IoTDevices"] + [{"room": "nowhere", "id": "lost", "position": {"x": 0, "y": 0, "z": 0}}]
+    early = tmp_path / "early.json"
+    early.write_text(json.dumps({"IoTDevices": devices, "Rooms": data["Rooms"]}))
+    (room,) = stream_scene(str(early))
+    assert room.devices["id"].tolist() == [d["id"] for d in data["IoTDevices"]]
@@ -0,0 +1,26 @@
+import numpy as np
+
+from spatialbigraph.rooms import RoomLocator, points_in_polygon, polygon_area, room_polygon, simple_ring
+from spatialbigraph.scene import Scene
+
+
+def test_outline_with_a_spur_is_simple(jsons):
+    # The walls of this room chain open, with a spur out to (-0.01, 6.185)
+    # and the gap closing diagonally across the wall at z = 5.62
+    (room,) = Scene.load(jsons("room_2_with_iot.json")).rooms
+    ring = room_polygon(room)
+    np.testing.assert_array_equal(simple_ring(ring), ring)
+    assert polygon_area(ring) > 0
+    assert ring[:, 1].max() < 5.65
+    xz = room.walls["location"][:, [0, 2]]
+    assert abs(polygon_area(ring)) <= np.prod(xz.max(axis=0) - xz.min(axis=0))
+    assert (RoomLocator.from_rooms([room]).assign(room.devices["position"]) == 0).all()
+
+
+def test_crossing_ring_keeps_its_larger_loop():
+    # A square whose last edge runs past the first corner and back in
+    bowtie = np.array([(0, 0), (4, 0), (4, 4), (0, 4), (0, -1), (1, -1)], dtype=float)
+    ring = simple_ring(bowtie)
+    assert abs(polygon_area(ring)) == 16
+    assert points_in_polygon([(2, 2)], ring).all()
+    assert len(simple_ring(np.array([(0, 0), (2, 0), (1, 0)], dtype=float))) < 3
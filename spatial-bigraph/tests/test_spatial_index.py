@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from spatialbigraph.attach import PackedSurfaces, distance_matrix, nearest_parents
+from spatialbigraph.geometry import build_surfaces
+from spatialbigraph.scene import Room
+from spatialbigraph.spatial_index import SurfaceIndex
+from spatialbigraph.synthetic import generate_room
+
+
+@pytest.fixture
+def room():
+    rng = np.random.default_rng(0)
+    data = generate_room(rng, size=(20.0, 20.0), n_walls=12, n_doors=3, n_windows=4,
+                         n_objects=300, n_categories=8, n_devices=200)
+    return Room.from_dict("synthetic", data)
+
+
+@pytest.mark.parametrize("leaf_size", [1, 8])
+def test_knn_matches_brute_force(room, leaf_size):
+    packed = room.surfaces(finite=True)
+    points = room.devices["position"]
+    full = distance_matrix(points, packed)
+    idx, dist = SurfaceIndex.from_packed(packed, leaf_size).query(points, k=5)
+    assert np.allclose(dist, np.sort(full, axis=1)[:, :5])
+    assert np.allclose(np.take_along_axis(full, idx, axis=1), dist)
+
+
+def test_radius_matches_brute_force(room):
+    packed = room.surfaces(finite=True)
+    points = room.devices["position"]
+    full = distance_matrix(points, packed)
+    for row, (idx, dist) in enumerate(SurfaceIndex.from_packed(packed).query_radius(points, 0.75)):
+        assert set(idx.tolist()) == set(np.flatnonzero(full[row] <= 0.75).tolist())
+        assert np.allclose(dist, full[row, idx])
+        assert (np.diff(dist) >= 0).all()
+
+
+def test_parents_match_the_finite_scan(room):
+    points = room.devices["position"]
+    parents, dist = nearest_parents(points, room.surface_index())
+    scan_parents, scan_dist = nearest_parents(points, room.surfaces(finite=True))
+    assert parents == scan_parents
+    assert np.allclose(dist, scan_dist)
+
+
+def test_planes_are_refused(room):
+    with pytest.raises(ValueError):
+        SurfaceIndex.from_packed(room.surfaces())
+
+
+def test_turned_walls_are_measured_to_their_rectangle():
+    # Walls turned about y through a `transform`: their axis-aligned boxes
+    # are far larger than the walls, the rectangles are exact
+    rng = np.random.default_rng(1)
+    walls = []
+    for i in range(60):
+        c, s = np.cos(rng.uniform(0, np.pi)), np.sin(rng.uniform(0, np.pi))
+        matrix = np.eye(4)
+        matrix[:3, :3] = [[c, 0.0, s], [0.0, 1.0, 0.0], [-s, 0.0, c]]
+        matrix[:3, 3] = [rng.uniform(0, 20), 1.25, rng.uniform(0, 20)]
+        walls.append({"id": f"wall_{i}", "transform": matrix.T.ravel().tolist(),
+                      "location": {"x": 0.0, "y": 0.0, "z": 0.0},
+                      "dimensions": {"width": rng.uniform(1, 6), "height": 2.5, "length": 0.0}})
+    ids = [wall["id"] for wall in walls]
+    points = rng.uniform(0, 20, (300, 3))
+    full = distance_matrix(points, PackedSurfaces(build_surfaces(walls, ids, [], [], finite=True)))
+    idx, dist = SurfaceIndex(build_surfaces(walls, ids, [], [], finite=False)).query(points, k=3)
+    assert np.allclose(dist, np.sort(full, axis=1)[:, :3])